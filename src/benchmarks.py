@@ -0,0 +1,430 @@
+# benchmarks.py
+
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_loader import (
+    CASES,
+    haversine_km,
+    load_instance,
+    load_clients,
+    load_clients_arrays,
+    build_distance_and_time,
+    Client,
+    MainConfig,
+)
+from evaluation import evaluate_solution
+from ga_algorithm import GeneticAlgorithm
+from operators import (
+    _build_indexed_from_sequence,
+    _build_routes_from_sequence,
+    crossover,
+    mutate,
+    SPLIT_MODES,
+)
+
+
+# ============================================================
+# Split greedy vs óptimo
+# ============================================================
+
+def bench_split(n_tours: int = 200, ga_generations: int = 100, seed: int = 0):
+    """
+    Compara los decodificadores sobre los tres casos:
+      - us_per_decode: tiempo medio por decodificación (µs)
+      - mean_decode_cost: costo medio de decodificar los mismos recorridos aleatorios
+      - ga_cost: mejor costo del GA (misma semilla) usando ese split
+    """
+    rows = []
+
+    for name, folder in CASES.items():
+        config = load_instance(folder)
+        n = len(config.clients)
+
+        rng = random.Random(seed)
+        tours = []
+        for _ in range(n_tours):
+            seq = list(range(1, n + 1))
+            rng.shuffle(seq)
+            tours.append(seq)
+
+        for split in SPLIT_MODES:
+            t0 = time.perf_counter()
+            decoded = [_build_indexed_from_sequence(seq, config, split) for seq in tours]
+            elapsed = time.perf_counter() - t0
+
+            mean_cost = sum(evaluate_solution(s, config) for s in decoded) / n_tours
+
+            ga = GeneticAlgorithm(
+                config, generations=ga_generations, seed=seed, compact=True, split=split
+            )
+            with contextlib.redirect_stdout(io.StringIO()):
+                best, _ = ga.evolve()
+
+            rows.append({
+                "instance": name,
+                "split": split,
+                "us_per_decode": 1e6 * elapsed / n_tours,
+                "mean_decode_cost": mean_cost,
+                "ga_cost": best.cost,
+                "ga_feasible": best.is_feasible,
+            })
+
+    return rows
+
+
+# ============================================================
+# Instancia sintética en memoria (clientes alrededor de Bogotá)
+# ============================================================
+
+def _synthetic_config(n_clients: int, seed: int = 0, base_case: str = "Caso_3",
+                      distance_mode: str = "dense") -> MainConfig:
+    """
+    Toma parámetros, vehículos y depósito de un caso real y genera
+    n_clients clientes uniformes en una caja de ~20 km alrededor del depósito.
+    """
+    base = load_instance(CASES[base_case])
+    rng = np.random.default_rng(seed)
+
+    lats = base.depot.lat + rng.uniform(-0.09, 0.09, n_clients)
+    lons = base.depot.lon + rng.uniform(-0.09, 0.09, n_clients)
+    demands = rng.integers(5, 20, n_clients)
+
+    clients = {}
+    for k in range(n_clients):
+        code = f"c{k + 1:05d}"
+        clients[code] = Client(
+            numeric_id=k + 1,
+            code=code,
+            lat=float(lats[k]),
+            lon=float(lons[k]),
+            demand=float(demands[k]),
+        )
+
+    config = MainConfig(
+        C_fixed=base.C_fixed,
+        C_dist=base.C_dist,
+        C_time=base.C_time,
+        fuel_price=base.fuel_price,
+        vehicles=base.vehicles,
+        clients=clients,
+        depot=base.depot,
+    )
+    build_distance_and_time(config, distance_mode=distance_mode)
+    return config
+
+
+# ============================================================
+# GA paralelo: speedup por número de trabajadores
+# ============================================================
+
+def bench_parallel(worker_counts=(1, 2, 4), generations: int = 20, pop_size: int = 50,
+                   synthetic_clients: int = 1000, seed: int = 0):
+    """
+    Tiempo de pared de evolve() por número de trabajadores en Caso_3 y en
+    una instancia sintética; speedup relativo a workers=1.
+    """
+    instances = {
+        "Caso_3": load_instance(CASES["Caso_3"]),
+        f"sintetico_{synthetic_clients}": _synthetic_config(synthetic_clients, seed),
+    }
+
+    rows = []
+    for name, config in instances.items():
+        t_serial = None
+        for workers in worker_counts:
+            ga = GeneticAlgorithm(
+                config, pop_size=pop_size, generations=generations, seed=seed,
+                compact=True, workers=workers,
+            )
+            t0 = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                best, _ = ga.evolve()
+            elapsed = time.perf_counter() - t0
+            if t_serial is None:
+                t_serial = elapsed
+
+            rows.append({
+                "instance": name,
+                "workers": workers,
+                "wall_s": elapsed,
+                "speedup": t_serial / elapsed,
+                "best_cost": best.cost,
+            })
+
+    return rows
+
+
+# ============================================================
+# Carga de CSV grandes
+# ============================================================
+
+def _write_clients_csv(path: str, n_rows: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, n_rows + 1)
+    columns = {
+        "ClientID": ids,
+        "StandardizedID": [f"C{i:07d}" for i in ids],
+        "LocationID": ids + 1,
+        "Latitude": 4.65 + rng.normal(0, 0.05, n_rows),
+        "Longitude": -74.1 + rng.normal(0, 0.05, n_rows),
+        "Demand": rng.integers(5, 20, n_rows),
+    }
+    pd.DataFrame(columns).to_csv(path, index=False)
+
+
+def bench_loading(sizes=(10_000, 100_000, 1_000_000), chunksize: int = 200_000):
+    """
+    Tiempo de carga de clients.csv sintéticos: dict de Client, dict por
+    trozos y forma compacta en arreglos.
+    """
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            path = os.path.join(tmp, f"clients_{n}.csv")
+            _write_clients_csv(path, n)
+
+            for mode, fn in [
+                ("dict", lambda: load_clients(path)),
+                ("dict_chunked", lambda: load_clients(path, chunksize=chunksize)),
+                ("arrays", lambda: load_clients_arrays(path)),
+            ]:
+                t0 = time.perf_counter()
+                loaded = fn()
+                elapsed = time.perf_counter() - t0
+                rows.append({"rows": n, "mode": mode, "seconds": elapsed, "loaded": len(loaded)})
+
+    return rows
+
+
+# ============================================================
+# Suite con estadísticas repetibles (mediana, IQR) y línea base
+# ============================================================
+
+BASELINE_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "bench_results", "baseline.json")
+)
+
+
+def _autorange(fn, min_sample_s: float) -> int:
+    """
+    Menor número de llamadas (1, 2, 5, 10, 20, ...) cuya duración total
+    alcanza min_sample_s, como timeit.Timer.autorange.
+    """
+    number = 1
+    while True:
+        for factor in (1, 2, 5):
+            n = number * factor
+            t0 = time.perf_counter()
+            for _ in range(n):
+                fn()
+            if time.perf_counter() - t0 >= min_sample_s:
+                return n
+        number *= 10
+
+
+def _time_calls(fn, repeat: int, number: int = None, warmup: int = 1,
+                min_sample_s: float = 0.05) -> Tuple[List[float], int]:
+    """
+    repeat muestras del tiempo medio por llamada (s) de fn(), cada una sobre
+    number llamadas seguidas (perf_counter). Sin number, se elige para que
+    cada muestra dure al menos min_sample_s. Devuelve (muestras, number).
+    """
+    for _ in range(warmup):
+        fn()
+    if number is None:
+        number = _autorange(fn, min_sample_s)
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - t0) / number)
+    return samples, number
+
+
+def _stats(samples: list) -> dict:
+    q1, median, q3 = np.percentile(samples, [25, 50, 75])
+    return {
+        "median_s": float(median),
+        "q1_s": float(q1),
+        "q3_s": float(q3),
+        "iqr_s": float(q3 - q1),
+        "min_s": float(min(samples)),
+        "repeat": len(samples),
+    }
+
+
+def bench_suite(repeat: int = 7, evolve_repeat: int = 3, evolve_generations: int = 40,
+                pop_size: int = 30, seed: int = 0) -> dict:
+    """
+    Micro y macro benchmarks sobre los tres casos. Devuelve
+    {nombre: {median_s, q1_s, q3_s, iqr_s, min_s, repeat, number}}; los
+    tiempos son por llamada y cada muestra de los micro benchmarks agrupa
+    suficientes llamadas para durar >= 50 ms. Las entradas se generan con la
+    semilla dada, así que dos corridas miden exactamente el mismo trabajo.
+    """
+    results = {}
+
+    def run(name, fn, number=None, n_repeat=repeat):
+        samples, number = _time_calls(fn, n_repeat, number)
+        stats = _stats(samples)
+        stats["number"] = number
+        results[name] = stats
+
+    rng = np.random.default_rng(seed)
+    pts = rng.uniform([4.5, -74.2, 4.5, -74.2], [4.8, -74.0, 4.8, -74.0], size=(1000, 4))
+    pts_list = pts.tolist()
+
+    def haversine_loop():
+        for lat1, lon1, lat2, lon2 in pts_list:
+            haversine_km(lat1, lon1, lat2, lon2)
+
+    run("haversine_km/1000_pairs", haversine_loop)
+
+    for name, folder in CASES.items():
+        config = load_instance(folder)
+        depot = config.depot.code
+        n = len(config.clients)
+        py_rng = random.Random(seed)
+
+        seq_idx = list(range(1, n + 1))
+        py_rng.shuffle(seq_idx)
+        seq_codes = [config.node_codes[i] for i in seq_idx]
+        sol_a = _build_routes_from_sequence(seq_codes, config, depot)
+        py_rng.shuffle(seq_idx)
+        sol_b = _build_routes_from_sequence([config.node_codes[i] for i in seq_idx], config, depot)
+
+        run(f"build_distance_and_time/{name}", lambda: build_distance_and_time(config))
+        for split in SPLIT_MODES:
+            run(f"build_routes_from_sequence/{split}/{name}",
+                lambda: _build_routes_from_sequence(seq_codes, config, depot, split))
+        run(f"crossover/{name}",
+            lambda: crossover(sol_a, sol_b, config, depot, rng=py_rng))
+        run(f"mutate/{name}",
+            lambda: mutate(sol_a, config, depot, mutation_rate=1.0, rng=py_rng))
+        run(f"evaluate_solution/{name}", lambda: evaluate_solution(sol_a, config))
+
+        def solve():
+            ga = GeneticAlgorithm(config, pop_size=pop_size, generations=evolve_generations,
+                                  seed=seed, verbose=False)
+            ga.evolve()
+
+        run(f"evolve/{name}", solve, number=1, n_repeat=evolve_repeat)
+
+    return results
+
+
+def save_results(results: dict, path: str):
+    """
+    Guarda los resultados en JSON junto con el entorno en que se midieron.
+    """
+    payload = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.platform(),
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+
+
+def load_results(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def compare_to_baseline(results: dict, baseline: dict, tolerance: float = 0.20) -> list:
+    """
+    Compara medianas contra la línea base. Un benchmark es regresión si su
+    mediana supera la de la base en más de tolerance Y su Q1 queda por encima
+    del Q3 de la base (los rangos intercuartiles no se tocan), para no
+    marcar ruido como regresión. Análogo para "improved".
+    """
+    rows = []
+    for name, cur in results.items():
+        base = baseline.get(name)
+        if base is None:
+            rows.append({"benchmark": name, "baseline_ms": None, "current_ms": 1e3 * cur["median_s"],
+                         "ratio": None, "status": "new"})
+            continue
+
+        ratio = cur["median_s"] / base["median_s"] if base["median_s"] > 0 else float("inf")
+        if ratio > 1.0 + tolerance and cur["q1_s"] > base["q3_s"]:
+            status = "REGRESSION"
+        elif ratio < 1.0 - tolerance and cur["q3_s"] < base["q1_s"]:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append({"benchmark": name, "baseline_ms": 1e3 * base["median_s"],
+                     "current_ms": 1e3 * cur["median_s"], "ratio": ratio, "status": status})
+    return rows
+
+
+def _print_rows(rows):
+    if not rows:
+        return
+    cols = list(rows[0].keys())
+    print(" | ".join(cols))
+    for r in rows:
+        print(" | ".join(f"{r[c]:.2f}" if isinstance(r[c], float) else str(r[c]) for c in cols))
+
+
+def _suite_rows(results: dict) -> list:
+    return [
+        {"benchmark": name, "median_ms": 1e3 * r["median_s"], "iqr_ms": 1e3 * r["iqr_s"]}
+        for name, r in results.items()
+    ]
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    benches = {"split": bench_split, "parallel": bench_parallel, "loading": bench_loading}
+
+    parser = argparse.ArgumentParser(description="Benchmarks del solver CVRP")
+    parser.add_argument("names", nargs="*",
+                        help=f"suite (por defecto) o {', '.join(benches)}")
+    parser.add_argument("--out", help="guardar los resultados de la suite en este JSON")
+    parser.add_argument("--baseline",
+                        help=f"comparar contra esta línea base (p. ej. {BASELINE_PATH})")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="guardar la suite como nueva línea base en BASELINE_PATH")
+    parser.add_argument("--tolerance", type=float, default=0.20)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    regressions = False
+    # Solo la suite por defecto: "loading" escribe y lee un CSV de un millón de filas
+    for name in args.names or ["suite"]:
+        print(f"== {name} ==")
+        if name != "suite":
+            _print_rows(benches[name]())
+            continue
+
+        results = bench_suite(repeat=args.repeat)
+        _print_rows(_suite_rows(results))
+        if args.out:
+            save_results(results, args.out)
+        if args.save_baseline:
+            save_results(results, BASELINE_PATH)
+        if args.baseline:
+            comparison = compare_to_baseline(results, load_results(args.baseline), args.tolerance)
+            _print_rows(comparison)
+            regressions = any(r["status"] == "REGRESSION" for r in comparison)
+
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,43 @@
+# checkpoint.py
+# Instantáneas binarias del estado del GA (guardar / reanudar corridas)
+
+import os
+import pickle
+from typing import Any, Dict
+
+
+CHECKPOINT_VERSION = 1
+
+
+def save_checkpoint(path: str, state: Dict[str, Any]):
+    """
+    Escribe state con pickle (protocolo más alto) de forma atómica: primero a
+    un temporal en el mismo directorio y luego os.replace, así un proceso
+    interrumpido a mitad de escritura nunca deja un checkpoint corrupto.
+    """
+    payload = {"version": CHECKPOINT_VERSION, "state": state}
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def load_checkpoint(path: str) -> Dict[str, Any]:
+    with open(path, "rb") as f:
+        payload = pickle.load(f)
+
+    version = payload.get("version") if isinstance(payload, dict) else None
+    if version != CHECKPOINT_VERSION:
+        raise ValueError(
+            f"Checkpoint {path} con versión {version!r}; se esperaba {CHECKPOINT_VERSION}"
+        )
+    return payload["state"]
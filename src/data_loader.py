@@ -1,14 +1,28 @@
+from collections.abc import Mapping
 from dataclasses import dataclass
-from typing import Dict, Tuple
+import hashlib
+from typing import Dict, Iterator, List, Optional, Tuple
 import os
 import math
 
+import numpy as np
 import pandas as pd
 
+from distance_oracle import LazyDistanceMatrix, LazyTimeMatrix
+from distance_providers import DistanceProvider, HaversineProvider
+from spatial import build_spatial_index
 
-BASE_DEPOT_FOLDER = os.path.abspath(
-    os.path.join(os.path.dirname(__file__), "..", "data", "Proyecto_Caso_Base")
-)
+
+DATA_FOLDER = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data"))
+
+BASE_DEPOT_FOLDER = os.path.join(DATA_FOLDER, "Proyecto_Caso_Base")
+
+# Instancias del proyecto por nombre (benchmarks, experiments)
+CASES = {
+    "Caso_Base": BASE_DEPOT_FOLDER,
+    "Caso_2": os.path.join(DATA_FOLDER, "Proyecto_Caso_2"),
+    "Caso_3": os.path.join(DATA_FOLDER, "Proyecto_Caso_3"),
+}
 
 
 # =========================
@@ -21,6 +35,7 @@ class Depot:
     code: str
     lon: float
     lat: float
+    capacity: Optional[float] = None    # columna Capacity (None = sin límite)
 
 
 @dataclass
@@ -56,6 +71,19 @@ class MainConfig:
     distance_km: Dict[Tuple[str, str], float] = None
     time_h: Dict[Tuple[str, str], float] = None
 
+    # Modo indexado: el depósito es el nodo 0 y los clientes 1..n
+    node_codes: List[str] = None
+    node_index: Dict[str, int] = None
+    demands: np.ndarray = None
+    dist_matrix: np.ndarray = None
+    time_matrix: np.ndarray = None
+    symmetric: bool = True      # D y T simétricas (Haversine); ver delta_two_opt
+    provider: DistanceProvider = None   # fuente de D y T (build_distance_and_time)
+
+    # Índice espacial y k clientes más cercanos por nodo (ver spatial.py)
+    spatial: object = None
+    candidates: np.ndarray = None
+
     big_m_veh: float = 1e5
     big_m_mtz: float = 1e5
 
@@ -80,12 +108,17 @@ def load_parameters_urban(path: str):
 
     df[param_col] = df[param_col].astype(str).str.strip()
 
+    # Un solo recorrido: nombre en minúsculas -> primer valor que aparece
+    values = {}
+    for name, value in zip(df[param_col].str.lower(), df[value_col]):
+        values.setdefault(name, value)
+
     def get_val(param_name: str):
         """Devuelve el valor del parámetro si existe, o None si no."""
-        mask = df[param_col].str.lower() == param_name.strip().lower()
-        if not mask.any():
+        value = values.get(param_name.strip().lower())
+        if value is None:
             return None
-        return float(df.loc[mask, value_col].iloc[0])
+        return float(value)
 
     # --- parámetros económicos ---
     fuel_price = get_val("fuel_price")
@@ -149,16 +182,9 @@ def load_vehicles(path: str, eff_type: Dict[str, float], fuel_price: float) -> D
 
     fuel_cost_per_km_default = fuel_price / default_eff_km_per_gal
 
-    vehicles: Dict[str, Vehicle] = {}
-
-    for _, row in df.iterrows():
-        numeric_id = int(row["VehicleID"])
-        code = str(row["StandardizedID"])
-
-        capacity = float(row["Capacity"])
-        max_range_km = float(row["Range"])
-
-        vehicles[code] = Vehicle(
+    # Construcción por columnas (sin iterrows)
+    vehicles: Dict[str, Vehicle] = {
+        code: Vehicle(
             numeric_id=numeric_id,
             code=code,
             vehicle_type="generic",
@@ -166,6 +192,13 @@ def load_vehicles(path: str, eff_type: Dict[str, float], fuel_price: float) -> D
             max_range_km=max_range_km,
             fuel_cost_per_km=fuel_cost_per_km_default,
         )
+        for numeric_id, code, capacity, max_range_km in zip(
+            df["VehicleID"].astype(int).tolist(),
+            df["StandardizedID"].tolist(),
+            df["Capacity"].astype(float).tolist(),
+            df["Range"].astype(float).tolist(),
+        )
+    }
 
     return vehicles
 
@@ -174,42 +207,93 @@ def load_vehicles(path: str, eff_type: Dict[str, float], fuel_price: float) -> D
 # Clientes
 # =========================
 
-def load_clients(path: str) -> Dict[str, Client]:
-    df = pd.read_csv(path)
-
+CLIENT_COLUMNS = ["ClientID", "StandardizedID", "Latitude", "Longitude", "Demand"]
+CLIENT_DTYPES = {
+    "ClientID": np.int64,
+    "StandardizedID": str,
+    "Latitude": np.float64,
+    "Longitude": np.float64,
+    "Demand": np.float64,
+}
 
-    df["StandardizedID"] = df["StandardizedID"].astype(str).str.strip().str.lower()
 
-    has_vehicle_restr = "VehicleSizeRestriction" in df.columns
-    if has_vehicle_restr:
-        df["VehicleSizeRestriction"] = (
-            df["VehicleSizeRestriction"]
-            .astype(str)
-            .str.strip()
-            .str.lower()
+@dataclass
+class ClientArrays:
+    """
+    Forma compacta de clients.csv: una columna por arreglo, en orden del archivo.
+    """
+    numeric_id: np.ndarray
+    code: np.ndarray
+    lat: np.ndarray
+    lon: np.ndarray
+    demand: np.ndarray
+
+    def __len__(self):
+        return len(self.numeric_id)
+
+
+def _read_clients_frames(path: str, chunksize: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """
+    Lee solo las columnas necesarias, en un bloque o en trozos de chunksize filas.
+    """
+    kwargs = dict(usecols=CLIENT_COLUMNS, dtype=CLIENT_DTYPES)
+    if chunksize is None:
+        frames = [pd.read_csv(path, **kwargs)]
+    else:
+        frames = pd.read_csv(path, chunksize=chunksize, **kwargs)
+
+    for df in frames:
+        df["StandardizedID"] = df["StandardizedID"].str.strip().str.lower()
+        yield df
+
+
+def load_clients_arrays(path: str, chunksize: Optional[int] = None) -> ClientArrays:
+    """
+    Carga clients.csv directamente a arreglos (sin objetos Client por fila).
+    Con chunksize, el archivo se procesa por trozos.
+    """
+    parts = [
+        (
+            df["ClientID"].to_numpy(),
+            df["StandardizedID"].to_numpy(dtype=object),
+            df["Latitude"].to_numpy(),
+            df["Longitude"].to_numpy(),
+            df["Demand"].to_numpy(),
         )
+        for df in _read_clients_frames(path, chunksize)
+    ]
+    if not parts:
+        empty = np.zeros(0)
+        return ClientArrays(empty.astype(np.int64), empty.astype(object), empty, empty, empty)
+
+    cols = [np.concatenate(col) for col in zip(*parts)]
+    return ClientArrays(*cols)
 
+
+def load_clients(path: str, chunksize: Optional[int] = None) -> Dict[str, Client]:
+    """
+    Clientes por código. Se construyen por columnas (sin iterrows); con
+    chunksize el archivo se lee por trozos para no cargarlo entero en pandas.
+    """
     clients: Dict[str, Client] = {}
-    for _, row in df.iterrows():
-        numeric_id = int(row["ClientID"])
-        code = str(row["StandardizedID"])
-        lat = float(row["Latitude"])
-        lon = float(row["Longitude"])
-        demand = float(row["Demand"])
-
-        clients[code] = Client(
-            numeric_id=numeric_id,
-            code=code,
-            lat=lat,
-            lon=lon,
-            demand=demand
+
+    for df in _read_clients_frames(path, chunksize):
+        clients.update(
+            (code, Client(numeric_id=numeric_id, code=code, lat=lat, lon=lon, demand=demand))
+            for numeric_id, code, lat, lon, demand in zip(
+                df["ClientID"].tolist(),
+                df["StandardizedID"].tolist(),
+                df["Latitude"].tolist(),
+                df["Longitude"].tolist(),
+                df["Demand"].tolist(),
+            )
         )
 
     return clients
 
 
 # =========================
-# Depósitos (solo caso base)
+# Depósitos
 # =========================
 
 def load_depots(path: str) -> Dict[str, Depot]:
@@ -231,6 +315,34 @@ def load_depots(path: str) -> Dict[str, Depot]:
     return depots
 
 
+def load_all_depots(path: str) -> Dict[str, Depot]:
+    """
+    Todos los depósitos de depots.csv por código (en orden del archivo), con
+    su Capacity en unidades de demanda si la columna existe.
+    """
+    df = pd.read_csv(path)
+    capacities = df["Capacity"].tolist() if "Capacity" in df.columns else [None] * len(df)
+
+    depots: Dict[str, Depot] = {}
+    for numeric_id, code, lat, lon, capacity in zip(
+        df["DepotID"].tolist(),
+        df["StandardizedID"].tolist(),
+        df["Latitude"].tolist(),
+        df["Longitude"].tolist(),
+        capacities,
+    ):
+        code = str(code).strip().lower()
+        depots[code] = Depot(
+            numeric_id=int(numeric_id),
+            code=code,
+            lat=float(lat),
+            lon=float(lon),
+            capacity=None if capacity is None else float(capacity),
+        )
+
+    return depots
+
+
 # =========================
 # Distancias Haversine
 # =========================
@@ -248,41 +360,201 @@ def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     return R * c
 
 
-def build_distance_and_time(config: MainConfig, avg_speed_kmh: float = 45.0):
-    #Camaras de velocidad: 50km/h en zonas urbanas -> 45.0 km/h promedio considerando paradas
-    distance_km: Dict[Tuple[str, str], float] = {}
-    time_h: Dict[Tuple[str, str], float] = {}
+def haversine_matrix_km(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """
+    Matriz completa de distancias Haversine (km) en una sola pasada vectorizada.
+    """
+    R = 6371.0
+    phi = np.radians(np.asarray(lats, dtype=np.float64))
+    lam = np.radians(np.asarray(lons, dtype=np.float64))
+
+    dphi = phi[None, :] - phi[:, None]
+    dlambda = lam[None, :] - lam[:, None]
+
+    a = np.sin(dphi / 2.0) ** 2 + np.cos(phi)[:, None] * np.cos(phi)[None, :] * np.sin(dlambda / 2.0) ** 2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
 
-    nodes_coords: Dict[str, Tuple[float, float]] = {}
+    dist = R * c
+    np.fill_diagonal(dist, 0.0)
+    return np.ascontiguousarray(dist)
 
-    for code, c in config.clients.items():
-        nodes_coords[code] = (c.lat, c.lon)
 
-    depot= config.depot
-    nodes_coords[config.depot.code] = (depot.lat, depot.lon)
+class MatrixDictView(Mapping):
+    """
+    Vista tipo dict {(código_i, código_j): valor} sobre una matriz indexada.
+    Mantiene compatible el acceso config.distance_km[(i, j)] de los notebooks.
+    """
 
-    codes = list(nodes_coords.keys())
+    def __init__(self, matrix: np.ndarray, node_index: Dict[str, int]):
+        self.matrix = matrix
+        self.node_index = node_index
 
-    for i in codes:
-        lat_i, lon_i = nodes_coords[i]
-        for j in codes:
-            lat_j, lon_j = nodes_coords[j]
-            if i == j:
-                dist = 0.0
-            else:
-                dist = haversine_km(lat_i, lon_i, lat_j, lon_j)
-            distance_km[(i, j)] = dist
-            time_h[(i, j)] = dist / avg_speed_kmh if avg_speed_kmh > 0 else 0.0
+    def __getitem__(self, key):
+        i, j = key
+        return float(self.matrix[self.node_index[i], self.node_index[j]])
 
-    config.distance_km = distance_km
-    config.time_h = time_h
+    def __contains__(self, key):
+        try:
+            i, j = key
+        except (TypeError, ValueError):
+            return False
+        return i in self.node_index and j in self.node_index
+
+    def __iter__(self):
+        for i in self.node_index:
+            for j in self.node_index:
+                yield (i, j)
+
+    def __len__(self):
+        return len(self.node_index) ** 2
+
+
+# =========================
+# Caché en disco de matrices (memory-mapped)
+# =========================
+
+MATRIX_CACHE_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", ".matrix_cache")
+)
+MATRIX_CACHE_VERSION = b"haversine-v1"
+
+DISTANCE_MODES = ("dense", "lazy")
+
+
+def instance_fingerprint(lats: np.ndarray, lons: np.ndarray, avg_speed_kmh: float,
+                         provider_key: bytes = b"") -> str:
+    """
+    Hash de las coordenadas de los nodos (en orden de índice), la velocidad y
+    el proveedor de distancias (provider_key vacío = Haversine).
+    """
+    h = hashlib.sha256(MATRIX_CACHE_VERSION)
+    h.update(np.ascontiguousarray(lats, dtype=np.float64).tobytes())
+    h.update(np.ascontiguousarray(lons, dtype=np.float64).tobytes())
+    h.update(repr(float(avg_speed_kmh)).encode())
+    if provider_key:
+        h.update(provider_key)
+    return h.hexdigest()[:32]
+
+
+def _save_npy_atomic(path: str, array: np.ndarray):
+    # Escribe a un temporal y renombra: otro proceso nunca ve un archivo a medias
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+def cached_distance_and_time(lats, lons, avg_speed_kmh: float, cache_dir: str,
+                             provider: Optional[DistanceProvider] = None):
+    """
+    Devuelve (dist, time) como np.memmap de solo lectura desde cache_dir; si no
+    existen para este fingerprint, las calcula (con provider, por defecto
+    Haversine) y las guarda primero (.npy). Varios procesos que mapean el
+    mismo archivo comparten las páginas.
+    """
+    if provider is None:
+        provider = HaversineProvider(avg_speed_kmh)
+    os.makedirs(cache_dir, exist_ok=True)
+    key = instance_fingerprint(lats, lons, avg_speed_kmh, provider.cache_key())
+    dist_path = os.path.join(cache_dir, f"{key}_dist.npy")
+    time_path = os.path.join(cache_dir, f"{key}_time.npy")
+
+    if not (os.path.exists(dist_path) and os.path.exists(time_path)):
+        dist, time = provider.table(lats, lons)
+        _save_npy_atomic(dist_path, dist)
+        _save_npy_atomic(time_path, np.ascontiguousarray(time))
+        del dist, time
+
+    return np.load(dist_path, mmap_mode="r"), np.load(time_path, mmap_mode="r")
+
+
+def build_distance_and_time(
+    config: MainConfig,
+    avg_speed_kmh: float = 45.0,
+    cache_dir: Optional[str] = None,
+    distance_mode: str = "dense",
+    memory_budget_mb: float = 256.0,
+    provider: Optional[DistanceProvider] = None,
+):
+    """
+    Construye los índices de nodos y las matrices de distancia (km) y tiempo (h).
+
+    provider (distance_providers.DistanceProvider) da las matrices; None =
+    HaversineProvider(avg_speed_kmh), gran círculo a velocidad constante. Un
+    OSRMTableProvider consulta distancias y tiempos reales por la red vial.
+
+    distance_mode:
+      - "dense": matrices n x n en memoria (o memory-mapped con cache_dir)
+      - "lazy": LazyDistanceMatrix, distancias bajo demanda con una caché de
+        filas acotada por memory_budget_mb; el tiempo se deriva al vuelo
+    """
+    if distance_mode not in DISTANCE_MODES:
+        raise ValueError(
+            f"Modo de distancias desconocido: {distance_mode!r}. Opciones: {DISTANCE_MODES}"
+        )
+    if distance_mode == "lazy" and cache_dir is not None:
+        raise ValueError("cache_dir solo aplica al modo de distancias 'dense'")
+    if distance_mode == "lazy" and provider is not None and not isinstance(provider, HaversineProvider):
+        raise ValueError("distance_mode='lazy' solo calcula distancias Haversine; use 'dense' con provider")
+    if provider is None:
+        provider = HaversineProvider(avg_speed_kmh)
+    if isinstance(provider, HaversineProvider):
+        avg_speed_kmh = provider.avg_speed_kmh
+
+    #Camaras de velocidad: 50km/h en zonas urbanas -> 45.0 km/h promedio considerando paradas
+
+    # Índices enteros: depósito = 0, clientes = 1..n (en el orden del CSV)
+    depot = config.depot
+    node_codes = [depot.code] + list(config.clients.keys())
+    node_index = {code: i for i, code in enumerate(node_codes)}
+
+    lats = np.array([depot.lat] + [c.lat for c in config.clients.values()], dtype=np.float64)
+    lons = np.array([depot.lon] + [c.lon for c in config.clients.values()], dtype=np.float64)
+    demands = np.array([0.0] + [c.demand for c in config.clients.values()], dtype=np.float64)
+
+    if distance_mode == "lazy":
+        dist = LazyDistanceMatrix(lats, lons, memory_budget_mb=memory_budget_mb)
+        time = LazyTimeMatrix(dist, avg_speed_kmh)
+    elif cache_dir is not None:
+        # Matrices desde disco (memory-mapped), calculadas solo la primera vez
+        dist, time = cached_distance_and_time(lats, lons, avg_speed_kmh, cache_dir, provider)
+    else:
+        dist, time = provider.table(lats, lons)
+
+    config.node_codes = node_codes
+    config.node_index = node_index
+    config.demands = demands
+    config.dist_matrix = dist
+    config.time_matrix = time
+    config.provider = provider
+    # Haversine es simétrica por construcción; una red vial en general no
+    config.symmetric = isinstance(provider, HaversineProvider) or (
+        np.array_equal(dist, dist.T) and np.array_equal(time, time.T)
+    )
+
+    config.distance_km = MatrixDictView(config.dist_matrix, node_index)
+    config.time_h = MatrixDictView(config.time_matrix, node_index)
 
 
 # =========================
 # Carga completa de instancia
 # =========================
 
-def load_instance(folder_path: str) -> MainConfig:
+def load_instance(
+    folder_path: str,
+    neighbors_k: int = 10,
+    cache_dir: Optional[str] = None,
+    distance_mode: str = "dense",
+    memory_budget_mb: float = 256.0,
+    provider: Optional[DistanceProvider] = None,
+) -> MainConfig:
+    """
+    Carga una instancia completa. Con cache_dir (p. ej. MATRIX_CACHE_DIR) las
+    matrices de distancia/tiempo se guardan en disco la primera vez y luego
+    se mapean en memoria en lugar de recalcularse. distance_mode="lazy" evita
+    la matriz n x n y provider cambia la fuente de las distancias (ver
+    build_distance_and_time).
+    """
     folder_path = os.path.abspath(folder_path)
     files = os.listdir(folder_path)
     param_file = [f for f in files if f.startswith("parameters")][0]
@@ -311,6 +583,16 @@ def load_instance(folder_path: str) -> MainConfig:
         depot=depot,
     )
 
-    build_distance_and_time(config)
+    build_distance_and_time(
+        config,
+        cache_dir=cache_dir,
+        distance_mode=distance_mode,
+        memory_budget_mb=memory_budget_mb,
+        provider=provider,
+    )
+
+    # Índice espacial + listas de candidatos (neighbors_k=0 lo desactiva)
+    if neighbors_k:
+        build_spatial_index(config, k=neighbors_k)
 
     return config
@@ -0,0 +1,283 @@
+# decomposition.py
+# Multi-depósito "cluster first, route second": asignar clientes a depósitos
+# (respetando Capacity) y resolver un CVRP por depósito en paralelo
+
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from data_loader import (
+    BASE_DEPOT_FOLDER,
+    Client,
+    Depot,
+    MainConfig,
+    build_distance_and_time,
+    load_all_depots,
+    load_instance,
+)
+from distance_oracle import haversine_pairs_km
+from distance_providers import DistanceProvider, HaversineProvider
+from evaluation import evaluate_solution
+from ga_algorithm import GeneticAlgorithm
+from parallel import spawn_seeds
+from spatial import build_spatial_index
+
+
+@dataclass
+class DepotRegion:
+    depot: Depot
+    clients: Dict[str, Client] = field(default_factory=dict)
+
+    @property
+    def demand(self) -> float:
+        return sum(c.demand for c in self.clients.values())
+
+
+@dataclass
+class MultiDepotSolution:
+    """
+    Solución combinada: parts[k] = (config de la región k, su mejor solución).
+    Cada ruta sale y vuelve a su propio depósito. El costo es la suma de los
+    costos por región (los costos fijos y variables son por ruta).
+    """
+
+    parts: list
+    cost: float
+    is_feasible: bool
+    region_costs: List[float] = field(default_factory=list)
+    histories: List[List[float]] = field(default_factory=list)
+
+    @property
+    def routes(self) -> list:
+        return [route for _, solution in self.parts for route in solution.routes]
+
+
+# =========================
+# Carga
+# =========================
+
+def load_multi_depot(
+    folder_path: str,
+    memory_budget_mb: float = 256.0,
+    provider: Optional[DistanceProvider] = None,
+):
+    """
+    (config, depósitos) de una instancia con su propio depots.csv (casos 2 y
+    3). El config no construye la matriz n x n (distance_mode="lazy", sin
+    índice espacial): cada región arma las suyas al resolverse, con provider
+    (queda en config.provider; None = Haversine). Si la carpeta no trae
+    depots.csv se usa el del caso base.
+    """
+    config = load_instance(
+        folder_path, neighbors_k=0, distance_mode="lazy", memory_budget_mb=memory_budget_mb
+    )
+    if provider is not None:
+        config.provider = provider
+    depots_path = os.path.join(folder_path, "depots.csv")
+    if not os.path.exists(depots_path):
+        depots_path = os.path.join(BASE_DEPOT_FOLDER, "depots.csv")
+    return config, load_all_depots(depots_path)
+
+
+# =========================
+# Asignación cliente → depósito
+# =========================
+
+def assign_clients(config: MainConfig, depots: Dict[str, Depot]) -> Dict[str, str]:
+    """
+    Código de cliente → código de depósito. Cada cliente va al depósito más
+    cercano que aún tenga Capacity para su demanda. Los clientes se atienden
+    por "arrepentimiento" decreciente (distancia al segundo depósito menos
+    distancia al primero), así los que más pierden si su depósito se llena
+    eligen antes. Depósitos sin Capacity no tienen límite.
+
+    O(n·m log m) para n clientes y m depósitos. Lanza ValueError si algún
+    cliente no cabe en ningún depósito.
+    """
+    codes = list(config.clients.keys())
+    depot_codes = list(depots.keys())
+    if not codes:
+        return {}
+
+    c_lat = np.radians([config.clients[c].lat for c in codes])[:, None]
+    c_lon = np.radians([config.clients[c].lon for c in codes])[:, None]
+    d_lat = np.radians([d.lat for d in depots.values()])[None, :]
+    d_lon = np.radians([d.lon for d in depots.values()])[None, :]
+    dist = haversine_pairs_km(c_lat, c_lon, d_lat, d_lon)        # n x m
+
+    preference = np.argsort(dist, axis=1, kind="stable")
+    if len(depot_codes) > 1:
+        ranked = np.take_along_axis(dist, preference[:, :2], axis=1)
+        regret = ranked[:, 1] - ranked[:, 0]
+    else:
+        regret = np.zeros(len(codes))
+    order = np.argsort(-regret, kind="stable")
+
+    remaining = [np.inf if d.capacity is None else d.capacity for d in depots.values()]
+    assignment: Dict[str, str] = {}
+    unassigned = []
+    for i in order.tolist():
+        demand = config.clients[codes[i]].demand
+        for j in preference[i].tolist():
+            if remaining[j] >= demand:
+                remaining[j] -= demand
+                assignment[codes[i]] = depot_codes[j]
+                break
+        else:
+            unassigned.append(codes[i])
+
+    if unassigned:
+        total = sum(c.demand for c in config.clients.values())
+        capacity = sum(np.inf if d.capacity is None else d.capacity for d in depots.values())
+        raise ValueError(
+            f"{len(unassigned)} clientes no caben en ningún depósito "
+            f"(demanda total {total:g}, capacidad total {capacity:g}): {unassigned[:10]}"
+        )
+
+    # Devolver en el orden original de los clientes
+    return {code: assignment[code] for code in codes}
+
+
+def build_regions(
+    config: MainConfig,
+    depots: Dict[str, Depot],
+    assignment: Optional[Dict[str, str]] = None,
+) -> List[DepotRegion]:
+    """
+    Una región por depósito con clientes asignados (en el orden de depots.csv).
+    """
+    if assignment is None:
+        assignment = assign_clients(config, depots)
+
+    regions = {code: DepotRegion(depot=depot) for code, depot in depots.items()}
+    for code, depot_code in assignment.items():
+        regions[depot_code].clients[code] = config.clients[code]
+    return [r for r in regions.values() if r.clients]
+
+
+def region_config(
+    config: MainConfig,
+    region: DepotRegion,
+    distance_mode: str = "dense",
+    neighbors_k: int = 10,
+    memory_budget_mb: float = 256.0,
+    provider: Optional[DistanceProvider] = None,
+) -> MainConfig:
+    """
+    MainConfig del sub-CVRP de la región: mismos parámetros de costo y la
+    misma flota que la instancia (Q, rango y combustible representativos
+    iguales a los del problema completo), con el depósito de la región y solo
+    sus clientes; matrices de tamaño (clientes de la región + 1)² desde
+    provider (None = config.provider, el de la instancia).
+    """
+    sub = copy.copy(config)
+    sub.depot = region.depot
+    sub.clients = dict(region.clients)
+    sub.spatial = None
+    sub.candidates = None
+
+    build_distance_and_time(
+        sub,
+        distance_mode=distance_mode,
+        memory_budget_mb=memory_budget_mb,
+        provider=provider if provider is not None else config.provider,
+    )
+    if neighbors_k:
+        build_spatial_index(sub, k=neighbors_k)
+    return sub
+
+
+# =========================
+# Resolución en paralelo
+# =========================
+
+def _solve_region(skeleton: MainConfig, region: DepotRegion, seed: int, load_kwargs: dict,
+                  ga_kwargs: dict):
+    # Las matrices de la región se construyen en el trabajador: solo viajan
+    # los clientes de la región y el resultado
+    config = region_config(skeleton, region, **load_kwargs)
+    ga = GeneticAlgorithm(config, seed=seed, **{"verbose": False, **ga_kwargs})
+    best, history = ga.evolve()
+    return best, history
+
+
+def solve_multi_depot(
+    config: MainConfig,
+    depots: Dict[str, Depot],
+    assignment: Optional[Dict[str, str]] = None,
+    workers: Optional[int] = None,
+    seed: Optional[int] = None,
+    distance_mode: str = "dense",
+    neighbors_k: int = 10,
+    memory_budget_mb: float = 256.0,
+    provider: Optional[DistanceProvider] = None,
+    **ga_kwargs,
+) -> MultiDepotSolution:
+    """
+    Asigna clientes a depósitos (assign_clients, o la asignación dada),
+    resuelve el sub-CVRP de cada depósito con GeneticAlgorithm en un pool de
+    workers procesos (None = todos los núcleos) y junta los resultados.
+
+    distance_mode / neighbors_k / memory_budget_mb / provider se aplican a
+    las matrices de cada región (provider None = config.provider); un
+    proveedor que no sea Haversine requiere distance_mode="dense". ga_kwargs van a cada GeneticAlgorithm (pop_size,
+    generations, compact, split, ...). Cada región usa una semilla derivada
+    de seed, así que el resultado no depende de workers.
+    """
+    if provider is None:
+        provider = config.provider
+    regions = build_regions(config, depots, assignment)
+    seeds = spawn_seeds(seed, len(regions))
+    load_kwargs = {
+        "distance_mode": distance_mode,
+        "neighbors_k": neighbors_k,
+        "memory_budget_mb": memory_budget_mb,
+        "provider": provider,
+    }
+
+    # Esqueleto sin matrices: lo único del problema completo que viaja
+    skeleton = copy.copy(config)
+    skeleton.clients = {}
+    for name in ("distance_km", "time_h", "node_codes", "node_index", "demands",
+                 "dist_matrix", "time_matrix", "spatial", "candidates"):
+        setattr(skeleton, name, None)
+
+    workers = min(workers or os.cpu_count() or 1, len(regions))
+    args = [(skeleton, region, s, load_kwargs, ga_kwargs) for region, s in zip(regions, seeds)]
+    if workers <= 1:
+        results = [_solve_region(*a) for a in args]
+    else:
+        # Regiones más grandes primero para equilibrar la carga del pool
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                k: executor.submit(_solve_region, *args[k])
+                for k in sorted(range(len(args)), key=lambda k: -len(regions[k].clients))
+            }
+            results = [futures[k].result() for k in range(len(args))]
+
+    # Costos re-evaluados en configs livianos (perezosos: mismos valores que
+    # las matrices densas) para poder exportar sin guardar matrices n²; con
+    # otro proveedor las matrices de la región se vuelven a pedir (densas)
+    lazy = provider is None or isinstance(provider, HaversineProvider)
+    parts = []
+    region_costs = []
+    is_feasible = True
+    for region, (best, _history) in zip(regions, results):
+        sub = region_config(skeleton, region, distance_mode="lazy" if lazy else "dense",
+                            neighbors_k=0, memory_budget_mb=memory_budget_mb, provider=provider)
+        cost = evaluate_solution(best, sub)
+        parts.append((sub, best))
+        region_costs.append(cost)
+        is_feasible = is_feasible and best.is_feasible
+
+    return MultiDepotSolution(
+        parts=parts,
+        cost=sum(region_costs),
+        is_feasible=is_feasible,
+        region_costs=region_costs,
+        histories=[history for _, history in results],
+    )
@@ -0,0 +1,334 @@
+# delta_evaluation.py
+# Evaluación incremental de movimientos (swap, relocate, or-opt, 2-opt) para CVRP
+
+from typing import List
+
+import numpy as np
+
+from data_loader import MainConfig
+from representation import IndexedSolution
+from evaluation import (
+    get_representative_capacity,
+    get_representative_fuel_cost_per_km,
+    get_representative_max_range_km,
+    route_summary,
+    total_cost_from_summaries,
+    _route_indices,
+)
+
+
+class RouteSummary:
+    """
+    Resumen cacheado de una ruta: distancia, tiempo, carga y su costo
+    (C_fixed + variables + penalizaciones big_m_veh).
+    """
+
+    __slots__ = ("distance", "time", "load", "cost")
+
+    def __init__(self, distance: float, time: float, load: float, cost: float):
+        self.distance = distance
+        self.time = time
+        self.load = load
+        self.cost = cost
+
+
+class IncrementalEvaluator:
+    """
+    Mantiene las rutas (listas de índices de clientes, sin depósito) y un
+    RouteSummary por ruta. Los delta_* calculan en O(1) el cambio de costo de
+    un movimiento a partir de los arcos que cambian; los apply_* lo aplican y
+    recalculan solo las rutas afectadas, con la misma suma que
+    evaluate_solution, por lo que self.cost coincide exactamente con ella.
+
+    Posiciones: routes[r][i] es el i-ésimo cliente de la ruta r.
+    Con matrices asimétricas (config.symmetric=False, p. ej. OSRMTableProvider)
+    el delta de 2-opt suma además el cambio de sentido de los arcos internos
+    del tramo invertido, O(largo del tramo) en vez de O(1).
+    """
+
+    def __init__(self, solution, config: MainConfig):
+        self.config = config
+        self.D = config.dist_matrix
+        self.T = config.time_matrix
+        self.q = config.demands
+        self.symmetric = getattr(config, "symmetric", True)
+
+        self.Q = get_representative_capacity(config)
+        self.R = get_representative_max_range_km(config)
+        self.per_km = config.C_dist + get_representative_fuel_cost_per_km(config)
+
+        self.routes: List[List[int]] = [
+            idx[1:-1].tolist() for idx in _route_indices(solution, config)
+        ]
+        self.summaries: List[RouteSummary] = [self._summarize(r) for r in self.routes]
+
+        # Rutas tocadas por el último delta_*: (ruta, distancia_nueva, carga_nueva)
+        self.last_move = []
+
+    # --------------------------------------------------------
+    # Resúmenes y costo
+    # --------------------------------------------------------
+
+    def _route_cost(self, distance: float, time: float, load: float, empty: bool) -> float:
+        if empty:
+            return 0.0
+        cost = (
+            self.config.C_fixed
+            + self.per_km * distance
+            + self.config.C_time * time
+        )
+        if load > self.Q:
+            cost += self.config.big_m_veh * (load - self.Q)
+        if distance > self.R:
+            cost += self.config.big_m_veh * (distance - self.R)
+        return cost
+
+    def _summarize(self, route: List[int]) -> RouteSummary:
+        if not route:
+            return RouteSummary(0.0, 0.0, 0.0, 0.0)
+        idx = np.zeros(len(route) + 2, dtype=np.intp)
+        idx[1:-1] = route
+        d, t, load = route_summary(idx, self.config)
+        return RouteSummary(d, t, load, self._route_cost(d, t, load, False))
+
+    def _delta_route(self, r: int, dd: float, dt: float, dload: float, empty: bool = False) -> float:
+        s = self.summaries[r]
+        new_cost = self._route_cost(s.distance + dd, s.time + dt, s.load + dload, empty)
+        if not empty:
+            self.last_move.append((r, s.distance + dd, s.load + dload))
+        return new_cost - s.cost
+
+    def move_respects_limits(self) -> bool:
+        """
+        True si el último movimiento evaluado no crea ni empeora excesos de
+        capacidad Q o rango R en las rutas que toca.
+        """
+        for r, distance, load in self.last_move:
+            s = self.summaries[r]
+            if load > self.Q and load > s.load:
+                return False
+            if distance > self.R and distance > s.distance:
+                return False
+        return True
+
+    @property
+    def cost(self) -> float:
+        summaries = [(s.distance, s.time, s.load) for r, s in zip(self.routes, self.summaries) if r]
+        return total_cost_from_summaries(summaries, self.config)[0]
+
+    @property
+    def is_feasible(self) -> bool:
+        return all(
+            s.load <= self.Q and s.distance <= self.R
+            for r, s in zip(self.routes, self.summaries) if r
+        )
+
+    def route_is_feasible(self, r: int) -> bool:
+        s = self.summaries[r]
+        return s.load <= self.Q and s.distance <= self.R
+
+    def to_solution(self) -> IndexedSolution:
+        tour = []
+        breaks = [0]
+        for route in self.routes:
+            if route:
+                tour.extend(route)
+                breaks.append(len(tour))
+        solution = IndexedSolution(tour, breaks)
+        solution.cost = self.cost
+        solution.is_feasible = self.is_feasible
+        return solution
+
+    # --------------------------------------------------------
+    # Utilidades de arcos
+    # --------------------------------------------------------
+
+    def _neighbors(self, route: List[int], i: int):
+        prev = route[i - 1] if i > 0 else 0
+        nxt = route[i + 1] if i + 1 < len(route) else 0
+        return prev, nxt
+
+    def _edges(self, removed, added):
+        """
+        Cambio de (distancia, tiempo) al quitar y agregar arcos (a, b).
+        """
+        D = self.D
+        T = self.T
+        dd = 0.0
+        dt = 0.0
+        for a, b in added:
+            dd += D[a, b]
+            dt += T[a, b]
+        for a, b in removed:
+            dd -= D[a, b]
+            dt -= T[a, b]
+        return float(dd), float(dt)
+
+    # --------------------------------------------------------
+    # Swap: intercambia routes[r1][i] con routes[r2][j]
+    # --------------------------------------------------------
+
+    def delta_swap(self, r1: int, i: int, r2: int, j: int) -> float:
+        self.last_move = []
+        if r1 == r2:
+            if i == j:
+                return 0.0
+            if i > j:
+                i, j = j, i
+            route = self.routes[r1]
+            a, b = route[i], route[j]
+            pa, na = self._neighbors(route, i)
+            pb, nb = self._neighbors(route, j)
+            if j == i + 1:
+                dd, dt = self._edges(
+                    removed=[(pa, a), (a, b), (b, nb)],
+                    added=[(pa, b), (b, a), (a, nb)],
+                )
+            else:
+                dd, dt = self._edges(
+                    removed=[(pa, a), (a, na), (pb, b), (b, nb)],
+                    added=[(pa, b), (b, na), (pb, a), (a, nb)],
+                )
+            return self._delta_route(r1, dd, dt, 0.0)
+
+        route1 = self.routes[r1]
+        route2 = self.routes[r2]
+        a, b = route1[i], route2[j]
+        pa, na = self._neighbors(route1, i)
+        pb, nb = self._neighbors(route2, j)
+
+        dd1, dt1 = self._edges(removed=[(pa, a), (a, na)], added=[(pa, b), (b, na)])
+        dd2, dt2 = self._edges(removed=[(pb, b), (b, nb)], added=[(pb, a), (a, nb)])
+        dq = float(self.q[b] - self.q[a])
+
+        return self._delta_route(r1, dd1, dt1, dq) + self._delta_route(r2, dd2, dt2, -dq)
+
+    def apply_swap(self, r1: int, i: int, r2: int, j: int):
+        route1 = self.routes[r1]
+        route2 = self.routes[r2]
+        route1[i], route2[j] = route2[j], route1[i]
+        self._refresh(r1, r2)
+
+    # --------------------------------------------------------
+    # Relocate: saca routes[r1][i] y lo inserta en la posición j de r2
+    # (j se interpreta sobre r2 ya sin el cliente cuando r1 == r2)
+    # --------------------------------------------------------
+
+    def _insertion_neighbors(self, r1: int, i: int, r2: int, j: int):
+        route = self.routes[r2]
+        if r1 != r2:
+            u = route[j - 1] if j > 0 else 0
+            v = route[j] if j < len(route) else 0
+            return u, v
+
+        # Vecinos en la ruta reducida (sin la posición i) sin copiarla
+        def reduced(k):
+            return route[k] if k < i else route[k + 1]
+
+        n_reduced = len(route) - 1
+        u = reduced(j - 1) if j > 0 else 0
+        v = reduced(j) if j < n_reduced else 0
+        return u, v
+
+    def delta_relocate(self, r1: int, i: int, r2: int, j: int) -> float:
+        self.last_move = []
+        route1 = self.routes[r1]
+        a = route1[i]
+        pa, na = self._neighbors(route1, i)
+        u, v = self._insertion_neighbors(r1, i, r2, j)
+
+        if r1 == r2:
+            if j == i:
+                return 0.0
+            dd, dt = self._edges(
+                removed=[(pa, a), (a, na), (u, v)],
+                added=[(pa, na), (u, a), (a, v)],
+            )
+            return self._delta_route(r1, dd, dt, 0.0)
+
+        qa = float(self.q[a])
+        dd1, dt1 = self._edges(removed=[(pa, a), (a, na)], added=[(pa, na)])
+        dd2, dt2 = self._edges(removed=[(u, v)], added=[(u, a), (a, v)])
+
+        emptied = len(route1) == 1
+        return (
+            self._delta_route(r1, dd1, dt1, -qa, empty=emptied)
+            + self._delta_route(r2, dd2, dt2, qa, empty=False)
+        )
+
+    def apply_relocate(self, r1: int, i: int, r2: int, j: int):
+        a = self.routes[r1].pop(i)
+        self.routes[r2].insert(j, a)
+        self._refresh(r1, r2)
+
+    # --------------------------------------------------------
+    # Or-opt intra-ruta: mueve el segmento routes[r][i:i+length] (sin
+    # invertirlo) a la posición j de la ruta ya sin el segmento
+    # --------------------------------------------------------
+
+    def delta_or_opt(self, r: int, i: int, length: int, j: int) -> float:
+        self.last_move = []
+        route = self.routes[r]
+        if j == i or length <= 0 or i + length > len(route):
+            return 0.0
+
+        s1 = route[i]
+        sl = route[i + length - 1]
+        p = route[i - 1] if i > 0 else 0
+        n = route[i + length] if i + length < len(route) else 0
+
+        def reduced(k):
+            return route[k] if k < i else route[k + length]
+
+        n_reduced = len(route) - length
+        u = reduced(j - 1) if j > 0 else 0
+        v = reduced(j) if j < n_reduced else 0
+
+        dd, dt = self._edges(
+            removed=[(p, s1), (sl, n), (u, v)],
+            added=[(p, n), (u, s1), (sl, v)],
+        )
+        return self._delta_route(r, dd, dt, 0.0)
+
+    def apply_or_opt(self, r: int, i: int, length: int, j: int):
+        route = self.routes[r]
+        segment = route[i:i + length]
+        del route[i:i + length]
+        route[j:j] = segment
+        self._refresh(r)
+
+    # --------------------------------------------------------
+    # 2-opt intra-ruta: invierte routes[r][i..j]
+    # --------------------------------------------------------
+
+    def delta_two_opt(self, r: int, i: int, j: int) -> float:
+        self.last_move = []
+        if i > j:
+            i, j = j, i
+        if i == j:
+            return 0.0
+        route = self.routes[r]
+        p = route[i - 1] if i > 0 else 0
+        n = route[j + 1] if j + 1 < len(route) else 0
+        removed = [(p, route[i]), (route[j], n)]
+        added = [(p, route[j]), (route[i], n)]
+        if not self.symmetric:
+            # Los arcos internos (a, b) pasan a recorrerse como (b, a)
+            for k in range(i, j):
+                removed.append((route[k], route[k + 1]))
+                added.append((route[k + 1], route[k]))
+        dd, dt = self._edges(removed=removed, added=added)
+        return self._delta_route(r, dd, dt, 0.0)
+
+    def apply_two_opt(self, r: int, i: int, j: int):
+        if i > j:
+            i, j = j, i
+        route = self.routes[r]
+        route[i:j + 1] = route[i:j + 1][::-1]
+        self._refresh(r)
+
+    # --------------------------------------------------------
+
+    def _refresh(self, *route_ids: int):
+        for r in set(route_ids):
+            self.summaries[r] = self._summarize(self.routes[r])
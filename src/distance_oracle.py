@@ -0,0 +1,182 @@
+# distance_oracle.py
+# Distancias Haversine bajo demanda (sin matriz n x n) con caché LRU de filas
+
+from collections import OrderedDict
+from typing import Tuple
+
+import numpy as np
+
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_pairs_km(phi_a, lam_a, phi_b, lam_b) -> np.ndarray:
+    """
+    Distancia Haversine (km) elemento a elemento entre puntos ya en radianes.
+    Misma secuencia de operaciones que haversine_matrix_km, por lo que los
+    valores coinciden con los de la matriz densa.
+    """
+    dphi = phi_b - phi_a
+    dlambda = lam_b - lam_a
+
+    a = np.sin(dphi / 2.0) ** 2 + np.cos(phi_a) * np.cos(phi_b) * np.sin(dlambda / 2.0) ** 2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    return EARTH_RADIUS_KM * c
+
+
+class LazyDistanceMatrix:
+    """
+    Sustituto de config.dist_matrix para instancias grandes: no guarda los n²
+    pares, los calcula al pedirlos.
+
+      - D[i, j] con enteros: si la fila i (o la j, por simetría) está en la
+        caché LRU se responde desde ahí; si no, se calcula solo ese par. Una
+        fila pedida hot_after veces se calcula completa (vectorizada) y entra
+        a la caché, así las filas calientes como la del depósito se calculan
+        una sola vez.
+      - D[a, b] con arreglos (broadcast como en NumPy): se calculan solo los
+        pares pedidos, sin pasar por la caché.
+      - D[i, :], D[1:, 1:], ...: las rebanadas se expanden a bloque.
+
+    memory_budget_mb acota lo que ocupa la caché de filas (mínimo una fila).
+    """
+
+    def __init__(self, lats, lons, memory_budget_mb: float = 256.0, hot_after: int = 16):
+        self.phi = np.radians(np.asarray(lats, dtype=np.float64))
+        self.lam = np.radians(np.asarray(lons, dtype=np.float64))
+        self.n = len(self.phi)
+        self.shape = (self.n, self.n)
+        self.dtype = np.dtype(np.float64)
+
+        self.memory_budget_mb = memory_budget_mb
+        row_bytes = 8 * max(1, self.n)
+        self.max_rows = max(1, int(memory_budget_mb * 1024 * 1024) // row_bytes)
+        self._rows: "OrderedDict[int, np.ndarray]" = OrderedDict()
+        self.hot_after = hot_after
+        self._touches = np.zeros(self.n, dtype=np.int32)
+
+        # estadísticas de la caché de filas
+        self.row_hits = 0
+        self.row_misses = 0
+
+    def __len__(self):
+        return self.n
+
+    # --------------------------------------------------------
+    # Caché de filas
+    # --------------------------------------------------------
+
+    def row(self, i: int) -> np.ndarray:
+        """
+        Fila i completa (solo lectura), desde la caché LRU si está.
+        """
+        i = int(i)
+        row = self._rows.get(i)
+        if row is not None:
+            self.row_hits += 1
+            self._rows.move_to_end(i)
+            return row
+
+        self.row_misses += 1
+        row = haversine_pairs_km(self.phi[i], self.lam[i], self.phi, self.lam)
+        row[i] = 0.0
+        row.flags.writeable = False
+
+        self._rows[i] = row
+        if len(self._rows) > self.max_rows:
+            self._rows.popitem(last=False)
+        return row
+
+    def cache_nbytes(self) -> int:
+        return sum(r.nbytes for r in self._rows.values())
+
+    def clear_cache(self):
+        self._rows.clear()
+
+    # --------------------------------------------------------
+    # Indexación
+    # --------------------------------------------------------
+
+    def pairs(self, a, b) -> np.ndarray:
+        """
+        Distancias entre los pares (a, b) con broadcast de NumPy.
+        """
+        a = np.asarray(a, dtype=np.intp)
+        b = np.asarray(b, dtype=np.intp)
+        scalar = a.ndim == 0 and b.ndim == 0
+        # Siempre por la ruta vectorizada (también un solo par): el seno/coseno
+        # escalar de NumPy puede diferir en el último bit del vectorizado
+        a, b = np.atleast_1d(a), np.atleast_1d(b)
+        out = haversine_pairs_km(self.phi[a], self.lam[a], self.phi[b], self.lam[b])
+        out[np.broadcast_to(a == b, out.shape)] = 0.0
+        return out[0] if scalar else out
+
+    def _lookup(self, i: int, j: int) -> float:
+        row = self._rows.get(i)
+        if row is not None:
+            self.row_hits += 1
+            self._rows.move_to_end(i)
+            return row[j]
+        row = self._rows.get(j)
+        if row is not None:
+            self.row_hits += 1
+            self._rows.move_to_end(j)
+            return row[i]
+
+        self._touches[i] += 1
+        if self._touches[i] >= self.hot_after:
+            self._touches[i] = 0
+            return self.row(i)[j]
+        return self.pairs(i, j)
+
+    def _expand(self, key) -> Tuple[object, object]:
+        i, j = key
+        if isinstance(i, slice) or isinstance(j, slice):
+            # rebanadas -> bloque externo (misma forma que en una matriz densa)
+            rows = np.arange(self.n)[i] if isinstance(i, slice) else np.asarray(i)
+            cols = np.arange(self.n)[j] if isinstance(j, slice) else np.asarray(j)
+            if isinstance(i, slice) and isinstance(j, slice):
+                return rows[:, None], cols[None, :]
+            return rows, cols
+        return i, j
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple) or len(key) != 2:
+            return self.row(key)
+
+        i, j = key
+        if isinstance(i, (int, np.integer)):
+            if isinstance(j, (int, np.integer)):
+                return self._lookup(int(i), int(j))
+            if not isinstance(j, slice) and i in self._rows:
+                return self.row(i)[np.asarray(j, dtype=np.intp)]
+        return self.pairs(*self._expand(key))
+
+    def __getstate__(self):
+        # la caché no viaja a los procesos trabajadores
+        state = self.__dict__.copy()
+        state["_rows"] = OrderedDict()
+        state["_touches"] = np.zeros(self.n, dtype=np.int32)
+        return state
+
+
+class LazyTimeMatrix:
+    """
+    Tiempos (h) derivados al vuelo de un LazyDistanceMatrix: T = D / velocidad.
+    No guarda una segunda matriz ni una segunda caché.
+    """
+
+    def __init__(self, distances: LazyDistanceMatrix, avg_speed_kmh: float):
+        self.distances = distances
+        self.avg_speed_kmh = avg_speed_kmh
+        self.shape = distances.shape
+        self.dtype = distances.dtype
+
+    def __len__(self):
+        return len(self.distances)
+
+    def __getitem__(self, key):
+        d = self.distances[key]
+        if self.avg_speed_kmh > 0:
+            return d / self.avg_speed_kmh
+        return d * 0.0
@@ -0,0 +1,373 @@
+# distance_providers.py
+# Proveedores de matrices distancia/tiempo: Haversine (por defecto) o un
+# servicio de ruteo HTTP tipo OSRM (/table) con teselas, keep-alive, hilos,
+# reintentos y caché en disco por par de coordenadas
+
+import http.client
+import json
+import math
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from distance_oracle import haversine_pairs_km
+
+
+class DistanceProvider:
+    """
+    Interfaz: table(lats, lons) → (distancias en km, tiempos en h), ambas
+    n x n float64 con diagonal 0. cache_key() identifica el proveedor en la
+    caché de matrices de data_loader (b"" = la de Haversine de siempre).
+    """
+
+    def table(self, lats, lons) -> Tuple[np.ndarray, np.ndarray]:
+        raise NotImplementedError
+
+    def cache_key(self) -> bytes:
+        raise NotImplementedError
+
+
+class HaversineProvider(DistanceProvider):
+    """
+    Distancia de gran círculo y velocidad constante (45 km/h por defecto:
+    50 km/h urbanos menos las paradas). Mismos valores que haversine_matrix_km.
+    """
+
+    def __init__(self, avg_speed_kmh: float = 45.0):
+        self.avg_speed_kmh = avg_speed_kmh
+
+    def table(self, lats, lons) -> Tuple[np.ndarray, np.ndarray]:
+        phi = np.radians(np.asarray(lats, dtype=np.float64))
+        lam = np.radians(np.asarray(lons, dtype=np.float64))
+
+        dist = haversine_pairs_km(phi[:, None], lam[:, None], phi[None, :], lam[None, :])
+        np.fill_diagonal(dist, 0.0)
+        dist = np.ascontiguousarray(dist)
+
+        if self.avg_speed_kmh > 0:
+            time_h = np.ascontiguousarray(dist / self.avg_speed_kmh)
+        else:
+            time_h = np.zeros_like(dist)
+        return dist, time_h
+
+    def cache_key(self) -> bytes:
+        return b""
+
+
+# =========================
+# Caché en disco por par de coordenadas
+# =========================
+
+def _point_key(lat: float, lon: float) -> str:
+    # ~11 cm de resolución; evita fallos de caché por ruido de flotantes
+    return f"{lat:.6f},{lon:.6f}"
+
+
+class PairCache:
+    """
+    Distancia (km) y tiempo (h) por par (origen, destino) de coordenadas en
+    un archivo SQLite, separado por perfil del servicio. Sobrevive entre
+    corridas y entre instancias que comparten puntos (mismos depósitos,
+    clientes repetidos). Solo se usa desde el hilo que lo creó.
+
+    Los pares sin ruta también se guardan (routable = 0, distancia y tiempo
+    NULL): lookup los devuelve como (nan, nan), así que una tesela con puntos
+    fuera de la red no se vuelve a pedir en cada corrida.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        # pairs_v2: la tabla "pairs" anterior no admitía pares sin ruta
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pairs_v2 ("
+            " profile TEXT NOT NULL, src TEXT NOT NULL, dst TEXT NOT NULL,"
+            " distance_km REAL, time_h REAL, routable INTEGER NOT NULL,"
+            " PRIMARY KEY (profile, src, dst)) WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+    def lookup(self, profile: str, srcs: List[str], dsts: List[str]) -> Dict[Tuple[str, str], Tuple[float, float]]:
+        found = {}
+        dst_marks = ",".join("?" for _ in dsts)
+        # por trozos de orígenes: SQLite limita el número de parámetros
+        step = max(1, 900 - len(dsts))
+        for k in range(0, len(srcs), step):
+            chunk = srcs[k:k + step]
+            query = (
+                "SELECT src, dst, distance_km, time_h, routable FROM pairs_v2 WHERE profile = ?"
+                f" AND src IN ({','.join('?' for _ in chunk)}) AND dst IN ({dst_marks})"
+            )
+            for src, dst, d, t, routable in self._conn.execute(query, [profile, *chunk, *dsts]):
+                found[(src, dst)] = (d, t) if routable else (math.nan, math.nan)
+        return found
+
+    def store(self, profile: str, rows):
+        """
+        rows: (src, dst, distancia, tiempo); un NaN en cualquiera de los dos
+        marca el par como sin ruta.
+        """
+        def record(src, dst, d, t):
+            if math.isnan(d) or math.isnan(t):
+                return profile, src, dst, None, None, 0
+            return profile, src, dst, float(d), float(t), 1
+
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO pairs_v2 VALUES (?, ?, ?, ?, ?, ?)",
+                (record(*row) for row in rows),
+            )
+
+    def close(self):
+        self._conn.close()
+
+
+# =========================
+# Servicio HTTP tipo OSRM
+# =========================
+
+class RoutingServiceError(RuntimeError):
+    pass
+
+
+class OSRMTableProvider(DistanceProvider):
+    """
+    Matrices desde un servicio propio con la API /table de OSRM:
+
+        GET {base_url}/table/v1/{profile}/{lon,lat;...}
+            ?sources=..&destinations=..&annotations=distance,duration
+
+    (metros y segundos; se guardan en km y h).
+
+    La matriz n x n se parte en teselas de tile_size orígenes por tile_size
+    destinos; cada tesela es una consulta muchos-a-muchos con a lo sumo
+    2 * tile_size coordenadas (OSRM limita max-table-size, 100 por defecto).
+    Las teselas corren en max_workers hilos; cada hilo reutiliza su conexión
+    HTTP/1.1 keep-alive. Un fallo de red, 429 o 5xx se reintenta hasta
+    retries veces con espera exponencial (backoff, 2·backoff, ...).
+
+    Con cache_path, cada par ya consultado se guarda en un SQLite (PairCache),
+    con o sin ruta, y las teselas completas en caché no se piden. Los pares
+    sin ruta (null en la respuesta, p. ej. un punto fuera de la red) se
+    reemplazan por Haversine / fallback_speed_kmh después de leer la caché y
+    se cuentan en stats["unroutable"].
+
+    Las matrices de una red vial no son simétricas (sentidos de las calles):
+    build_distance_and_time deja config.symmetric=False y el 2-opt de
+    local_search suma el cambio de sentido del tramo invertido.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:5000",
+        profile: str = "driving",
+        tile_size: int = 50,
+        max_workers: int = 4,
+        timeout: float = 30.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+        cache_path: Optional[str] = None,
+        fallback_speed_kmh: float = 45.0,
+    ):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"URL del servicio no soportada: {base_url!r}")
+        self.base_url = base_url.rstrip("/")
+        self._scheme = parts.scheme
+        self._netloc = parts.netloc
+        self._prefix = parts.path.rstrip("/")
+
+        self.profile = profile
+        self.tile_size = max(1, int(tile_size))
+        self.max_workers = max(1, int(max_workers))
+        self.timeout = timeout
+        self.retries = max(0, int(retries))
+        self.backoff = backoff
+        self.cache_path = cache_path
+        self.fallback_speed_kmh = fallback_speed_kmh
+
+        self._local = threading.local()
+        self._connections: list = []
+        self._stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "retries": 0, "connections": 0,
+                      "cached_tiles": 0, "unroutable": 0}
+
+    def __getstate__(self):
+        # Viaja a procesos trabajadores sin conexiones ni candados
+        state = self.__dict__.copy()
+        for name in ("_local", "_connections", "_stats_lock"):
+            del state[name]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+        self._connections = []
+        self._stats_lock = threading.Lock()
+
+    def cache_key(self) -> bytes:
+        # fallback_speed_kmh entra en los tiempos de los pares sin ruta
+        return f"osrm-table|{self.base_url}|{self.profile}|{float(self.fallback_speed_kmh)!r}".encode()
+
+    # --------------------------------------------------------
+    # HTTP
+    # --------------------------------------------------------
+
+    def _count(self, name: str, n: int = 1):
+        with self._stats_lock:
+            self.stats[name] += n
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self._scheme == "https" else http.client.HTTPConnection
+            conn = cls(self._netloc, timeout=self.timeout)
+            self._local.conn = conn
+            with self._stats_lock:
+                self._connections.append(conn)
+                self.stats["connections"] += 1
+        return conn
+
+    def _drop_connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _get_json(self, path: str) -> dict:
+        last_error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self._count("retries")
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            try:
+                conn = self._connection()
+                conn.request("GET", path, headers={"Connection": "keep-alive"})
+                response = conn.getresponse()
+                body = response.read()
+                self._count("requests")
+            except (OSError, http.client.HTTPException) as exc:
+                self._drop_connection()
+                last_error = exc
+                continue
+
+            if response.status == 429 or response.status >= 500:
+                last_error = RoutingServiceError(f"HTTP {response.status}: {body[:200]!r}")
+                if response.getheader("Connection", "").lower() == "close":
+                    self._drop_connection()
+                continue
+            if response.status != 200:
+                raise RoutingServiceError(f"HTTP {response.status}: {body[:200]!r}")
+
+            payload = json.loads(body)
+            if payload.get("code") != "Ok":
+                raise RoutingServiceError(f"{payload.get('code')}: {payload.get('message')}")
+            return payload
+
+        raise RoutingServiceError(
+            f"Sin respuesta de {self.base_url} tras {self.retries + 1} intentos: {last_error}"
+        )
+
+    def _fetch_tile(self, lats, lons, src: np.ndarray, dst: np.ndarray):
+        """
+        (distancias km, tiempos h) de src x dst con una sola consulta; NaN
+        donde el servicio no encontró ruta.
+        """
+        nodes = np.unique(np.concatenate((src, dst)))
+        pos = {int(v): k for k, v in enumerate(nodes)}
+        coords = ";".join(f"{lons[v]:.6f},{lats[v]:.6f}" for v in nodes)
+        sources = ";".join(str(pos[int(v)]) for v in src)
+        destinations = ";".join(str(pos[int(v)]) for v in dst)
+
+        payload = self._get_json(
+            f"{self._prefix}/table/v1/{self.profile}/{coords}"
+            f"?sources={sources}&destinations={destinations}&annotations=distance,duration"
+        )
+        dist = np.array(payload["distances"], dtype=np.float64) / 1000.0
+        dur = np.array(payload["durations"], dtype=np.float64) / 3600.0
+        return dist, dur
+
+    # --------------------------------------------------------
+    # Matriz completa
+    # --------------------------------------------------------
+
+    def table(self, lats, lons) -> Tuple[np.ndarray, np.ndarray]:
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        n = len(lats)
+        dist = np.full((n, n), np.nan)
+        time_h = np.full((n, n), np.nan)
+
+        keys = [_point_key(a, b) for a, b in zip(lats, lons)]
+        blocks = [np.arange(s, min(s + self.tile_size, n)) for s in range(0, n, self.tile_size)]
+        tiles = [(src, dst) for src in blocks for dst in blocks]
+
+        cache = PairCache(self.cache_path) if self.cache_path else None
+        try:
+            # Teselas ya completas en la caché de pares
+            pending = []
+            for src, dst in tiles:
+                if cache is not None:
+                    src_keys = [keys[i] for i in src]
+                    dst_keys = [keys[j] for j in dst]
+                    found = cache.lookup(self.profile, src_keys, dst_keys)
+                    if all((a, b) in found for a in src_keys for b in dst_keys):
+                        for i, a in zip(src, src_keys):
+                            for j, b in zip(dst, dst_keys):
+                                dist[i, j], time_h[i, j] = found[(a, b)]
+                        self._count("cached_tiles")
+                        continue
+                pending.append((src, dst))
+
+            # El resto, en paralelo; la caché se escribe desde este hilo
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {
+                    executor.submit(self._fetch_tile, lats, lons, src, dst): (src, dst)
+                    for src, dst in pending
+                }
+                for future in as_completed(futures):
+                    src, dst = futures[future]
+                    d, t = future.result()
+                    dist[np.ix_(src, dst)] = d
+                    time_h[np.ix_(src, dst)] = t
+                    if cache is not None:
+                        cache.store(self.profile, (
+                            (keys[i], keys[j], d[a, b], t[a, b])
+                            for a, i in enumerate(src)
+                            for b, j in enumerate(dst)
+                        ))
+        finally:
+            self._close_connections()
+            if cache is not None:
+                cache.close()
+
+        self._fill_unroutable(lats, lons, dist, time_h)
+        np.fill_diagonal(dist, 0.0)
+        np.fill_diagonal(time_h, 0.0)
+        return dist, time_h
+
+    def _close_connections(self):
+        with self._stats_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
+
+    def _fill_unroutable(self, lats, lons, dist: np.ndarray, time_h: np.ndarray):
+        missing = np.isnan(dist) | np.isnan(time_h)
+        np.fill_diagonal(missing, False)
+        if not missing.any():
+            return
+
+        self._count("unroutable", int(missing.sum()))
+        i, j = np.nonzero(missing)
+        phi = np.radians(lats)
+        lam = np.radians(lons)
+        d = haversine_pairs_km(phi[i], lam[i], phi[j], lam[j])
+        dist[i, j] = d
+        time_h[i, j] = d / self.fallback_speed_kmh if self.fallback_speed_kmh > 0 else 0.0
@@ -1,6 +1,10 @@
 # Función objetivo y métricas de evaluación para CVRP
+from collections import OrderedDict
+
+import numpy as np
+
 from data_loader import MainConfig
-from representation import CVRPSolution
+from representation import CVRPSolution, IndexedSolution, solution_fingerprint
 
 
 def get_representative_capacity(config: MainConfig) -> float:
@@ -26,15 +30,62 @@ def get_representative_max_range_km(config: MainConfig) -> float:
     return max(set(ranges), key=ranges.count)
 
 
-def evaluate_solution(solution: CVRPSolution, config: MainConfig) -> float:
+def _route_indices(solution, config: MainConfig):
     """
-    Z = sum_v( C_fixed * y_v ) + sum_v( C_dist * d_v )
-        + sum_v( C_time * t_v ) + C_fuel
-    + penalizaciones (capacidad y rango).
+    Itera las rutas no triviales como arreglos de índices con el depósito (0)
+    en los extremos, sin importar la representación del cromosoma.
+    """
+    if isinstance(solution, IndexedSolution):
+        tour = solution.tour
+        b = solution.breaks
+        for r in range(len(b) - 1):
+            if b[r + 1] == b[r]:
+                continue
+            idx = np.zeros(b[r + 1] - b[r] + 2, dtype=np.intp)
+            idx[1:-1] = tour[b[r]:b[r + 1]]
+            yield idx
+        return
+
+    node_index = config.node_index
+    for route in solution.routes:
+        if len(route) <= 2:
+            continue
+
+        # Ruta como índices enteros (0 también representa el depósito)
+        yield np.fromiter(
+            (0 if node == 0 else node_index[node] for node in route),
+            dtype=np.intp,
+            count=len(route),
+        )
+
+
+def route_summary(idx: np.ndarray, config: MainConfig):
+    """
+    (distancia, tiempo, carga) de una ruta dada como índices con el depósito
+    en los extremos. Los arcos se suman en orden (cumsum, izquierda a derecha),
+    igual que evaluate_population, así que la evaluación completa, la
+    incremental y la vectorizada coinciden bit a bit.
     """
+    if len(idx) <= 2:
+        return 0.0, 0.0, 0.0
+
+    D = config.dist_matrix
+    T = config.time_matrix
+
+    route_distance = float(np.cumsum(D[idx[:-1], idx[1:]])[-1])
+    route_time = float(np.cumsum(T[idx[:-1], idx[1:]])[-1])
+
+    # Carga total (la demanda del depósito es 0)
+    load = float(np.cumsum(config.demands[idx[1:-1]])[-1])
+
+    return route_distance, route_time, load
 
-    depot_code = config.depot.code
 
+def total_cost_from_summaries(summaries, config: MainConfig):
+    """
+    Agrega los resúmenes por ruta (rutas no vacías, en orden) en el costo Z.
+    Devuelve (costo_total, es_factible).
+    """
     Q = get_representative_capacity(config)
     fuel_cost_per_km = get_representative_fuel_cost_per_km(config)
     R = get_representative_max_range_km(config)   # 🔹 nuevo: rango máximo
@@ -45,47 +96,21 @@ def evaluate_solution(solution: CVRPSolution, config: MainConfig) -> float:
     total_fuel_cost = 0.0
     penalty_cost = 0.0
 
-    solution.is_feasible = True
-
-    for route in solution.routes:
-        normalized_route = [
-            depot_code if node == 0 else node for node in route
-        ]
-
-        if len(normalized_route) <= 2:
-            continue
+    is_feasible = True
 
+    for route_distance, route_time, load in summaries:
         # y_v = 1 → vehículo usado
         total_fixed_cost += config.C_fixed
 
-        route_distance = 0.0
-        route_time = 0.0
-        load = 0.0
-
-        for i in range(len(normalized_route) - 1):
-            from_node = normalized_route[i]
-            to_node = normalized_route[i + 1]
-
-            d = config.distance_km[(from_node, to_node)]
-            t = config.time_h[(from_node, to_node)]
-            route_distance += d
-            route_time += t
-
-        # Carga total
-        for node in normalized_route[1:-1]:
-            if node in config.clients:
-                client = config.clients[node]
-                load += client.demand
-
         # 🔹 Restricción de capacidad
         if load > Q:
-            solution.is_feasible = False
+            is_feasible = False
             overflow = load - Q
             penalty_cost += config.big_m_veh * overflow
 
         # 🔹 Restricción de rango (distancia total de la ruta no puede pasar R)
         if route_distance > R:
-            solution.is_feasible = False
+            is_feasible = False
             overflow_d = route_distance - R
             penalty_cost += config.big_m_veh * overflow_d
 
@@ -102,5 +127,217 @@ def evaluate_solution(solution: CVRPSolution, config: MainConfig) -> float:
         + penalty_cost
     )
 
+    return total_cost, is_feasible
+
+
+def evaluate_solution(solution: CVRPSolution, config: MainConfig) -> float:
+    """
+    Z = sum_v( C_fixed * y_v ) + sum_v( C_dist * d_v )
+        + sum_v( C_time * t_v ) + C_fuel
+    + penalizaciones (capacidad y rango).
+    """
+    summaries = [route_summary(idx, config) for idx in _route_indices(solution, config)]
+    total_cost, is_feasible = total_cost_from_summaries(summaries, config)
+
+    solution.is_feasible = is_feasible
     solution.cost = total_cost
     return total_cost
+
+
+# ============================================================
+# Evaluación vectorizada de toda la población
+# ============================================================
+
+def _padded_routes(solutions, config: MainConfig):
+    """
+    Todas las rutas de la población en una matriz (rutas x largo máximo) de
+    índices, con el depósito (0) en los extremos y como relleno, más el
+    número de rutas de cada individuo. Las rutas vacías se omiten, igual que
+    en _route_indices (no pagan costo fijo).
+    """
+    compact = [
+        s if isinstance(s, IndexedSolution) else IndexedSolution.from_solution(s, config)
+        for s in solutions
+    ]
+    lengths = [np.diff(s.breaks).astype(np.intp) for s in compact]
+    lengths = [l[l > 0] for l in lengths]
+    n_routes = np.array([len(l) for l in lengths], dtype=np.intp)
+
+    if n_routes.sum() == 0:
+        return np.zeros((0, 2), dtype=np.intp), n_routes
+
+    lengths = np.concatenate(lengths)
+    tour = np.concatenate([s.tour for s in compact]).astype(np.intp)
+
+    n_total = len(lengths)
+    width = int(lengths.max()) + 2
+    nodes = np.zeros((n_total, width), dtype=np.intp)
+
+    row = np.repeat(np.arange(n_total), lengths)
+    starts = np.cumsum(lengths) - lengths
+    col = np.arange(len(tour)) - np.repeat(starts, lengths) + 1
+    nodes[row, col] = tour
+
+    return nodes, n_routes
+
+
+def _padded_per_individual(values: np.ndarray, n_routes: np.ndarray, width: int) -> np.ndarray:
+    """
+    Reubica un valor por ruta en una matriz (individuos x width), rellena con 0.
+    """
+    out = np.zeros((len(n_routes), width), dtype=np.float64)
+    row = np.repeat(np.arange(len(n_routes)), n_routes)
+    starts = np.cumsum(n_routes) - n_routes
+    col = np.arange(len(values)) - np.repeat(starts, n_routes)
+    out[row, col] = values
+    return out
+
+
+def _sequential_sum(matrix: np.ndarray) -> np.ndarray:
+    # Suma por fila de izquierda a derecha (el relleno con ceros no la altera)
+    if matrix.shape[1] == 0:
+        return np.zeros(matrix.shape[0], dtype=np.float64)
+    return np.cumsum(matrix, axis=1)[:, -1]
+
+
+def evaluate_population(solutions, config: MainConfig) -> np.ndarray:
+    """
+    Evalúa toda la población con operaciones NumPy sobre la matriz indexada.
+    Escribe cost / is_feasible en cada solución y devuelve el vector de costos,
+    idéntico (bit a bit) a llamar evaluate_solution sobre cada una.
+    """
+    solutions = list(solutions)
+    if not solutions:
+        return np.zeros(0, dtype=np.float64)
+
+    Q = get_representative_capacity(config)
+    fuel_cost_per_km = get_representative_fuel_cost_per_km(config)
+    R = get_representative_max_range_km(config)
+
+    nodes, n_routes = _padded_routes(solutions, config)
+    a = nodes[:, :-1]
+    b = nodes[:, 1:]
+
+    # Resúmenes por ruta
+    route_distance = _sequential_sum(config.dist_matrix[a, b])
+    route_time = _sequential_sum(config.time_matrix[a, b])
+    load = _sequential_sum(config.demands[nodes[:, 1:-1]])
+
+    cap_violation = load > Q
+    range_violation = route_distance > R
+    cap_penalty = np.where(cap_violation, config.big_m_veh * (load - Q), 0.0)
+    range_penalty = np.where(range_violation, config.big_m_veh * (route_distance - R), 0.0)
+
+    # Agregación por individuo en el mismo orden que total_cost_from_summaries
+    width = int(n_routes.max()) if len(n_routes) else 0
+
+    def per_individual(values):
+        return _sequential_sum(_padded_per_individual(values, n_routes, width))
+
+    total_fixed_cost = per_individual(np.full(len(route_distance), float(config.C_fixed)))
+    total_dist_cost = per_individual(config.C_dist * route_distance)
+    total_time_cost = per_individual(config.C_time * route_time)
+    total_fuel_cost = per_individual(fuel_cost_per_km * route_distance)
+
+    # Penalizaciones intercaladas por ruta: capacidad y luego rango
+    penalties = np.empty(2 * len(route_distance), dtype=np.float64)
+    penalties[0::2] = cap_penalty
+    penalties[1::2] = range_penalty
+    penalty_cost = _sequential_sum(_padded_per_individual(penalties, 2 * n_routes, 2 * width))
+
+    total_cost = (
+        total_fixed_cost
+        + total_dist_cost
+        + total_time_cost
+        + total_fuel_cost
+        + penalty_cost
+    )
+
+    violated = per_individual((cap_violation | range_violation).astype(np.float64)) > 0
+
+    for k, sol in enumerate(solutions):
+        sol.cost = float(total_cost[k])
+        sol.is_feasible = not bool(violated[k])
+
+    return total_cost
+
+
+# ============================================================
+# Caché de fitness (LRU)
+# ============================================================
+
+class FitnessCache:
+    """
+    Memoiza (costo, factibilidad) por huella canónica de la solución.
+    Capacidad acotada con desalojo LRU; hits/misses para medir su efecto.
+    """
+
+    def __init__(self, capacity: int = 10000):
+        if capacity <= 0:
+            raise ValueError("La capacidad del caché debe ser positiva.")
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._store: "OrderedDict[bytes, tuple]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._store)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        self._store.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def evaluate(self, solution, config: MainConfig) -> float:
+        """
+        Igual que evaluate_solution, pero reutiliza el resultado si la misma
+        partición ya fue evaluada.
+        """
+        key = solution_fingerprint(solution, config)
+        cached = self._store.get(key)
+
+        if cached is not None:
+            self.hits += 1
+            self._store.move_to_end(key)
+            solution.cost, solution.is_feasible = cached
+            return solution.cost
+
+        self.misses += 1
+        cost = evaluate_solution(solution, config)
+        self._store[key] = (cost, solution.is_feasible)
+        if len(self._store) > self.capacity:
+            self._store.popitem(last=False)
+        return cost
+
+    def evaluate_many(self, solutions, config: MainConfig) -> list:
+        """
+        Versión por lotes: los aciertos salen del caché y los fallos se
+        evalúan juntos con evaluate_population.
+        """
+        pending = []
+        keys = []
+        for sol in solutions:
+            key = solution_fingerprint(sol, config)
+            cached = self._store.get(key)
+            if cached is not None:
+                self.hits += 1
+                self._store.move_to_end(key)
+                sol.cost, sol.is_feasible = cached
+            else:
+                self.misses += 1
+                pending.append(sol)
+                keys.append(key)
+
+        if pending:
+            evaluate_population(pending, config)
+            for key, sol in zip(keys, pending):
+                self._store[key] = (sol.cost, sol.is_feasible)
+                if len(self._store) > self.capacity:
+                    self._store.popitem(last=False)
+
+        return [sol.cost for sol in solutions]
@@ -1,4 +1,17 @@
+# experiments.py
+# Barridos de semillas / hiperparámetros en paralelo con resultados en SQLite
+
+import itertools
+import json
+import os
+import sqlite3
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional
+
+from data_loader import CASES, load_instance
 from ga_algorithm import GeneticAlgorithm
 
 
@@ -7,9 +20,301 @@ def run_experiment(instance, runs=3):
 
     for i in range(runs):
         ga = GeneticAlgorithm(instance)
-        start = time.time()
-        best = ga.evolve()
-        elapsed = time.time() - start
+        start = time.perf_counter()
+        best, _history = ga.evolve()
+        elapsed = time.perf_counter() - start
         results.append((best.cost, elapsed))
 
     return results
+
+
+# =========================
+# Trabajos del barrido
+# =========================
+
+@dataclass(frozen=True)
+class SweepJob:
+    instance: str              # nombre de CASES ("Caso_3") o carpeta de datos
+    seed: int
+    pop_size: int = 30
+    crossover_rate: float = 0.8
+    mutation_rate: float = 0.2
+    generations: int = 200
+
+    def key(self, ga_kwargs: Optional[dict] = None) -> str:
+        """
+        Identificador estable del trabajo (incluye los ga_kwargs comunes), usado
+        para saltar lo que ya está en el almacén.
+        """
+        return json.dumps({**asdict(self), "ga_kwargs": ga_kwargs or {}}, sort_keys=True)
+
+
+def expand_grid(
+    instances: Iterable[str],
+    seeds: Iterable[int],
+    pop_sizes: Iterable[int] = (30,),
+    crossover_rates: Iterable[float] = (0.8,),
+    mutation_rates: Iterable[float] = (0.2,),
+    generations: Iterable[int] = (200,),
+) -> List[SweepJob]:
+    """
+    Producto cartesiano de los valores dados, ordenado por instancia para que
+    cada trabajador tienda a reutilizar la instancia ya cargada.
+    """
+    return [
+        SweepJob(inst, seed, pop, cx, mut, gens)
+        for inst, pop, cx, mut, gens, seed in itertools.product(
+            instances, pop_sizes, crossover_rates, mutation_rates, generations, seeds
+        )
+    ]
+
+
+# =========================
+# Almacén de resultados
+# =========================
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    job_key        TEXT PRIMARY KEY,
+    instance       TEXT NOT NULL,
+    seed           INTEGER NOT NULL,
+    pop_size       INTEGER NOT NULL,
+    crossover_rate REAL NOT NULL,
+    mutation_rate  REAL NOT NULL,
+    generations    INTEGER NOT NULL,
+    ga_kwargs      TEXT NOT NULL,
+    cost           REAL,
+    feasible       INTEGER,
+    n_routes       INTEGER,
+    evaluations    INTEGER,
+    stop_reason    TEXT,
+    wall_s         REAL,
+    cpu_s          REAL,
+    history        TEXT,
+    error          TEXT,
+    finished_at    TEXT
+)
+"""
+
+_COLUMNS = (
+    "job_key", "instance", "seed", "pop_size", "crossover_rate", "mutation_rate",
+    "generations", "ga_kwargs", "cost", "feasible", "n_routes", "evaluations",
+    "stop_reason", "wall_s", "cpu_s", "history", "error", "finished_at",
+)
+
+
+class ResultsStore:
+    """
+    Resultados de un barrido en un archivo SQLite (una fila por trabajo).
+    Cada fila se confirma apenas llega, así que un barrido interrumpido
+    conserva todo lo terminado y run_sweep lo salta al reanudar.
+    history se guarda como lista JSON (mejor costo por generación).
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def done_keys(self, include_errors: bool = False) -> set:
+        query = "SELECT job_key FROM runs" if include_errors else \
+            "SELECT job_key FROM runs WHERE error IS NULL"
+        return {key for (key,) in self._conn.execute(query)}
+
+    def add(self, row: dict):
+        values = [row.get(col) for col in _COLUMNS]
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        with self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO runs ({', '.join(_COLUMNS)}) VALUES ({placeholders})",
+                values,
+            )
+
+    def rows(self, instance: Optional[str] = None) -> List[dict]:
+        query = f"SELECT {', '.join(_COLUMNS)} FROM runs"
+        args = ()
+        if instance is not None:
+            query += " WHERE instance = ?"
+            args = (instance,)
+        out = []
+        for values in self._conn.execute(query + " ORDER BY rowid", args):
+            row = dict(zip(_COLUMNS, values))
+            row["ga_kwargs"] = json.loads(row["ga_kwargs"])
+            row["history"] = json.loads(row["history"]) if row["history"] else []
+            row["feasible"] = None if row["feasible"] is None else bool(row["feasible"])
+            out.append(row)
+        return out
+
+    def summary(self) -> List[dict]:
+        """
+        Costo mínimo / medio / máximo, factibles y tiempo medio por
+        configuración (todas las semillas juntas).
+        """
+        query = """
+            SELECT instance, pop_size, crossover_rate, mutation_rate, generations, ga_kwargs,
+                   COUNT(*), MIN(cost), AVG(cost), MAX(cost), SUM(feasible), AVG(wall_s), AVG(cpu_s)
+            FROM runs WHERE error IS NULL
+            GROUP BY instance, pop_size, crossover_rate, mutation_rate, generations, ga_kwargs
+            ORDER BY instance, AVG(cost)
+        """
+        names = ("instance", "pop_size", "crossover_rate", "mutation_rate", "generations",
+                 "ga_kwargs", "runs", "min_cost", "mean_cost", "max_cost", "feasible",
+                 "mean_wall_s", "mean_cpu_s")
+        return [dict(zip(names, values)) for values in self._conn.execute(query)]
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# =========================
+# Ejecución en paralelo
+# =========================
+
+# Estado de cada proceso trabajador: instancias ya cargadas y opciones de carga
+_WORKER = {"instances": {}, "load_kwargs": {}}
+
+
+def _init_sweep_worker(load_kwargs: Optional[dict]):
+    _WORKER["instances"] = {}
+    _WORKER["load_kwargs"] = load_kwargs or {}
+
+
+def _get_instance(name: str):
+    """
+    Carga la instancia una sola vez por trabajador (matrices incluidas).
+    """
+    instances = _WORKER["instances"]
+    if name not in instances:
+        instances[name] = load_instance(CASES.get(name, name), **_WORKER["load_kwargs"])
+    return instances[name]
+
+
+def _run_job(job: SweepJob, ga_kwargs: Optional[dict]) -> dict:
+    row = {
+        **asdict(job),
+        "job_key": job.key(ga_kwargs),
+        "ga_kwargs": json.dumps(ga_kwargs or {}, sort_keys=True),
+    }
+    try:
+        config = _get_instance(job.instance)
+        ga = GeneticAlgorithm(
+            config,
+            pop_size=job.pop_size,
+            generations=job.generations,
+            crossover_rate=job.crossover_rate,
+            mutation_rate=job.mutation_rate,
+            seed=job.seed,
+            **{"verbose": False, **(ga_kwargs or {})},
+        )
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        best, history = ga.evolve()
+        row.update(
+            wall_s=time.perf_counter() - wall0,
+            cpu_s=time.process_time() - cpu0,
+            cost=float(best.cost),
+            feasible=int(bool(best.is_feasible)),
+            n_routes=len(best.routes),
+            evaluations=ga.evaluations,
+            stop_reason=ga.stop_reason,
+            history=json.dumps([float(c) for c in history]),
+        )
+    except Exception as exc:
+        row["error"] = f"{type(exc).__name__}: {exc}"
+    row["finished_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    return row
+
+
+def run_sweep(
+    jobs: Iterable[SweepJob],
+    store_path: str,
+    workers: Optional[int] = None,
+    ga_kwargs: Optional[dict] = None,
+    load_kwargs: Optional[dict] = None,
+    retry_errors: bool = False,
+    progress: bool = True,
+) -> List[dict]:
+    """
+    Corre los trabajos que aún no están en el almacén SQLite store_path.
+
+    Los trabajos se reparten en un pool de workers procesos (None = todos los
+    núcleos); cada trabajador carga cada instancia una sola vez y la reutiliza
+    en sus trabajos siguientes. ga_kwargs se pasan a todos los
+    GeneticAlgorithm (p. ej. compact=True, split="optimal") y forman parte de
+    la clave del trabajo; load_kwargs van a load_instance.
+
+    Un trabajo que falla queda guardado con su error y, salvo
+    retry_errors=True, no se vuelve a intentar. Devuelve las filas nuevas.
+    """
+    workers = workers or os.cpu_count() or 1
+
+    with ResultsStore(store_path) as store:
+        done = store.done_keys(include_errors=not retry_errors)
+        pending = [job for job in jobs if job.key(ga_kwargs) not in done]
+        if progress:
+            print(f"{len(pending)} trabajos pendientes ({len(done)} ya en {store_path})")
+
+        rows = []
+        if workers == 1:
+            _init_sweep_worker(load_kwargs)
+            results = (_run_job(job, ga_kwargs) for job in pending)
+            executor = None
+        else:
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_sweep_worker,
+                initargs=(load_kwargs,),
+            )
+            futures = [executor.submit(_run_job, job, ga_kwargs) for job in pending]
+            results = (f.result() for f in as_completed(futures))
+
+        try:
+            for k, row in enumerate(results, 1):
+                store.add(row)
+                rows.append(row)
+                if progress:
+                    status = row.get("error") or f"{row['cost']:.2f} en {row['wall_s']:.1f}s"
+                    print(f"[{k}/{len(pending)}] {row['instance']} seed={row['seed']} "
+                          f"pop={row['pop_size']} cx={row['crossover_rate']} "
+                          f"mut={row['mutation_rate']}: {status}")
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+    return rows
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Barrido de semillas e hiperparámetros del GA")
+    parser.add_argument("instances", nargs="+", help="Caso_Base, Caso_2, Caso_3 o carpetas de datos")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[1, 2, 3])
+    parser.add_argument("--pop-size", type=int, nargs="+", default=[30])
+    parser.add_argument("--crossover-rate", type=float, nargs="+", default=[0.8])
+    parser.add_argument("--mutation-rate", type=float, nargs="+", default=[0.2])
+    parser.add_argument("--generations", type=int, nargs="+", default=[200])
+    parser.add_argument("--ga-kwargs", default="{}", help='JSON, p. ej. \'{"compact": true}\'')
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--store", default=os.path.join(os.path.dirname(__file__), "..", "sweeps", "results.sqlite"))
+    parser.add_argument("--retry-errors", action="store_true")
+    args = parser.parse_args()
+
+    jobs = expand_grid(
+        args.instances, args.seeds, args.pop_size, args.crossover_rate,
+        args.mutation_rate, args.generations,
+    )
+    run_sweep(jobs, args.store, workers=args.workers, ga_kwargs=json.loads(args.ga_kwargs),
+              retry_errors=args.retry_errors)
+
+    with ResultsStore(args.store) as store:
+        for row in store.summary():
+            print(json.dumps(row))
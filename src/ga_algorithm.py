@@ -1,11 +1,34 @@
 # ga_algorithm.py
 
+import contextlib
+import math
 import random
-from representation import CVRPSolution
-from evaluation import evaluate_solution
+import time
+from dataclasses import dataclass
+from representation import CVRPSolution, IndexedSolution, canonical_fingerprint
+from evaluation import evaluate_solution, FitnessCache
 from data_loader import MainConfig
-from operators import crossover, mutate, repair
-from typing import Optional
+import checkpoint
+from metrics import NULL_METRICS, population_diversity
+from operators import breed_offspring, evaluate_batch, repair
+from typing import Callable, Iterator, Optional
+
+
+@dataclass
+class GenerationSnapshot:
+    """
+    Estado del GA al cerrar una generación (lo que entrega iter_evolve).
+    best está en la representación de la población (IndexedSolution si
+    compact=True); no se modifica después, se puede guardar tal cual.
+    """
+    generation: int
+    best: object
+    best_cost: float
+    is_feasible: bool
+    elapsed: float                           # segundos desde el inicio de la corrida
+    evaluations: int                         # evaluaciones de fitness acumuladas
+    generations_without_improvement: int
+    diversity: Optional[float] = None        # solo con dedupe=True (ver population_diversity)
 
 
 class GeneticAlgorithm:
@@ -13,10 +36,28 @@ class GeneticAlgorithm:
         self,
         config: MainConfig,
         pop_size: int = 30,
-        generations: int = 200,
+        generations: Optional[int] = 200,
         crossover_rate: float = 0.8,
         mutation_rate: float = 0.2,
         seed: Optional[int] = None,
+        compact: bool = False,
+        split: str = "greedy",
+        cache_size: Optional[int] = None,
+        workers: int = 1,
+        batch_eval: bool = False,
+        local_search: Optional[dict] = None,
+        education_rate: float = 1.0,
+        max_time: Optional[float] = None,
+        max_evaluations: Optional[int] = None,
+        stagnation_generations: Optional[int] = None,
+        checkpoint_path: Optional[str] = None,
+        checkpoint_every: int = 10,
+        verbose: bool = True,
+        metrics=None,
+        profiler=None,
+        dedupe: bool = False,
+        clone_retries: int = 3,
+        vectorized: bool = False,
     ):
 
         """
@@ -28,27 +69,122 @@ class GeneticAlgorithm:
           - crossover_rate: probabilidad de aplicar cruce
           - mutation_rate: probabilidad de mutar un individuo
           - seed: semilla para hacer el experimento reproducible
+          - compact: si True, la población usa IndexedSolution (arreglos int32)
+            y solo se convierte a rutas de códigos al devolver el mejor
+          - split: decodificador del recorrido gigante ("greedy" u "optimal")
+          - cache_size: si se da, memoiza evaluaciones en un FitnessCache LRU
+            de ese tamaño (ver self.cache.hits / self.cache.misses)
+          - workers: procesos para generar/evaluar hijos; con workers > 1 cada
+            trabajador usa un flujo aleatorio derivado de la semilla, de modo
+            que el resultado es reproducible para (seed, workers)
+          - batch_eval: si True, cada generación se evalúa con una sola llamada
+            a evaluate_population (mismos costos que evaluate_solution)
+          - local_search: parámetros de local_search.LocalSearch (k, max_moves,
+            time_budget, ...) para educar a los hijos; None = sin educación
+          - education_rate: probabilidad de educar a cada hijo
+          - dedupe: si True, los hijos que repiten un élite o a un hermano
+            (canonical_fingerprint) se vuelven a mutar antes de evaluarlos,
+            hasta clone_retries veces
+          - vectorized: si True, los recorridos de todos los hijos de una
+            generación salen de crossover_batch / mutate_batch (NumPy); misma
+            distribución de resultados, otra secuencia aleatoria
+
+        Criterios de término (el primero que se cumpla queda en self.stop_reason:
+        "generations", "max_time", "max_evaluations", "stagnation" o "callback"):
+          - generations: máximo de generaciones (None = sin límite)
+          - max_time: segundos de pared; no se empieza una generación que,
+            según la duración de la anterior, terminaría pasado el límite
+          - max_evaluations: evaluaciones de fitness (una por individuo
+            creado); nunca se excede. La población inicial ya gasta pop_size,
+            así que debe ser >= pop_size
+          - stagnation_generations: generaciones seguidas sin mejorar el mejor
+
+        Checkpoints (ver save_checkpoint / load_checkpoint / from_checkpoint):
+          - checkpoint_path: archivo donde se guarda el estado de la corrida
+          - checkpoint_every: cada cuántas generaciones se guarda
+
+        Instrumentación:
+          - verbose: imprime una línea por generación en evolve()
+          - metrics: metrics.Metrics para tiempos por fase y un registro por
+            generación (mejor, media, diversidad, evaluaciones); None = apagado
+          - profiler: fábrica de context manager que envuelve evolve(), p. ej.
+            lambda: metrics.cprofile("ga.prof")
         """
+        if generations is None and max_time is None and max_evaluations is None \
+                and stagnation_generations is None:
+            raise ValueError("Sin criterio de término: defina generations, max_time, "
+                             "max_evaluations o stagnation_generations")
+        if max_evaluations is not None and max_evaluations < pop_size:
+            raise ValueError(f"max_evaluations={max_evaluations} < pop_size={pop_size}: "
+                             "la población inicial ya lo excedería")
+
         self.config = config
         self.pop_size = pop_size
         self.generations = generations
         self.crossover_rate = crossover_rate
         self.mutation_rate = mutation_rate
+        self.compact = compact
+        self.split = split
+        self.cache_size = cache_size
+        self.cache = FitnessCache(cache_size) if cache_size else None
+        self.workers = max(1, int(workers))
+        self.batch_eval = batch_eval
+        self.local_search = local_search
+        self.education_rate = education_rate
+        self.max_time = max_time
+        self.max_evaluations = max_evaluations
+        self.stagnation_generations = stagnation_generations
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = max(1, int(checkpoint_every))
+        self.verbose = verbose
+        self.metrics = metrics if metrics is not None else NULL_METRICS
+        self.profiler = profiler
+        self.dedupe = dedupe
+        self.clone_retries = clone_retries
+        self.vectorized = vectorized
+        self.elites = 5
+        self.evaluations = 0
+        self.stop_reason: Optional[str] = None
+
+        # Estado de la corrida (lo que guarda un checkpoint)
+        self.generation = 0
+        self.history: list = []
+        self._best_cost = math.inf
+        self._stale = 0
+        self._last_gen_time = 0.0
+        self._elapsed = 0.0
+        self._resumed = False
+        self.educator = None
+        if local_search is not None:
+            from local_search import LocalSearch
+
+            self.educator = LocalSearch(config, **local_search)
         self.population: list[CVRPSolution] = []
 
         # ÚNICO depósito (por enunciado)
         self.depot_code = config.depot.code
 
-        # Semilla del generador aleatorio (reproducibilidad)
-        if seed is not None:
-            random.seed(seed)
+        # Generador aleatorio propio (reproducibilidad): random.Random(seed)
+        # produce la misma secuencia que random.seed(seed) sobre el módulo
+        self.rng = random.Random(seed)
+
+        # Semilla base de los flujos de los trabajadores en modo paralelo
+        self.run_seed = seed if seed is not None else self.rng.getrandbits(32)
+
+    def _evaluate(self, solution) -> float:
+        # Todos los individuos salen de repair() ya evaluados
+        if solution.cost is not None:
+            return solution.cost
+        if self.cache is not None:
+            return self.cache.evaluate(solution, self.config)
+        return evaluate_solution(solution, self.config)
 
     def create_individual(self) -> CVRPSolution:
         """
         Crea individuo inicial: permutación de clientes repartida en k rutas.
         """
         clients_codes = list(self.config.clients.keys())
-        random.shuffle(clients_codes)
+        self.rng.shuffle(clients_codes)
 
         # Distribuimos clientes en k rutas iniciales (k = #vehículos)
         k = max(1, len(self.config.vehicles))
@@ -59,72 +195,359 @@ class GeneticAlgorithm:
 
         # Rodeamos cada ruta con el depósito
         routes = [[self.depot_code] + r + [self.depot_code] for r in routes]
-        return CVRPSolution(routes)
+        solution = CVRPSolution(routes)
+        if self.compact:
+            return IndexedSolution.from_solution(solution, self.config)
+        return solution
 
     def init_population(self):
         """
         Inicializa la población aplicando reparación/evaluación a cada individuo.
         """
         self.population = []
-        for _ in range(self.pop_size):
-            ind = self.create_individual()
-            ind = repair(ind, self.config, self.depot_code)
-            self.population.append(ind)
+        with self.metrics.timer("init"):
+            for _ in range(self.pop_size):
+                ind = self.create_individual()
+                if not self.batch_eval:
+                    ind = repair(ind, self.config, self.depot_code, cache=self.cache)
+                self.population.append(ind)
+
+            if self.batch_eval:
+                evaluate_batch(self.population, self.config, cache=self.cache)
+        self.evaluations += self.pop_size
+        self.metrics.count("evaluations", self.pop_size)
+
+    def _make_pool(self):
+        if self.workers <= 1:
+            return None
 
-    def evolve(self):
+        from parallel import OffspringPool
+
+        return OffspringPool(
+            self.config,
+            self.depot_code,
+            self.workers,
+            self.run_seed,
+            crossover_rate=self.crossover_rate,
+            mutation_rate=self.mutation_rate,
+            split=self.split,
+            cache_size=self.cache_size,
+            batch_eval=self.batch_eval,
+            local_search=self.local_search,
+            education_rate=self.education_rate,
+            clone_retries=self.clone_retries,
+            vectorized=self.vectorized,
+        )
+
+    def step(self, gen: int, pool=None):
         """
-        Ciclo principal del GA:
-        - Ordena por costo
-        - Elitismo
-        - Selección + cruce + mutación
+        Una generación: ordena, elitismo y relleno con hijos.
+        Devuelve el mejor individuo de la población ordenada.
+        """
+        # Evaluación y ordenamiento
+        with self.metrics.timer("sort"):
+            self.population.sort(key=self._evaluate)
+        best = self.population[0]
+
+        new_pop: list[CVRPSolution] = []
+
+        # Elitismo: copiamos los mejores tal cual
+        new_pop.extend(self.population[:self.elites])
+
+        # Selección: torneo sobre los mejores 15
+        parents_pool = self.population[:min(15, len(self.population))]
+        n_children = self.pop_size - len(new_pop)
+        self.evaluations += n_children
+
+        # Huellas de los élites para rechazar clones
+        seen = None
+        if self.dedupe:
+            seen = {canonical_fingerprint(s, self.config) for s in new_pop}
+
+        # Relleno de la población
+        if pool is not None:
+            with self.metrics.timer("breed"):
+                new_pop.extend(pool.breed(parents_pool, n_children, gen, seen=seen))
+            self.metrics.count("evaluations", n_children)
+        else:
+            new_pop.extend(breed_offspring(
+                parents_pool,
+                n_children,
+                self.config,
+                self.depot_code,
+                self.rng,
+                crossover_rate=self.crossover_rate,
+                mutation_rate=self.mutation_rate,
+                split=self.split,
+                cache=self.cache,
+                batch_eval=self.batch_eval,
+                educator=self.educator,
+                education_rate=self.education_rate,
+                metrics=self.metrics,
+                seen=seen,
+                clone_retries=self.clone_retries,
+                vectorized=self.vectorized,
+            ))
+
+        self.population = new_pop
+        return best
+
+    def best_individuals(self, k: int) -> list:
+        """
+        Copias de los k mejores individuos de la población actual.
+        """
+        ranked = sorted(self.population, key=self._evaluate)
+        return [s.copy() for s in ranked[:k]]
+
+    def diversity(self) -> float:
+        """
+        Fracción de individuos distintos en la población actual (1.0 = sin clones).
+        """
+        return population_diversity(self.population, self.config)
+
+    def receive_migrants(self, migrants: list):
+        """
+        Reemplaza a los peores individuos por los inmigrantes (ya evaluados).
+        """
+        if not migrants:
+            return
+        self.population.sort(key=self._evaluate)
+        k = min(len(migrants), len(self.population))
+        for i, m in enumerate(migrants[:k]):
+            if self.compact and not isinstance(m, IndexedSolution):
+                m = IndexedSolution.from_solution(m, self.config)
+            if m.cost is None:
+                self._evaluate(m)
+            self.population[len(self.population) - k + i] = m
+
+    def _stop_reason(self, gen: int, elapsed: float, last_gen_time: float, stale: int) -> Optional[str]:
+        if self.generations is not None and gen >= self.generations:
+            return "generations"
+        if self.stagnation_generations is not None and stale >= self.stagnation_generations:
+            return "stagnation"
+        if self.max_time is not None and elapsed + last_gen_time > self.max_time:
+            return "max_time"
+        if self.max_evaluations is not None:
+            n_children = self.pop_size - min(self.elites, len(self.population))
+            if self.evaluations + n_children > self.max_evaluations:
+                return "max_evaluations"
+        return None
+
+    # --------------------------------------------------------
+    # Checkpoints
+    # --------------------------------------------------------
+
+    # Parámetros que definen la corrida; se guardan en el checkpoint para
+    # poder reconstruir el GA con from_checkpoint
+    _PARAMS = (
+        "pop_size", "generations", "crossover_rate", "mutation_rate", "compact",
+        "split", "cache_size", "workers", "batch_eval", "local_search",
+        "education_rate", "max_time", "max_evaluations", "stagnation_generations",
+        "checkpoint_path", "checkpoint_every", "verbose", "dedupe", "clone_retries",
+        "vectorized",
+    )
+
+    def get_state(self) -> dict:
+        """
+        Estado completo de la corrida entre dos generaciones: con él, una
+        corrida reanudada sigue exactamente igual que una sin interrumpir.
+        """
+        return {
+            "params": {name: getattr(self, name) for name in self._PARAMS},
+            "n_nodes": len(self.config.node_codes),
+            "run_seed": self.run_seed,
+            "rng_state": self.rng.getstate(),
+            "population": self.population,
+            "generation": self.generation,
+            "history": self.history,
+            "evaluations": self.evaluations,
+            "best_cost": self._best_cost,
+            "stale": self._stale,
+            "last_gen_time": self._last_gen_time,
+            "elapsed": self._elapsed,
+        }
+
+    def set_state(self, state: dict):
+        n_nodes = len(self.config.node_codes)
+        if state["n_nodes"] != n_nodes:
+            raise ValueError(
+                f"El checkpoint es de una instancia con {state['n_nodes']} nodos; "
+                f"esta tiene {n_nodes}"
+            )
+        self.run_seed = state["run_seed"]
+        self.rng.setstate(state["rng_state"])
+        self.population = state["population"]
+        self.generation = state["generation"]
+        self.history = list(state["history"])
+        self.evaluations = state["evaluations"]
+        self._best_cost = state["best_cost"]
+        self._stale = state["stale"]
+        self._last_gen_time = state["last_gen_time"]
+        self._elapsed = state["elapsed"]
+        self._resumed = True
+
+    def save_checkpoint(self, path: Optional[str] = None):
+        checkpoint.save_checkpoint(path or self.checkpoint_path, self.get_state())
+
+    def load_checkpoint(self, path: Optional[str] = None):
+        """
+        Carga un checkpoint; el próximo evolve()/iter_evolve() continúa desde
+        él en vez de crear una población nueva.
+        """
+        self.set_state(checkpoint.load_checkpoint(path or self.checkpoint_path))
+
+    @classmethod
+    def from_checkpoint(cls, config: MainConfig, path: str, **overrides) -> "GeneticAlgorithm":
+        """
+        Reconstruye el GA con los parámetros guardados (overrides permite,
+        p. ej., extender generations o cambiar max_time) y su estado.
         """
-        self.init_population()
+        state = checkpoint.load_checkpoint(path)
+        params = dict(state["params"])
+        params.update(overrides)
+        ga = cls(config, **params)
+        ga.set_state(state)
+        return ga
 
-        best_costs = []
+    # --------------------------------------------------------
+    # Ciclo principal
+    # --------------------------------------------------------
 
-        for gen in range(self.generations):
-            # Evaluación y ordenamiento
-            self.population.sort(key=lambda s: evaluate_solution(s, self.config))
-            best = self.population[0]
-            best_costs.append(best.cost)
+    def iter_evolve(self) -> Iterator[GenerationSnapshot]:
+        """
+        Versión generador del ciclo principal: entrega un GenerationSnapshot
+        por generación con el mejor hasta el momento, hasta que se cumpla un
+        criterio de término. Se puede cortar en cualquier momento (break);
+        el pool de procesos se cierra igual.
 
-            new_pop: list[CVRPSolution] = []
+        Con checkpoint_path se guarda el estado cada checkpoint_every
+        generaciones y al terminar, también si se corta con break. Tras
+        load_checkpoint continúa desde la generación guardada; el tiempo de
+        max_time se acumula entre tramos.
+        """
+        self.stop_reason = None
+        if self._resumed:
+            self._resumed = False
+            start = time.perf_counter() - self._elapsed
+        else:
+            start = time.perf_counter()
+            self.evaluations = 0
+            self.generation = 0
+            self.history = []
+            self._best_cost = math.inf
+            self._stale = 0
+            self._last_gen_time = 0.0
+            self._elapsed = 0.0
+            self.init_population()
 
-            # Elitismo: copiamos los mejores tal cual
-            elites = 5
-            new_pop.extend(self.population[:elites])
+        pool = self._make_pool()
+        try:
+            while True:
+                self._elapsed = time.perf_counter() - start
+                reason = self._stop_reason(
+                    self.generation, self._elapsed, self._last_gen_time, self._stale
+                )
+                if reason is not None:
+                    self.stop_reason = reason
+                    break
 
-            # Relleno de la población
-            while len(new_pop) < self.pop_size:
-                # Selección: torneo sobre los mejores 15
-                parents_pool = self.population[:min(15, len(self.population))]
-                p1, p2 = random.sample(parents_pool, 2)
+                t0 = time.perf_counter()
+                best = self.step(self.generation, pool)
+                self._last_gen_time = time.perf_counter() - t0
 
-                # Cruce con probabilidad crossover_rate
-                if random.random() < self.crossover_rate:
-                    child = crossover(p1, p2, self.config, self.depot_code)
+                if best.cost < self._best_cost:
+                    self._best_cost = best.cost
+                    self._stale = 0
                 else:
-                    # Sin cruce: clonamos uno de los padres
-                    child = p1.copy()
-
-                # Mutación con probabilidad mutation_rate (lo maneja mutate)
-                child = mutate(
-                    child,
-                    self.config,
-                    self.depot_code,
-                    mutation_rate=self.mutation_rate,
+                    self._stale += 1
+
+                self.history.append(best.cost)
+                self.generation += 1
+                self._elapsed = time.perf_counter() - start
+
+                if self.checkpoint_path and self.generation % self.checkpoint_every == 0:
+                    self.save_checkpoint()
+
+                if self.metrics.enabled:
+                    self._record_generation(best)
+
+                yield GenerationSnapshot(
+                    generation=self.generation - 1,
+                    best=best,
+                    best_cost=best.cost,
+                    is_feasible=best.is_feasible,
+                    elapsed=self._elapsed,
+                    evaluations=self.evaluations,
+                    generations_without_improvement=self._stale,
+                    diversity=self.diversity() if self.dedupe else None,
                 )
+        finally:
+            if pool is not None:
+                pool.close()
+            # También al cortar el generador (break / callback de evolve)
+            if (self.checkpoint_path and self.generation > 0
+                    and self.generation % self.checkpoint_every != 0):
+                self.save_checkpoint()
+
+    def _record_generation(self, best):
+        # Población recién formada (élites + hijos, todos evaluados)
+        costs = [s.cost for s in self.population]
+        fields = {
+            "event": "generation",
+            "generation": self.generation - 1,
+            "best_cost": best.cost,
+            "is_feasible": best.is_feasible,
+            "mean_cost": sum(costs) / len(costs),
+            "diversity": self.diversity(),
+            "evaluations": self.evaluations,
+            "elapsed": self._elapsed,
+            "generation_time": self._last_gen_time,
+            "phases": self.metrics.lap(),
+        }
+        if self.cache is not None:
+            fields["cache_hit_rate"] = self.cache.hit_rate
+        self.metrics.record(**fields)
 
-                # Reparación/evaluación final
-                child = repair(child, self.config, self.depot_code)
+    def evolve(self, callback: Optional[Callable[[GenerationSnapshot], Optional[bool]]] = None):
+        """
+        Ciclo principal del GA:
+        - Ordena por costo
+        - Elitismo
+        - Selección + cruce + mutación
+
+        callback(snapshot) se llama al final de cada generación; si devuelve
+        True la corrida se detiene (stop_reason = "callback").
+        """
+        profiling = self.profiler() if self.profiler is not None else contextlib.nullcontext()
 
-                new_pop.append(child)
+        with profiling:
+            snapshots = self.iter_evolve()
+            try:
+                for snap in snapshots:
+                    if self.verbose:
+                        print(f"Gen {snap.generation} | Best Cost: {snap.best_cost:.2f} | Factible: {snap.is_feasible}")
+                    if callback is not None and callback(snap):
+                        self.stop_reason = "callback"
+                        break
+            finally:
+                snapshots.close()
 
-            self.population = new_pop
-            print(f"Gen {gen} | Best Cost: {best.cost:.2f} | Factible: {best.is_feasible}")
+        if self.metrics.enabled:
+            self.metrics.record(
+                event="summary",
+                stop_reason=self.stop_reason,
+                generations=self.generation,
+                evaluations=self.evaluations,
+                elapsed=self._elapsed,
+                **self.metrics.summary(),
+            )
 
         # Aseguramos devolver el mejor ordenando al final
-        self.population.sort(key=lambda s: evaluate_solution(s, self.config))
+        self.population.sort(key=self._evaluate)
         best = self.population[0]
 
-        return best, best_costs
+        if self.compact:
+            # Conversión en el borde: export_verification y notebooks usan códigos
+            best = best.to_solution(self.config)
+
+        return best, list(self.history)
@@ -0,0 +1,213 @@
+# islands.py
+# Modelo de islas: varias poblaciones del GA en procesos separados con migración
+
+import contextlib
+import multiprocessing as mp
+import random
+import traceback
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+
+from data_loader import MainConfig
+from ga_algorithm import GeneticAlgorithm
+from parallel import spawn_seeds
+from representation import CVRPSolution, IndexedSolution
+from shared_instance import SharedInstance, resolve_config, should_share
+
+
+TOPOLOGIES = ("ring", "random")
+
+
+@dataclass
+class IslandResult:
+    best: CVRPSolution
+    best_cost: float
+    best_island: int
+    histories: List[List[float]] = field(default_factory=list)
+    island_best_costs: List[float] = field(default_factory=list)
+
+
+class IslandError(RuntimeError):
+    """
+    Falla dentro del proceso de una isla; el mensaje trae su traceback.
+    """
+
+
+@dataclass
+class _IslandFailure:
+    traceback: str
+
+
+def _island_main(conn, config, seed: int, ga_kwargs: dict):
+    """
+    Proceso de una isla: mantiene su GeneticAlgorithm vivo y atiende órdenes
+    ("run", n) → (emigrantes, historial), ("migrate", lista) y ("stop",).
+    config puede ser un MainConfig o un shared_instance.InstanceHandle.
+    Si algo falla, responde _IslandFailure con el traceback y termina.
+    """
+    try:
+        _island_loop(conn, config, seed, ga_kwargs)
+    except Exception:
+        # el padre puede haber cerrado ya su extremo
+        with contextlib.suppress(OSError):
+            conn.send(_IslandFailure(traceback.format_exc()))
+    finally:
+        conn.close()
+
+
+def _island_loop(conn, config, seed: int, ga_kwargs: dict):
+    ga = GeneticAlgorithm(resolve_config(config), seed=seed, **ga_kwargs)
+    ga.init_population()
+    gen = 0
+    n_migrants = 0
+
+    while True:
+        msg = conn.recv()
+        cmd = msg[0]
+
+        if cmd == "run":
+            n_gens, n_migrants = msg[1], msg[2]
+            history = []
+            for _ in range(n_gens):
+                best = ga.step(gen)
+                history.append(best.cost)
+                gen += 1
+            conn.send((ga.best_individuals(n_migrants), history))
+
+        elif cmd == "migrate":
+            ga.receive_migrants(msg[1])
+
+        elif cmd == "stop":
+            conn.send(ga.best_individuals(1)[0])
+            return
+
+
+def _recv(conn, k: int):
+    try:
+        reply = conn.recv()
+    except EOFError:
+        raise IslandError(f"La isla {k} terminó sin responder") from None
+    if isinstance(reply, _IslandFailure):
+        raise IslandError(f"Falla en la isla {k}:\n{reply.traceback}")
+    return reply
+
+
+def _send(conn, k: int, msg):
+    try:
+        conn.send(msg)
+    except OSError:
+        # la isla ya cerró su extremo: su falla quedó pendiente en el pipe
+        _recv(conn, k)
+        raise IslandError(f"La isla {k} cerró la conexión") from None
+
+
+def run_islands(
+    config: MainConfig,
+    n_islands: int = 4,
+    generations: int = 200,
+    migration_interval: Optional[int] = 20,
+    n_migrants: int = 2,
+    topology: str = "ring",
+    seed: Optional[int] = None,
+    share_instance: Optional[bool] = None,
+    **ga_kwargs,
+) -> IslandResult:
+    """
+    Corre n_islands GAs en procesos separados. Cada migration_interval
+    generaciones, cada isla envía copias de sus n_migrants mejores a:
+      - "ring": la isla siguiente (i → i+1)
+      - "random": una isla distinta elegida al azar (flujo derivado de seed)
+    y estos reemplazan a los peores del destino.
+    Con migration_interval=None las islas corren independientes.
+
+    Con share_instance las matrices se publican una vez en memoria compartida
+    y cada isla recibe solo un InstanceHandle (None = según el método de
+    arranque, ver shared_instance.should_share).
+
+    ga_kwargs se pasan a GeneticAlgorithm (pop_size, crossover_rate, split, ...).
+    Si una isla falla se lanza IslandError con su índice y su traceback.
+    """
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"Topología desconocida: {topology!r}. Opciones: {TOPOLOGIES}")
+    if n_islands < 1:
+        raise ValueError("Se necesita al menos una isla.")
+
+    ga_kwargs = dict(ga_kwargs)
+    ga_kwargs["generations"] = generations
+    ga_kwargs.setdefault("compact", True)
+
+    seeds = spawn_seeds(seed, n_islands)
+    topo_rng = random.Random(seeds[0] ^ 0x5EED)
+
+    ctx = mp.get_context()
+    shared = SharedInstance(config) if should_share(share_instance, ctx) else None
+    island_config = shared.handle if shared is not None else config
+
+    conns = []
+    procs = []
+    for k in range(n_islands):
+        parent_conn, child_conn = ctx.Pipe()
+        p = ctx.Process(
+            target=_island_main,
+            args=(child_conn, island_config, seeds[k], ga_kwargs),
+            daemon=True,
+        )
+        p.start()
+        child_conn.close()
+        conns.append(parent_conn)
+        procs.append(p)
+
+    histories: List[List[float]] = [[] for _ in range(n_islands)]
+    interval = migration_interval or generations
+
+    try:
+        done = 0
+        while done < generations:
+            n_gens = min(interval, generations - done)
+            send_migrants = migration_interval is not None and n_islands > 1
+
+            for k, c in enumerate(conns):
+                _send(c, k, ("run", n_gens, n_migrants if send_migrants else 0))
+            replies = [_recv(c, k) for k, c in enumerate(conns)]
+            done += n_gens
+
+            for k, (_, history) in enumerate(replies):
+                histories[k].extend(history)
+
+            if send_migrants and done < generations:
+                for k, (emigrants, _) in enumerate(replies):
+                    if topology == "ring":
+                        dest = (k + 1) % n_islands
+                    else:
+                        dest = topo_rng.choice([j for j in range(n_islands) if j != k])
+                    _send(conns[dest], dest, ("migrate", emigrants))
+
+        for k, c in enumerate(conns):
+            _send(c, k, ("stop",))
+        finals = [_recv(c, k) for k, c in enumerate(conns)]
+    finally:
+        # Cerrar los pipes despierta a las islas que siguen esperando órdenes
+        for c in conns:
+            c.close()
+        for p in procs:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+        if shared is not None:
+            shared.close()
+
+    island_best_costs = [s.cost for s in finals]
+    best_island = int(np.argmin(island_best_costs))
+    best = finals[best_island]
+    if isinstance(best, IndexedSolution):
+        best = best.to_solution(config)
+
+    return IslandResult(
+        best=best,
+        best_cost=best.cost,
+        best_island=best_island,
+        histories=histories,
+        island_best_costs=island_best_costs,
+    )
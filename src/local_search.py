@@ -0,0 +1,190 @@
+# local_search.py
+# Etapa memética: búsqueda local (2-opt, or-opt, relocate, swap) sobre vecindarios granulares
+
+import random
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from data_loader import MainConfig
+from delta_evaluation import IncrementalEvaluator
+from distance_oracle import LazyDistanceMatrix
+from representation import IndexedSolution
+from spatial import SpatialIndex
+
+
+def nearest_neighbors(config: MainConfig, k: int) -> List[List[int]]:
+    """
+    Para cada nodo (índice), sus k clientes más cercanos (la fila 0, del
+    depósito, queda vacía). Usa config.candidates del índice espacial si
+    alcanza para k; si no, recurre a la matriz de distancias. Con una matriz
+    perezosa (distance_mode="lazy") no se materializa D: se usa el índice
+    espacial (config.spatial o uno nuevo sobre las coordenadas), que ordena
+    igual que Haversine.
+    """
+    n_nodes = len(config.node_codes)
+
+    candidates = config.candidates
+    if candidates is not None and candidates.shape[1] >= min(k, n_nodes - 2):
+        rows = candidates[:, :k].tolist()
+        return [[]] + [[j for j in row if j > 0] for row in rows[1:]]
+
+    k = max(0, min(k, n_nodes - 2))
+    neighbors: List[List[int]] = [[]]
+    if k == 0:
+        return neighbors + [[] for _ in range(n_nodes - 1)]
+
+    if isinstance(config.dist_matrix, LazyDistanceMatrix):
+        spatial = config.spatial
+        if spatial is None:
+            depot = config.depot
+            lats = [depot.lat] + [c.lat for c in config.clients.values()]
+            lons = [depot.lon] + [c.lon for c in config.clients.values()]
+            spatial = SpatialIndex(lats, lons)
+        rows = spatial.knn_all(k, exclude=(0,)).tolist()
+        return neighbors + [[j for j in row if j > 0] for row in rows[1:]]
+
+    D = np.asarray(config.dist_matrix[1:, 1:], dtype=np.float64).copy()
+    np.fill_diagonal(D, np.inf)
+    part = np.argpartition(D, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(D, part, axis=1).argsort(axis=1)
+    nearest = np.take_along_axis(part, order, axis=1) + 1
+
+    return neighbors + nearest.tolist()
+
+
+class LocalSearch:
+    """
+    Educación de hijos por primera mejora sobre vecindarios granulares: para
+    cada cliente u solo se prueban movimientos que lo acercan a uno de sus k
+    vecinos v.
+
+      - intra-ruta: 2-opt (deja u junto a v) y or-opt (segmento de u de
+        largo 1..max_segment tras v)
+      - inter-ruta: relocate (u antes/después de v) y swap (u <-> v)
+
+    Cada movimiento se evalúa en O(1) con IncrementalEvaluator y solo se acepta
+    si baja el costo sin crear ni empeorar excesos de Q o R
+    (get_representative_capacity / get_representative_max_range_km).
+    max_moves y time_budget (segundos) acotan el trabajo por llamada.
+    """
+
+    def __init__(
+        self,
+        config: MainConfig,
+        k: int = 10,
+        max_moves: Optional[int] = None,
+        time_budget: Optional[float] = None,
+        max_segment: int = 3,
+        eps: float = 1e-7,
+    ):
+        self.config = config
+        self.k = k
+        self.max_moves = max_moves
+        self.time_budget = time_budget
+        self.max_segment = max_segment
+        self.eps = eps
+        self.neighbors = nearest_neighbors(config, k)
+
+        # estadísticas acumuladas
+        self.calls = 0
+        self.moves_applied = 0
+        self.moves_evaluated = 0
+
+    def educate(self, solution, rng=random):
+        """
+        Devuelve una solución mejorada (mismo tipo que la de entrada) con
+        cost / is_feasible ya calculados.
+        """
+        self.calls += 1
+        ev = IncrementalEvaluator(solution, self.config)
+        where = {}
+        for r in range(len(ev.routes)):
+            self._index_route(ev, where, r)
+
+        deadline = None
+        if self.time_budget is not None:
+            deadline = time.perf_counter() + self.time_budget
+
+        order = list(where.keys())
+        moves = 0
+        improved = True
+
+        while improved:
+            improved = False
+            rng.shuffle(order)
+            for u in order:
+                if self.max_moves is not None and moves >= self.max_moves:
+                    improved = False
+                    break
+                if deadline is not None and time.perf_counter() > deadline:
+                    improved = False
+                    break
+
+                for v in self.neighbors[u]:
+                    if self._try_moves(ev, where, u, v):
+                        moves += 1
+                        improved = True
+                        break
+
+        self.moves_applied += moves
+
+        result = ev.to_solution()
+        if isinstance(solution, IndexedSolution):
+            return result
+        return result.to_solution(self.config)
+
+    # --------------------------------------------------------
+
+    @staticmethod
+    def _index_route(ev: IncrementalEvaluator, where: dict, r: int):
+        for i, c in enumerate(ev.routes[r]):
+            where[c] = (r, i)
+
+    def _accept(self, delta: float, ev: IncrementalEvaluator) -> bool:
+        self.moves_evaluated += 1
+        return delta < -self.eps and ev.move_respects_limits()
+
+    def _try_moves(self, ev: IncrementalEvaluator, where: dict, u: int, v: int) -> bool:
+        ru, iu = where[u]
+        rv, iv = where[v]
+
+        if ru == rv:
+            # 2-opt: invertir el tramo entre ambos para dejarlos adyacentes
+            i, j = (iu + 1, iv) if iu < iv else (iv + 1, iu)
+            if j > i and self._accept(ev.delta_two_opt(ru, i, j), ev):
+                ev.apply_two_opt(ru, i, j)
+                self._index_route(ev, where, ru)
+                return True
+
+            # or-opt: segmento que empieza en u, reinsertado tras v
+            route_len = len(ev.routes[ru])
+            for length in range(1, self.max_segment + 1):
+                if iu + length > route_len:
+                    break
+                if iu <= iv < iu + length:
+                    break
+                pos = iv + 1 if iv < iu else iv - length + 1
+                if self._accept(ev.delta_or_opt(ru, iu, length, pos), ev):
+                    ev.apply_or_opt(ru, iu, length, pos)
+                    self._index_route(ev, where, ru)
+                    return True
+            return False
+
+        # relocate: u después o antes de v
+        for pos in (iv + 1, iv):
+            if self._accept(ev.delta_relocate(ru, iu, rv, pos), ev):
+                ev.apply_relocate(ru, iu, rv, pos)
+                self._index_route(ev, where, ru)
+                self._index_route(ev, where, rv)
+                return True
+
+        # swap: intercambio u <-> v entre rutas
+        if self._accept(ev.delta_swap(ru, iu, rv, iv), ev):
+            ev.apply_swap(ru, iu, rv, iv)
+            self._index_route(ev, where, ru)
+            self._index_route(ev, where, rv)
+            return True
+
+        return False
@@ -0,0 +1,167 @@
+# metrics.py
+# Instrumentación del GA: temporizadores y contadores por fase, registros por
+# generación en JSON lines y gancho para perfilar una corrida
+
+import contextlib
+import cProfile
+import io
+import json
+import pstats
+import time
+from typing import Dict, Optional
+
+from representation import canonical_fingerprint
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class NullMetrics:
+    """
+    Instrumentación desactivada (la opción por defecto): cada llamada es un
+    no-op y timer() devuelve siempre el mismo context manager vacío.
+    """
+
+    enabled = False
+
+    def timer(self, name: str):
+        return _NULL_TIMER
+
+    def count(self, name: str, n: int = 1):
+        pass
+
+    def record(self, **fields):
+        pass
+
+    def close(self):
+        pass
+
+
+NULL_METRICS = NullMetrics()
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "t0")
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.add_time(self.name, time.perf_counter() - self.t0)
+        return False
+
+
+class Metrics:
+    """
+    Acumula tiempo (s) y número de llamadas por fase, contadores y registros.
+
+    Fases que instrumenta el GA: "sort", "selection", "crossover", "mutate",
+    "split" (decodificación del recorrido gigante; ya incluida dentro de
+    crossover/mutate), "evaluate", "education", "dedupe", "init" y, con workers > 1,
+    "breed" (todo el trabajo del pool, visto desde el proceso principal).
+
+    Cada record() se guarda en self.records y, si se dio path, se escribe como
+    una línea JSON.
+    """
+
+    enabled = True
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.times: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self.counters: Dict[str, int] = {}
+        self.records: list = []
+        self._lap: Dict[str, float] = {}
+        self._file = open(path, "a", encoding="utf-8") if path else None
+
+    def timer(self, name: str) -> _Timer:
+        return _Timer(self, name)
+
+    def add_time(self, name: str, seconds: float):
+        self.times[name] = self.times.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def lap(self) -> Dict[str, float]:
+        """
+        Tiempo por fase desde el lap() anterior (p. ej., por generación).
+        """
+        delta = {name: t - self._lap.get(name, 0.0) for name, t in self.times.items()}
+        self._lap = dict(self.times)
+        return delta
+
+    def record(self, **fields):
+        self.records.append(fields)
+        if self._file is not None:
+            self._file.write(json.dumps(fields) + "\n")
+            self._file.flush()
+
+    def summary(self) -> dict:
+        return {
+            "times": dict(self.times),
+            "calls": dict(self.calls),
+            "counters": dict(self.counters),
+        }
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def population_diversity(population: list, config) -> float:
+    """
+    Fracción de individuos distintos (por canonical_fingerprint): 1.0 = sin
+    clones, 1/len(population) = todos iguales.
+    """
+    if not population:
+        return 0.0
+    unique = {canonical_fingerprint(s, config) for s in population}
+    return len(unique) / len(population)
+
+
+@contextlib.contextmanager
+def cprofile(path: Optional[str] = None, sort: str = "cumulative", top: int = 25):
+    """
+    Perfila el bloque con cProfile (la biblioteca estándar no trae un perfilador
+    por muestreo). Con path guarda las estadísticas para pstats/snakeviz; sin
+    path imprime las top funciones ordenadas por sort.
+
+    Sirve como profiler= de GeneticAlgorithm: profiler=lambda: cprofile("ga.prof").
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if path:
+            profiler.dump_stats(path)
+        else:
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats(sort).print_stats(top)
+            print(out.getvalue())
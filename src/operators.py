@@ -1,14 +1,24 @@
 # operators.py
 
 import random
-from typing import List
-from representation import CVRPSolution
+from collections import deque
+from typing import List, Optional
+
+import numpy as np
+from representation import CVRPSolution, IndexedSolution, canonical_fingerprint
 from data_loader import MainConfig
+from distance_providers import HaversineProvider
 from evaluation import (
     get_representative_capacity,
+    get_representative_fuel_cost_per_km,
     get_representative_max_range_km,
     evaluate_solution,
+    evaluate_population,
+    FitnessCache,
 )
+from metrics import NULL_METRICS
+
+SPLIT_MODES = ("greedy", "optimal")
 
 # ============================================================
 # Extraer solo clientes (sin depósito)
@@ -23,61 +33,218 @@ def _flatten_clients(solution: CVRPSolution, config: MainConfig) -> List[str]:
     return clients
 
 
+def _flatten_indices(solution, config: MainConfig) -> List[int]:
+    """
+    Recorrido gigante como índices enteros de clientes.
+    """
+    if isinstance(solution, IndexedSolution):
+        return solution.tour.tolist()
+    node_index = config.node_index
+    return [node_index[c] for c in _flatten_clients(solution, config)]
+
+
 # ============================================================
 # Construcción de rutas respetando CAPACIDAD y RANGO
 # ============================================================
 
-def _build_routes_from_sequence(
-    seq: List[str],
-    config: MainConfig,
-    depot_code: str
-) -> CVRPSolution:
-
+def _greedy_breaks(idx: np.ndarray, config: MainConfig) -> List[int]:
+    """
+    Partición greedy del recorrido gigante: cierra la ruta apenas se
+    excedería Q o R. Devuelve las fronteras [0, ..., len(idx)].
+    """
     Q = get_representative_capacity(config)
     R = get_representative_max_range_km(config)
 
-    routes = []
-    current_route = [depot_code]
+    # Distancias del recorrido gigante precalculadas sobre la matriz indexada
+    D = config.dist_matrix
+    prev = np.concatenate(([0], idx[:-1]))
+    d_prev_depot = D[prev, 0].tolist()
+    d_prev_client = D[prev, idx].tolist()
+    d_client_depot = D[idx, 0].tolist()
+    d_depot_client = D[0, idx].tolist()
+    demands = config.demands[idx].tolist()
+
+    breaks = [0]
+    route_len = 0
     current_load = 0.0
     current_distance = 0.0
 
-    for client_code in seq:
-        demand = config.clients[client_code].demand
-        last_node = current_route[-1]
+    for k in range(len(idx)):
+        demand = demands[k]
 
-        d_last_depot = config.distance_km[(last_node, depot_code)]
-        d_last_client = config.distance_km[(last_node, client_code)]
-        d_client_depot = config.distance_km[(client_code, depot_code)]
+        # el último nodo de la ruta abierta es siempre el cliente anterior
+        # (o el depósito si la ruta está vacía)
+        if route_len == 0:
+            d_last_depot = 0.0
+            d_last_client = d_depot_client[k]
+        else:
+            d_last_depot = d_prev_depot[k]
+            d_last_client = d_prev_client[k]
 
-        extra_distance = d_last_client + d_client_depot - d_last_depot
+        extra_distance = d_last_client + d_client_depot[k] - d_last_depot
 
-        can_add_by_capacity = (current_load + demand <= Q) or (len(current_route) == 1)
-        can_add_by_range = (current_distance + extra_distance <= R) or (len(current_route) == 1)
+        can_add_by_capacity = (current_load + demand <= Q) or (route_len == 0)
+        can_add_by_range = (current_distance + extra_distance <= R) or (route_len == 0)
 
         if can_add_by_capacity and can_add_by_range:
-            current_route.append(client_code)
+            route_len += 1
             current_load += demand
             current_distance += extra_distance
         else:
-            # cierro ruta actual
-            current_route.append(depot_code)
-            routes.append(current_route)
-
-            # abro nueva ruta con ese cliente
-            current_route = [depot_code, client_code]
+            # cierro ruta actual y abro nueva ruta con ese cliente
+            breaks.append(k)
+            route_len = 1
             current_load = demand
-            current_distance = (
-                config.distance_km[(depot_code, client_code)]
-                + config.distance_km[(client_code, depot_code)]
-            )
+            current_distance = d_depot_client[k] + d_client_depot[k]
 
     # cierro última ruta
-    current_route.append(depot_code)
-    routes.append(current_route)
+    breaks.append(len(idx))
+    return breaks
+
+
+def _optimal_breaks(idx: np.ndarray, config: MainConfig) -> List[int]:
+    """
+    Split óptimo (Bellman/Prins) del recorrido gigante bajo los mismos
+    límites Q y R que el greedy, en O(n) con sumas prefijo y cola monótona.
+
+    V[j] = min_i { V[i] + costo_ruta(i+1..j) } con
+    costo_ruta = C_fixed + C_dist*d + C_time*t + combustible*d.
+    Como costo_ruta(i+1..j) = clave(i) + P[j] + c(s_j, depósito), basta un
+    mínimo en ventana deslizante sobre clave(i). La ventana de predecesores
+    factibles solo avanza (desigualdad triangular de la matriz), y una ruta
+    de un solo cliente siempre se admite, igual que en el greedy.
+
+    Con matrices de otro proveedor (p. ej. una red vial, config.provider no
+    Haversine) la desigualdad triangular no está garantizada: el rango de
+    cada predecesor con carga factible se revisa uno por uno, en
+    O(n · clientes por ruta).
+    """
+    n = len(idx)
+    if n == 0:
+        return [0]
+
+    Q = get_representative_capacity(config)
+    R = get_representative_max_range_km(config)
+    per_km = config.C_dist + get_representative_fuel_cost_per_km(config)
+
+    D = config.dist_matrix
+    T = config.time_matrix
+
+    # Arcos depósito -> s_k, s_k -> depósito y s_{k-1} -> s_k (posiciones 1..n)
+    d_out = D[0, idx]
+    d_back = D[idx, 0]
+    d_step = D[idx[:-1], idx[1:]]
+    c_out = (per_km * d_out + config.C_time * T[0, idx]).tolist()
+    c_back = (per_km * d_back + config.C_time * T[idx, 0]).tolist()
+    c_step = per_km * d_step + config.C_time * T[idx[:-1], idx[1:]]
+
+    # Sumas prefijo (índice k = posición k del recorrido, 1..n)
+    P = np.concatenate(([0.0, 0.0], np.cumsum(c_step))).tolist()
+    PD = np.concatenate(([0.0, 0.0], np.cumsum(d_step))).tolist()
+    PL = np.concatenate(([0.0], np.cumsum(config.demands[idx]))).tolist()
+    d_out = d_out.tolist()
+    d_back = d_back.tolist()
+
+    C_fixed = config.C_fixed
+    V = [0.0] * (n + 1)
+    pred = [0] * (n + 1)
+    key = [0.0] * n
+
+    window = deque()
+    lo = 0
+    metric = config.provider is None or isinstance(config.provider, HaversineProvider)
+
+    for j in range(1, n + 1):
+        # el predecesor i = j - 1 entra a la ventana
+        i = j - 1
+        key[i] = V[i] + C_fixed + c_out[i] - P[i + 1]
+
+        if not metric:
+            # la carga sí es monótona en i; el rango se revisa por predecesor
+            best = i
+            for i in range(j - 2, -1, -1):
+                if PL[j] - PL[i] > Q:
+                    break
+                if d_out[i] + PD[j] - PD[i + 1] + d_back[j - 1] <= R and key[i] < key[best]:
+                    best = i
+            V[j] = key[best] + P[j] + c_back[j - 1]
+            pred[j] = best
+            continue
 
+        while window and key[window[-1]] >= key[i]:
+            window.pop()
+        window.append(i)
+
+        # descartar predecesores que violan Q o R para la ruta i+1..j
+        while lo < j - 1 and (
+            PL[j] - PL[lo] > Q
+            or d_out[lo] + PD[j] - PD[lo + 1] + d_back[j - 1] > R
+        ):
+            lo += 1
+        while window[0] < lo:
+            window.popleft()
+
+        best = window[0]
+        V[j] = key[best] + P[j] + c_back[j - 1]
+        pred[j] = best
+
+    breaks = [n]
+    j = n
+    while j > 0:
+        j = pred[j]
+        breaks.append(j)
+    breaks.reverse()
+    return breaks
+
+
+def _split_breaks(idx: np.ndarray, config: MainConfig, split: str = "greedy") -> List[int]:
+    if split == "greedy":
+        return _greedy_breaks(idx, config)
+    if split == "optimal":
+        return _optimal_breaks(idx, config)
+    raise ValueError(f"Modo de split desconocido: {split!r}. Opciones: {SPLIT_MODES}")
+
+
+def _build_routes_from_sequence(
+    seq: List[str],
+    config: MainConfig,
+    depot_code: str,
+    split: str = "greedy",
+) -> CVRPSolution:
+
+    idx = np.fromiter(
+        (config.node_index[c] for c in seq), dtype=np.intp, count=len(seq)
+    )
+    breaks = _split_breaks(idx, config, split)
+
+    routes = [
+        [depot_code] + list(seq[breaks[r]:breaks[r + 1]]) + [depot_code]
+        for r in range(len(breaks) - 1)
+    ]
     return CVRPSolution(routes)
 
 
+def _build_indexed_from_sequence(
+    seq: List[int],
+    config: MainConfig,
+    split: str = "greedy",
+) -> IndexedSolution:
+    """
+    Igual que _build_routes_from_sequence pero sobre índices y sin pasar por códigos.
+    """
+    idx = np.asarray(seq, dtype=np.intp)
+    return IndexedSolution(idx, _split_breaks(idx, config, split))
+
+
+def _decode(seq: List[int], config: MainConfig, depot_code: str, compact: bool, split: str,
+            metrics=NULL_METRICS):
+    with metrics.timer("split"):
+        if compact:
+            return _build_indexed_from_sequence(seq, config, split)
+        codes = config.node_codes
+        return _build_routes_from_sequence([codes[i] for i in seq], config, depot_code, split)
+
+
 # ============================================================
 # CRUCE (OX)
 # ============================================================
@@ -86,17 +253,21 @@ def crossover(
     p1: CVRPSolution,
     p2: CVRPSolution,
     config: MainConfig,
-    depot_code: str
+    depot_code: str,
+    split: str = "greedy",
+    rng=random,
+    metrics=NULL_METRICS,
 ) -> CVRPSolution:
 
-    seq1 = _flatten_clients(p1, config)
-    seq2 = _flatten_clients(p2, config)
+    compact = isinstance(p1, IndexedSolution)
+    seq1 = _flatten_indices(p1, config)
+    seq2 = _flatten_indices(p2, config)
 
     n = len(seq1)
     if n < 2:
         return p1.copy()
 
-    a, b = sorted(random.sample(range(n), 2))
+    a, b = sorted(rng.sample(range(n), 2))
 
     child_seq = [None] * n
     child_seq[a:b + 1] = seq1[a:b + 1]
@@ -110,7 +281,7 @@ def crossover(
             pos = (pos + 1) % n
         child_seq[pos] = c
 
-    return _build_routes_from_sequence(child_seq, config, depot_code)
+    return _decode(child_seq, config, depot_code, compact, split, metrics)
 
 
 # ============================================================
@@ -121,17 +292,21 @@ def mutate(
     solution: CVRPSolution,
     config: MainConfig,
     depot_code: str,
-    mutation_rate: float = 0.2
+    mutation_rate: float = 0.2,
+    split: str = "greedy",
+    rng=random,
+    metrics=NULL_METRICS,
 ) -> CVRPSolution:
 
-    seq = _flatten_clients(solution, config)
+    compact = isinstance(solution, IndexedSolution)
+    seq = _flatten_indices(solution, config)
     n = len(seq)
 
-    if n >= 2 and random.random() < mutation_rate:
-        i, j = random.sample(range(n), 2)
+    if n >= 2 and rng.random() < mutation_rate:
+        i, j = rng.sample(range(n), 2)
         seq[i], seq[j] = seq[j], seq[i]
 
-    return _build_routes_from_sequence(seq, config, depot_code)
+    return _decode(seq, config, depot_code, compact, split, metrics)
 
 
 # ============================================================
@@ -142,11 +317,263 @@ def repair(
     solution: CVRPSolution,
     config: MainConfig,
     depot_code: str,
+    cache: Optional[FitnessCache] = None,
 ) -> CVRPSolution:
     """
     Repara/evalúa la solución. En este diseño, la factibilidad de capacidad
     y rango se controla al construir rutas; aquí nos aseguramos de que
-    la solución tenga su costo actualizado.
+    la solución tenga su costo actualizado (vía caché si se entrega uno).
     """
-    evaluate_solution(solution, config)
+    if cache is not None:
+        cache.evaluate(solution, config)
+    else:
+        evaluate_solution(solution, config)
     return solution
+
+
+def evaluate_batch(
+    solutions: list,
+    config: MainConfig,
+    cache: Optional[FitnessCache] = None,
+) -> list:
+    """
+    Equivalente por lotes de repair() sobre una lista de soluciones.
+    """
+    if cache is not None:
+        cache.evaluate_many(solutions, config)
+    else:
+        evaluate_population(solutions, config)
+    return solutions
+
+
+# ============================================================
+# GENERACIÓN DE HIJOS (selección + cruce + mutación + reparación)
+# ============================================================
+
+def _avoid_clone(child, config, depot_code, split, rng, metrics, seen, batch_keys, clone_retries):
+    """
+    Re-muta child mientras repita una huella de seen o de batch_keys (hasta
+    clone_retries veces) y registra su huella en batch_keys.
+    """
+    with metrics.timer("dedupe"):
+        key = canonical_fingerprint(child, config)
+        retries = 0
+        while (key in seen or key in batch_keys) and retries < clone_retries:
+            child = mutate(child, config, depot_code, mutation_rate=1.0,
+                           split=split, rng=rng, metrics=metrics)
+            key = canonical_fingerprint(child, config)
+            retries += 1
+        if retries:
+            metrics.count("clones_remutated", retries)
+        if key in seen or key in batch_keys:
+            metrics.count("clones_accepted")
+        batch_keys.add(key)
+    return child
+
+
+def _finish_offspring(children, config, depot_code, rng, cache, batch_eval,
+                      educator, education_rate, metrics):
+    """
+    Evaluación por lotes (si batch_eval) y educación de los hijos.
+    """
+    if batch_eval:
+        with metrics.timer("evaluate"):
+            evaluate_batch(children, config, cache=cache)
+    metrics.count("evaluations", len(children))
+
+    # Educación (búsqueda local) después de la reparación
+    if educator is not None:
+        for k, child in enumerate(children):
+            if rng.random() < education_rate:
+                with metrics.timer("education"):
+                    children[k] = educator.educate(child, rng=rng)
+
+    return children
+
+
+def breed_offspring(
+    parents_pool: list,
+    n_children: int,
+    config: MainConfig,
+    depot_code: str,
+    rng,
+    crossover_rate: float = 0.8,
+    mutation_rate: float = 0.2,
+    split: str = "greedy",
+    cache: Optional[FitnessCache] = None,
+    batch_eval: bool = False,
+    educator=None,
+    education_rate: float = 1.0,
+    metrics=NULL_METRICS,
+    seen=None,
+    clone_retries: int = 3,
+    vectorized: bool = False,
+) -> list:
+    """
+    Produce n_children hijos evaluados a partir de parents_pool.
+    Todo el azar sale de rng, así que la salida depende solo de su estado.
+    Con batch_eval=True los hijos se evalúan juntos al final (evaluate_population).
+    Si se da un educator (local_search.LocalSearch), cada hijo ya evaluado se
+    educa con probabilidad education_rate.
+    metrics (metrics.Metrics) recibe el tiempo de cada fase.
+
+    Con seen (colección de canonical_fingerprint, p. ej. de los élites) se
+    evitan clones antes de evaluar: un hijo igual a uno de seen o a un hermano
+    ya generado se vuelve a mutar (swap forzado) hasta clone_retries veces; si
+    sigue repetido se acepta igual. Contadores: clones_remutated y
+    clones_accepted.
+
+    vectorized=True genera todos los recorridos hijos de una vez con
+    crossover_batch / mutate_batch (misma distribución, otro flujo aleatorio).
+    """
+    if vectorized:
+        return _breed_offspring_vectorized(
+            parents_pool, n_children, config, depot_code, rng, crossover_rate,
+            mutation_rate, split, cache, batch_eval, educator, education_rate,
+            metrics, seen, clone_retries,
+        )
+
+    children = []
+    batch_keys = set()
+    while len(children) < n_children:
+        with metrics.timer("selection"):
+            p1, p2 = rng.sample(parents_pool, 2)
+
+        # Cruce con probabilidad crossover_rate
+        if rng.random() < crossover_rate:
+            with metrics.timer("crossover"):
+                child = crossover(p1, p2, config, depot_code, split=split, rng=rng, metrics=metrics)
+        else:
+            # Sin cruce: clonamos uno de los padres
+            child = p1.copy()
+
+        # Mutación con probabilidad mutation_rate (lo maneja mutate)
+        with metrics.timer("mutate"):
+            child = mutate(
+                child,
+                config,
+                depot_code,
+                mutation_rate=mutation_rate,
+                split=split,
+                rng=rng,
+                metrics=metrics,
+            )
+
+        # Clones: re-mutar antes de gastar una evaluación en ellos
+        if seen is not None:
+            child = _avoid_clone(child, config, depot_code, split, rng, metrics,
+                                 seen, batch_keys, clone_retries)
+
+        # Reparación/evaluación final
+        if not batch_eval:
+            with metrics.timer("evaluate"):
+                child = repair(child, config, depot_code, cache=cache)
+
+        children.append(child)
+
+    return _finish_offspring(children, config, depot_code, rng, cache, batch_eval,
+                             educator, education_rate, metrics)
+
+
+# ============================================================
+# OPERADORES VECTORIZADOS (una generación de hijos a la vez)
+# ============================================================
+
+def _distinct_pairs(gen: np.random.Generator, m: int, n: int):
+    """
+    m pares (i, j) de posiciones distintas uniformes en 0..n-1, igual que
+    rng.sample(range(n), 2).
+    """
+    i = gen.integers(0, n, m)
+    j = gen.integers(0, n - 1, m)
+    j += j >= i
+    return i, j
+
+
+def crossover_batch(P1: np.ndarray, P2: np.ndarray, gen: np.random.Generator) -> np.ndarray:
+    """
+    OX por lotes sobre recorridos gigantes enteros (filas de P1 y P2, m x n):
+    para cada fila, el tramo [a, b] sale de P1 y el resto de P2 en su orden,
+    llenando desde b+1 de forma circular (igual que crossover). El conjunto
+    "usado" es una máscara booleana por fila sobre los índices de nodo.
+    """
+    m, n = P1.shape
+    if n < 2:
+        return P1.copy()
+
+    i, j = _distinct_pairs(gen, m, n)
+    a = np.minimum(i, j)[:, None]
+    b = np.maximum(i, j)[:, None]
+    cols = np.arange(n)[None, :]
+    rows = np.arange(m)[:, None]
+
+    # Máscara de posiciones del tramo y "usados" por valor de nodo
+    in_segment = (cols >= a) & (cols <= b)
+    used = np.zeros((m, int(max(P1.max(), P2.max())) + 1), dtype=bool)
+    used[np.broadcast_to(rows, (m, n))[in_segment], P1[in_segment]] = True
+
+    # Valores de P2 no usados, en su orden (orden estable: los kept primero)
+    keep = ~used[rows, P2]
+    order = np.argsort(~keep, axis=1, kind="stable")
+    fill_values = np.take_along_axis(P2, order, axis=1)
+
+    # k-ésimo relleno va a la posición (b + 1 + k) mod n, para k < n - largo_tramo
+    n_fill = n - (b - a + 1)
+    fill_pos = (b + 1 + cols) % n
+    valid = cols < n_fill
+
+    child = np.where(in_segment, P1, 0)
+    child[np.broadcast_to(rows, (m, n))[valid], fill_pos[valid]] = fill_values[valid]
+    return child
+
+
+def mutate_batch(S: np.ndarray, mutation_rate: float, gen: np.random.Generator) -> np.ndarray:
+    """
+    Mutación swap por lotes: cada fila, con probabilidad mutation_rate,
+    intercambia dos posiciones distintas (igual que mutate).
+    """
+    S = S.copy()
+    m, n = S.shape
+    if n < 2:
+        return S
+
+    rows = np.flatnonzero(gen.random(m) < mutation_rate)
+    i, j = _distinct_pairs(gen, len(rows), n)
+    S[rows, i], S[rows, j] = S[rows, j], S[rows, i]
+    return S
+
+
+def _breed_offspring_vectorized(parents_pool, n_children, config, depot_code, rng,
+                                crossover_rate, mutation_rate, split, cache, batch_eval,
+                                educator, education_rate, metrics, seen, clone_retries):
+    # Flujo NumPy derivado del rng del GA (reproducible y guardado en checkpoints)
+    gen = np.random.default_rng(rng.getrandbits(64))
+    compact = isinstance(parents_pool[0], IndexedSolution)
+
+    with metrics.timer("selection"):
+        tours = np.array([_flatten_indices(p, config) for p in parents_pool], dtype=np.intp)
+        first, second = _distinct_pairs(gen, n_children, len(parents_pool))
+
+    with metrics.timer("crossover"):
+        seqs = tours[first]
+        do_cx = np.flatnonzero(gen.random(n_children) < crossover_rate)
+        if len(do_cx):
+            seqs[do_cx] = crossover_batch(tours[first[do_cx]], tours[second[do_cx]], gen)
+
+    with metrics.timer("mutate"):
+        seqs = mutate_batch(seqs, mutation_rate, gen)
+
+    children = []
+    batch_keys = set()
+    for seq in seqs:
+        child = _decode(seq, config, depot_code, compact, split, metrics)
+        if seen is not None:
+            child = _avoid_clone(child, config, depot_code, split, rng, metrics,
+                                 seen, batch_keys, clone_retries)
+        if not batch_eval:
+            with metrics.timer("evaluate"):
+                child = repair(child, config, depot_code, cache=cache)
+        children.append(child)
+
+    return _finish_offspring(children, config, depot_code, rng, cache, batch_eval,
+                             educator, education_rate, metrics)
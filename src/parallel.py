@@ -0,0 +1,166 @@
+# parallel.py
+# Generación y evaluación de hijos en un pool de procesos
+
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Union
+
+import numpy as np
+
+from data_loader import MainConfig
+from evaluation import FitnessCache
+from operators import breed_offspring
+from shared_instance import InstanceHandle, SharedInstance, resolve_config, should_share
+
+
+# Estado por proceso trabajador (se carga una sola vez en el initializer)
+_WORKER = {}
+
+
+def _init_worker(
+    config: Union[MainConfig, InstanceHandle],
+    depot_code: str,
+    params: dict,
+    cache_size: Optional[int],
+    local_search: Optional[dict],
+):
+    config = resolve_config(config)
+    _WORKER["config"] = config
+    _WORKER["depot_code"] = depot_code
+    _WORKER["params"] = params
+    _WORKER["cache"] = FitnessCache(cache_size) if cache_size else None
+    _WORKER["educator"] = None
+    if local_search is not None:
+        from local_search import LocalSearch
+
+        _WORKER["educator"] = LocalSearch(config, **local_search)
+
+
+def _breed_chunk(parents_pool: list, n_children: int, seed: int, seen=None) -> list:
+    return breed_offspring(
+        parents_pool,
+        n_children,
+        _WORKER["config"],
+        _WORKER["depot_code"],
+        random.Random(seed),
+        cache=_WORKER["cache"],
+        educator=_WORKER["educator"],
+        seen=seen,
+        **_WORKER["params"],
+    )
+
+
+_SEED_MASK = (1 << 64) - 1
+
+
+def spawn_seeds(seed, n: int) -> List[int]:
+    """
+    n semillas independientes derivadas de seed (entero, lista de enteros o
+    None) con SeedSequence.spawn; reproducible para un mismo seed. Los
+    enteros negativos, que random.seed acepta y SeedSequence no, se toman
+    módulo 2**64.
+    """
+    if isinstance(seed, (list, tuple)):
+        seed = [int(s) & _SEED_MASK for s in seed]
+    elif seed is not None:
+        seed = int(seed) & _SEED_MASK
+    seq = np.random.SeedSequence(seed)
+    return [int(child.generate_state(1)[0]) for child in seq.spawn(n)]
+
+
+def chunk_seeds(run_seed: int, gen: int, n_chunks: int) -> List[int]:
+    """
+    Semillas de los flujos aleatorios de cada trabajador en la generación gen.
+    Dependen solo de (semilla de la corrida, generación, #trabajadores).
+    """
+    return spawn_seeds([run_seed, gen], n_chunks)
+
+
+def split_counts(n: int, parts: int) -> List[int]:
+    base, extra = divmod(n, parts)
+    return [base + (1 if k < extra else 0) for k in range(parts)]
+
+
+class OffspringPool:
+    """
+    Pool de procesos que produce los hijos de una generación en paralelo.
+
+    Con share_instance (por defecto, si el método de arranque no es "fork";
+    ver shared_instance.should_share) las matrices del config se publican una
+    vez en memoria compartida y cada trabajador recibe solo el handle, así que
+    la memoria no crece con workers; si no, cada trabajador recibe el
+    MainConfig. Cada generación solo viajan los padres y los hijos ya
+    evaluados. El trabajador k usa su propio random.Random sembrado con
+    chunk_seeds(run_seed, gen, workers)[k], y los hijos se concatenan en
+    orden de trabajador, así que el resultado es reproducible para una misma
+    semilla y número de trabajadores.
+    """
+
+    def __init__(
+        self,
+        config: MainConfig,
+        depot_code: str,
+        workers: int,
+        run_seed: int,
+        crossover_rate: float = 0.8,
+        mutation_rate: float = 0.2,
+        split: str = "greedy",
+        cache_size: Optional[int] = None,
+        batch_eval: bool = False,
+        local_search: Optional[dict] = None,
+        education_rate: float = 1.0,
+        clone_retries: int = 3,
+        vectorized: bool = False,
+        share_instance: Optional[bool] = None,
+    ):
+        self.workers = workers
+        self.run_seed = run_seed
+        params = {
+            "crossover_rate": crossover_rate,
+            "mutation_rate": mutation_rate,
+            "split": split,
+            "batch_eval": batch_eval,
+            "education_rate": education_rate,
+            "clone_retries": clone_retries,
+            "vectorized": vectorized,
+        }
+        self._shared = SharedInstance(config) if should_share(share_instance) else None
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(
+                self._shared.handle if self._shared is not None else config,
+                depot_code, params, cache_size, local_search,
+            ),
+        )
+
+    def breed(self, parents_pool: list, n_children: int, gen: int, seen=None) -> list:
+        """
+        Hijos de la generación gen. seen (huellas a evitar, ver breed_offspring)
+        se envía a cada trabajador; los clones entre trabajadores no se detectan.
+        """
+        counts = split_counts(n_children, self.workers)
+        seeds = chunk_seeds(self.run_seed, gen, self.workers)
+
+        futures = [
+            self._executor.submit(_breed_chunk, parents_pool, count, seed, seen)
+            for count, seed in zip(counts, seeds)
+            if count > 0
+        ]
+
+        children = []
+        for f in futures:
+            children.extend(f.result())
+        return children
+
+    def close(self):
+        self._executor.shutdown()
+        if self._shared is not None:
+            self._shared.close()
+            self._shared = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
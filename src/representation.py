@@ -1,3 +1,8 @@
+import hashlib
+
+import numpy as np
+
+
 # Cromosoma: 
 class CVRPSolution:
     def __init__(self, routes):
@@ -8,3 +13,109 @@ class CVRPSolution:
 
     def copy(self):
         return CVRPSolution([r.copy() for r in self.routes])
+
+
+# Cromosoma compacto (modo indexado):
+class IndexedSolution:
+    """
+    Recorrido gigante de índices de clientes + fronteras de rutas, ambos int32.
+
+    La ruta r visita tour[breaks[r]:breaks[r + 1]] saliendo y volviendo al
+    depósito (índice 0). Las rutas vacías no se representan.
+    """
+
+    __slots__ = ("tour", "breaks", "cost", "is_feasible")
+
+    def __init__(self, tour, breaks):
+        self.tour = np.asarray(tour, dtype=np.int32)
+        self.breaks = np.asarray(breaks, dtype=np.int32)
+        self.cost = None
+        self.is_feasible = True
+
+    @property
+    def n_routes(self) -> int:
+        return len(self.breaks) - 1
+
+    def route(self, r: int) -> np.ndarray:
+        return self.tour[self.breaks[r]:self.breaks[r + 1]]
+
+    def copy(self):
+        other = IndexedSolution(self.tour.copy(), self.breaks.copy())
+        other.cost = self.cost
+        other.is_feasible = self.is_feasible
+        return other
+
+    @classmethod
+    def from_solution(cls, solution: CVRPSolution, config) -> "IndexedSolution":
+        """
+        Convierte rutas de códigos (con depósito en los extremos) a la forma compacta.
+        """
+        node_index = config.node_index
+        tour = []
+        breaks = [0]
+        for route in solution.routes:
+            clients = [node_index[n] for n in route if n != 0 and n in config.clients]
+            if not clients:
+                continue
+            tour.extend(clients)
+            breaks.append(len(tour))
+
+        compact = cls(tour, breaks)
+        compact.cost = solution.cost
+        compact.is_feasible = solution.is_feasible
+        return compact
+
+    def to_solution(self, config) -> CVRPSolution:
+        """
+        Reconstruye las rutas de códigos que usan export_verification y los notebooks.
+        """
+        codes = config.node_codes
+        depot_code = config.depot.code
+        tour = self.tour.tolist()
+        b = self.breaks.tolist()
+
+        routes = [
+            [depot_code] + [codes[i] for i in tour[b[r]:b[r + 1]]] + [depot_code]
+            for r in range(len(b) - 1)
+        ]
+        solution = CVRPSolution(routes)
+        solution.cost = self.cost
+        solution.is_feasible = self.is_feasible
+        return solution
+
+
+def solution_fingerprint(solution, config) -> bytes:
+    """
+    Huella canónica (16 bytes) del recorrido gigante y sus cortes de ruta.
+    Es la misma para CVRPSolution e IndexedSolution; las rutas vacías no cuentan.
+    """
+    if not isinstance(solution, IndexedSolution):
+        solution = IndexedSolution.from_solution(solution, config)
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(len(solution.tour).to_bytes(4, "little"))
+    h.update(solution.tour.tobytes())
+    h.update(solution.breaks.tobytes())
+    return h.digest()
+
+
+def canonical_fingerprint(solution, config) -> bytes:
+    """
+    Huella (16 bytes) del conjunto de rutas, sin importar su orden: dos
+    soluciones con las mismas rutas son el mismo individuo (mismo costo).
+    Se usa para detectar clones en la población; el FitnessCache sigue usando
+    solution_fingerprint, que sí respeta el orden de las rutas.
+    """
+    if not isinstance(solution, IndexedSolution):
+        solution = IndexedSolution.from_solution(solution, config)
+
+    tour = solution.tour
+    breaks = solution.breaks.tolist()
+    routes = sorted(tour[breaks[r]:breaks[r + 1]].tobytes() for r in range(len(breaks) - 1))
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(len(tour).to_bytes(4, "little"))
+    for route in routes:
+        h.update(len(route).to_bytes(4, "little"))
+        h.update(route)
+    return h.digest()
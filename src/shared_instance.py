@@ -0,0 +1,186 @@
+# shared_instance.py
+# Instancia publicada una vez en memoria compartida para los procesos trabajadores
+
+import copy
+import multiprocessing as mp
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from data_loader import MainConfig, MatrixDictView
+
+
+# Arreglos numéricos de MainConfig que se publican (los demás campos son O(n)
+# y viajan en el esqueleto)
+SHARED_FIELDS = ("dist_matrix", "time_matrix", "demands", "candidates")
+
+_ALIGN = 64
+
+
+@dataclass(frozen=True)
+class _ArraySpec:
+    dtype: str
+    shape: Tuple[int, ...]
+    offset: int = 0                  # posición en el bloque compartido
+    filename: Optional[str] = None   # o archivo .npy ya mapeado (caché de matrices)
+
+
+@dataclass(frozen=True)
+class InstanceHandle:
+    """
+    Referencia liviana a una instancia publicada con SharedInstance: nombre
+    del bloque de memoria compartida, ubicación de cada arreglo y un esqueleto
+    de MainConfig sin las matrices. Se envía a los trabajadores en lugar del
+    MainConfig; attach() reconstruye el config con vistas de solo lectura.
+    """
+
+    shm_name: Optional[str]
+    arrays: Dict[str, _ArraySpec]
+    skeleton: MainConfig
+
+    def attach(self) -> MainConfig:
+        return attach(self)
+
+
+# Bloques ya abiertos en este proceso: un attach por bloque y el SharedMemory
+# vivo mientras existan las vistas
+_ATTACHED: Dict[str, Tuple[shared_memory.SharedMemory, MainConfig]] = {}
+
+
+class SharedInstance:
+    """
+    Publica los arreglos numéricos de un MainConfig (matrices de distancia y
+    tiempo, demandas, candidatos k-vecinos) en un solo bloque de
+    multiprocessing.shared_memory. Los trabajadores reciben self.handle, que
+    pesa O(n), y adjuntan el bloque por nombre: todos leen las mismas
+    páginas, así que la memoria y el arranque no crecen con el número de
+    trabajadores.
+
+    Las matrices que ya vienen mapeadas de un .npy (load_instance con
+    cache_dir) no se copian: el handle guarda la ruta y cada trabajador
+    vuelve a mapear el archivo. Las matrices perezosas (distance_mode="lazy")
+    viajan en el esqueleto, ya que solo guardan coordenadas.
+
+    El proceso que publica es dueño del bloque: close() lo libera (también al
+    salir del with).
+    """
+
+    def __init__(self, config: MainConfig):
+        arrays = {}
+        specs = {}
+        size = 0
+        for name in SHARED_FIELDS:
+            value = getattr(config, name)
+            if not isinstance(value, np.ndarray):
+                continue
+            if isinstance(value, np.memmap) and value.filename is not None:
+                specs[name] = _ArraySpec(value.dtype.str, value.shape, filename=value.filename)
+                continue
+            value = np.ascontiguousarray(value)
+            size = -(-size // _ALIGN) * _ALIGN
+            specs[name] = _ArraySpec(value.dtype.str, value.shape, offset=size)
+            arrays[name] = value
+            size += value.nbytes
+
+        self._shm = None
+        if arrays:
+            self._shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+            for name, value in arrays.items():
+                view = _view(self._shm.buf, specs[name])
+                view[...] = value
+                del view
+
+        skeleton = copy.copy(config)
+        for name in SHARED_FIELDS:
+            if name in specs:
+                setattr(skeleton, name, None)
+        skeleton.distance_km = None
+        skeleton.time_h = None
+
+        self.handle = InstanceHandle(
+            shm_name=self._shm.name if self._shm is not None else None,
+            arrays=specs,
+            skeleton=skeleton,
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return self._shm.size if self._shm is not None else 0
+
+    def close(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _view(buf, spec: _ArraySpec) -> np.ndarray:
+    return np.ndarray(spec.shape, dtype=np.dtype(spec.dtype), buffer=buf, offset=spec.offset)
+
+
+def attach(handle: InstanceHandle) -> MainConfig:
+    """
+    MainConfig con los arreglos como vistas de solo lectura sobre la memoria
+    compartida (o el .npy mapeado). Se adjunta una sola vez por proceso y
+    bloque; llamadas siguientes devuelven el mismo config.
+    """
+    if handle.shm_name is not None and handle.shm_name in _ATTACHED:
+        return _ATTACHED[handle.shm_name][1]
+
+    shm = None
+    if handle.shm_name is not None:
+        shm = shared_memory.SharedMemory(name=handle.shm_name)
+
+    config = copy.copy(handle.skeleton)
+    for name, spec in handle.arrays.items():
+        if spec.filename is not None:
+            array = np.load(spec.filename, mmap_mode="r")
+        else:
+            array = _view(shm.buf, spec)
+            array.flags.writeable = False
+        setattr(config, name, array)
+
+    config.distance_km = MatrixDictView(config.dist_matrix, config.node_index)
+    config.time_h = MatrixDictView(config.time_matrix, config.node_index)
+
+    if shm is not None:
+        _ATTACHED[handle.shm_name] = (shm, config)
+    return config
+
+
+def should_share(share_instance: Optional[bool] = None, ctx=None) -> bool:
+    """
+    share_instance=None decide según el método de arranque: con "fork" los
+    trabajadores ya heredan las matrices del padre sin copiarlas (copy-on-write)
+    y publicarlas solo agregaría otra copia; con "spawn" / "forkserver" el
+    MainConfig se serializaría entero para cada trabajador.
+
+    Sin ctx se consulta el método global sin fijarlo (allow_none=True): si
+    aún no se eligió, vale el de la plataforma (el primero de
+    get_all_start_methods) y el llamador todavía puede usar
+    mp.set_start_method.
+    """
+    if share_instance is not None:
+        return share_instance
+    if ctx is not None:
+        method = ctx.get_start_method()
+    else:
+        method = mp.get_start_method(allow_none=True) or mp.get_all_start_methods()[0]
+    return method != "fork"
+
+
+def resolve_config(config_or_handle) -> MainConfig:
+    """
+    Acepta un MainConfig o un InstanceHandle (lo que reciben los trabajadores).
+    """
+    if isinstance(config_or_handle, InstanceHandle):
+        return config_or_handle.attach()
+    return config_or_handle
@@ -0,0 +1,281 @@
+# spatial.py
+# Índice espacial (KD-tree sobre la esfera) y listas de candidatos k-vecinos
+
+import heapq
+from typing import Tuple
+
+import numpy as np
+
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def _to_xyz(lats, lons) -> np.ndarray:
+    """
+    Coordenadas en la esfera unitaria. La distancia de cuerda entre dos puntos
+    es monótona con la distancia Haversine, así que los vecinos coinciden.
+    """
+    phi = np.radians(np.asarray(lats, dtype=np.float64))
+    lam = np.radians(np.asarray(lons, dtype=np.float64))
+    cos_phi = np.cos(phi)
+    return np.column_stack((cos_phi * np.cos(lam), cos_phi * np.sin(lam), np.sin(phi)))
+
+
+def chord_to_km(chord: np.ndarray) -> np.ndarray:
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2.0, 0.0, 1.0))
+
+
+def km_to_chord(km: float) -> float:
+    return 2.0 * np.sin(min(km / EARTH_RADIUS_KM, np.pi) / 2.0)
+
+
+class SpatialIndex:
+    """
+    KD-tree sobre las coordenadas (lat, lon) llevadas a la esfera unitaria.
+    Construcción O(n log n) por partición en la mediana de la dimensión más
+    extendida; consultas k-vecinos y por radio con distancias Haversine (km).
+    Los índices devueltos son posiciones en los arreglos lats/lons dados.
+    """
+
+    def __init__(self, lats, lons, leaf_size: int = 32):
+        self.points = _to_xyz(lats, lons)
+        self.n = len(self.points)
+        self.leaf_size = max(1, leaf_size)
+        self._build()
+
+    # --------------------------------------------------------
+    # Construcción
+    # --------------------------------------------------------
+
+    def _build(self):
+        pts = self.points
+        perm = np.arange(self.n)
+
+        start, end, left, right, bmin, bmax = [], [], [], [], [], []
+
+        def new_node(s, e):
+            start.append(s)
+            end.append(e)
+            left.append(-1)
+            right.append(-1)
+            bmin.append(None)
+            bmax.append(None)
+            return len(start) - 1
+
+        stack = [new_node(0, self.n)]
+        while stack:
+            nid = stack.pop()
+            s, e = start[nid], end[nid]
+            if e == s:
+                bmin[nid] = np.full(3, np.inf)
+                bmax[nid] = np.full(3, -np.inf)
+                continue
+
+            sub = pts[perm[s:e]]
+            lo = sub.min(axis=0)
+            hi = sub.max(axis=0)
+            bmin[nid] = lo
+            bmax[nid] = hi
+
+            if e - s <= self.leaf_size:
+                continue
+
+            dim = int(np.argmax(hi - lo))
+            m = (s + e) // 2
+            seg = perm[s:e]
+            perm[s:e] = seg[np.argpartition(pts[seg, dim], m - s)]
+
+            left[nid] = new_node(s, m)
+            right[nid] = new_node(m, e)
+            stack.append(left[nid])
+            stack.append(right[nid])
+
+        self.perm = perm
+        self.sorted_points = pts[perm]
+        self.node_start = start
+        self.node_end = end
+        self.node_left = left
+        self.node_right = right
+        self.node_min = np.array(bmin)
+        self.node_max = np.array(bmax)
+
+    def _box_dist2(self, nid: int, q: np.ndarray) -> float:
+        gap = np.maximum(0.0, np.maximum(self.node_min[nid] - q, q - self.node_max[nid]))
+        return float(gap @ gap)
+
+    # --------------------------------------------------------
+    # Consultas
+    # --------------------------------------------------------
+
+    def query_knn(self, lat: float, lon: float, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Los k puntos más cercanos a (lat, lon): (distancias_km, índices), en
+        orden creciente de distancia.
+        """
+        q = _to_xyz([lat], [lon])[0]
+        d2, idx = self._knn_xyz(q, min(k, self.n))
+        return chord_to_km(np.sqrt(d2)), idx
+
+    def _knn_xyz(self, q: np.ndarray, k: int):
+        if k <= 0:
+            return np.zeros(0), np.zeros(0, dtype=np.intp)
+
+        best_d2 = np.full(k, np.inf)
+        best_pos = np.full(k, -1, dtype=np.intp)
+        worst = np.inf
+
+        pq = [(0.0, 0)]
+        while pq:
+            d2, nid = heapq.heappop(pq)
+            if d2 > worst:
+                break
+
+            left = self.node_left[nid]
+            if left == -1:
+                s, e = self.node_start[nid], self.node_end[nid]
+                diff = self.sorted_points[s:e] - q
+                leaf_d2 = np.einsum("ij,ij->i", diff, diff)
+
+                all_d2 = np.concatenate((best_d2, leaf_d2))
+                all_pos = np.concatenate((best_pos, np.arange(s, e)))
+                keep = np.argpartition(all_d2, k - 1)[:k] if len(all_d2) > k else np.arange(len(all_d2))
+                best_d2 = all_d2[keep]
+                best_pos = all_pos[keep]
+                worst = float(best_d2.max())
+                continue
+
+            right = self.node_right[nid]
+            heapq.heappush(pq, (self._box_dist2(left, q), left))
+            heapq.heappush(pq, (self._box_dist2(right, q), right))
+
+        order = np.argsort(best_d2, kind="stable")
+        best_d2 = best_d2[order]
+        best_pos = best_pos[order]
+        found = best_pos >= 0
+        return best_d2[found], self.perm[best_pos[found]]
+
+    def query_radius(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        """
+        Índices de los puntos a distancia Haversine <= radius_km de (lat, lon).
+        """
+        q = _to_xyz([lat], [lon])[0]
+        r2 = km_to_chord(radius_km) ** 2
+
+        found = []
+        stack = [0]
+        while stack:
+            nid = stack.pop()
+            if self._box_dist2(nid, q) > r2:
+                continue
+            left = self.node_left[nid]
+            if left == -1:
+                s, e = self.node_start[nid], self.node_end[nid]
+                diff = self.sorted_points[s:e] - q
+                inside = np.einsum("ij,ij->i", diff, diff) <= r2
+                found.append(self.perm[s:e][inside])
+                continue
+            stack.append(left)
+            stack.append(self.node_right[nid])
+
+        if not found:
+            return np.zeros(0, dtype=np.intp)
+        return np.sort(np.concatenate(found))
+
+    def _leaves_within(self, lo: np.ndarray, hi: np.ndarray, r2: float) -> list:
+        """
+        Hojas cuya caja está a distancia <= sqrt(r2) de la caja [lo, hi].
+        """
+        leaves = []
+        stack = [0]
+        while stack:
+            nid = stack.pop()
+            gap = np.maximum(0.0, np.maximum(self.node_min[nid] - hi, lo - self.node_max[nid]))
+            if float(gap @ gap) > r2:
+                continue
+            left = self.node_left[nid]
+            if left == -1:
+                leaves.append(nid)
+            else:
+                stack.append(left)
+                stack.append(self.node_right[nid])
+        return leaves
+
+    def knn_all(self, k: int, exclude=()) -> np.ndarray:
+        """
+        Lista de candidatos: para cada punto, sus k vecinos más cercanos
+        (sin sí mismo ni los índices en exclude). Matriz n x k; si hay menos
+        de k candidatos, se rellena con -1.
+
+        Se resuelve por hoja: con los puntos de la misma hoja se acota el
+        radio del k-ésimo vecino de todos sus puntos, y luego se comparan
+        contra las hojas que caen dentro de ese radio en una sola operación.
+        """
+        out = np.full((self.n, k), -1, dtype=np.intp)
+        k = min(k, max(0, self.n - 1))
+        if k == 0:
+            return out
+
+        excluded = np.zeros(self.n, dtype=bool)
+        excluded[list(exclude)] = True
+        excluded_sorted = excluded[self.perm]
+
+        for nid in range(len(self.node_start)):
+            if self.node_left[nid] != -1:
+                continue
+            s, e = self.node_start[nid], self.node_end[nid]
+            if e == s:
+                continue
+
+            own = self.sorted_points[s:e]
+            rows = np.arange(e - s)
+
+            # Cota superior del k-ésimo vecino usando solo la hoja
+            d2 = ((own[:, None, :] - own[None, :, :]) ** 2).sum(axis=2)
+            d2[rows, rows] = np.inf
+            d2[:, excluded_sorted[s:e]] = np.inf
+            if e - s > k:
+                bound = float(np.partition(d2, k - 1, axis=1)[:, k - 1].max())
+            else:
+                bound = np.inf
+
+            if np.isinf(bound):
+                # hoja demasiado pequeña: consulta punto a punto
+                for p in range(s, e):
+                    _, idx = self._knn_xyz(self.sorted_points[p], min(self.n, k + 1 + len(exclude)))
+                    i = self.perm[p]
+                    cand = [int(j) for j in idx if j != i and not excluded[j]][:k]
+                    out[i, :len(cand)] = cand
+                continue
+
+            leaves = self._leaves_within(self.node_min[nid], self.node_max[nid], bound)
+            cand_pos = np.concatenate([np.arange(self.node_start[l], self.node_end[l]) for l in leaves])
+            cand_pos = cand_pos[~excluded_sorted[cand_pos]]
+
+            diff = own[:, None, :] - self.sorted_points[cand_pos][None, :, :]
+            cd2 = np.einsum("ijk,ijk->ij", diff, diff)
+            cd2[cand_pos[None, :] == np.arange(s, e)[:, None]] = np.inf
+
+            kk = min(k, len(cand_pos))
+            part = np.argpartition(cd2, kk - 1, axis=1)[:, :kk]
+            order = np.argsort(np.take_along_axis(cd2, part, axis=1), axis=1, kind="stable")
+            nearest = np.take_along_axis(part, order, axis=1)
+            nearest_d2 = np.take_along_axis(cd2, nearest, axis=1)
+
+            result = self.perm[cand_pos[nearest]]
+            result[np.isinf(nearest_d2)] = -1
+            out[self.perm[s:e], :kk] = result
+
+        return out
+
+
+def build_spatial_index(config, k: int = 10, leaf_size: int = 32):
+    """
+    Construye config.spatial sobre los nodos indexados (depósito = 0) y
+    config.candidates: para cada nodo, sus k clientes más cercanos.
+    """
+    depot = config.depot
+    lats = [depot.lat] + [c.lat for c in config.clients.values()]
+    lons = [depot.lon] + [c.lon for c in config.clients.values()]
+
+    config.spatial = SpatialIndex(lats, lons, leaf_size=leaf_size)
+    config.candidates = config.spatial.knn_all(k, exclude=(0,))
@@ -0,0 +1,186 @@
+# steady_state.py
+# GA de estado estacionario: hijos de a uno (o pocos) con reemplazo del peor vía heap
+
+import heapq
+
+from data_loader import MainConfig
+from ga_algorithm import GeneticAlgorithm
+from operators import breed_offspring
+from representation import canonical_fingerprint
+
+
+class SteadyStateGA(GeneticAlgorithm):
+    """
+    Variante de estado estacionario de GeneticAlgorithm.
+
+    En vez de ordenar y reconstruir la población en cada generación, cada
+    paso elige padres por torneo, genera offspring_per_step hijos y cada hijo
+    reemplaza al peor individuo si es mejor que él. El peor se mantiene en la
+    raíz de un heap (-costo, orden de llegada, posición), así que el reemplazo
+    es O(log n) y solo se evalúan los individuos nuevos. Entre dos del mismo
+    costo sale primero el más antiguo.
+
+    Una "generación" (para generations, history, snapshots y checkpoints)
+    son pop_size - 5 hijos, las mismas evaluaciones que una generación del
+    GA generacional; por eso max_time, max_evaluations y
+    stagnation_generations funcionan igual.
+
+    Con dedupe=True se mantiene un conteo de huellas de toda la población
+    (no solo de los élites) y los hijos repetidos se re-mutan antes de evaluar.
+
+    Parámetros extra:
+      - tournament_size: individuos al azar por torneo de selección
+      - offspring_per_step: hijos generados con cada par de padres
+    """
+
+    _PARAMS = GeneticAlgorithm._PARAMS + ("tournament_size", "offspring_per_step")
+
+    def __init__(
+        self,
+        config: MainConfig,
+        tournament_size: int = 2,
+        offspring_per_step: int = 1,
+        **kwargs,
+    ):
+        if kwargs.get("workers", 1) > 1:
+            raise ValueError("SteadyStateGA genera hijos de a uno; use workers=1")
+        super().__init__(config, **kwargs)
+        self.tournament_size = max(1, int(tournament_size))
+        self.offspring_per_step = max(1, int(offspring_per_step))
+
+        # Heap de mínimos sobre (-costo, llegada, posición): la raíz es el peor
+        self._heap: list = []
+        self._arrivals = 0
+        self._best = None
+
+        # Huellas por posición y conteo por huella (solo con dedupe)
+        self._slot_keys: list = []
+        self._key_counts: dict = {}
+
+    # --------------------------------------------------------
+    # Heap
+    # --------------------------------------------------------
+
+    def _rebuild_heap(self):
+        self._heap = []
+        self._best = None
+        for pos, ind in enumerate(self.population):
+            self._push_entry(ind, pos)
+        heapq.heapify(self._heap)
+
+        if self.dedupe:
+            self._slot_keys = [canonical_fingerprint(s, self.config) for s in self.population]
+            self._key_counts = {}
+            for key in self._slot_keys:
+                self._key_counts[key] = self._key_counts.get(key, 0) + 1
+
+    def _push_entry(self, ind, pos: int):
+        self._evaluate(ind)
+        self._heap.append((-ind.cost, self._arrivals, pos))
+        self._arrivals += 1
+        if self._best is None or ind.cost < self._best.cost:
+            self._best = ind
+
+    def _insert(self, child) -> bool:
+        """
+        Reemplaza al peor por child si child es mejor. O(log n).
+        """
+        neg_worst, _, pos = self._heap[0]
+        if child.cost >= -neg_worst:
+            return False
+
+        self.population[pos] = child
+        heapq.heapreplace(self._heap, (-child.cost, self._arrivals, pos))
+        if self.dedupe:
+            self._replace_key(pos, canonical_fingerprint(child, self.config))
+        self._arrivals += 1
+        if child.cost < self._best.cost:
+            self._best = child
+        return True
+
+    def _replace_key(self, pos: int, key: bytes):
+        old = self._slot_keys[pos]
+        if self._key_counts[old] == 1:
+            del self._key_counts[old]
+        else:
+            self._key_counts[old] -= 1
+        self._slot_keys[pos] = key
+        self._key_counts[key] = self._key_counts.get(key, 0) + 1
+
+    def _tournament(self):
+        contenders = self.rng.sample(self.population, min(self.tournament_size, len(self.population)))
+        return min(contenders, key=self._evaluate)
+
+    # --------------------------------------------------------
+    # Ciclo
+    # --------------------------------------------------------
+
+    def init_population(self):
+        super().init_population()
+        self._arrivals = 0
+        self._rebuild_heap()
+
+    def step(self, gen: int, pool=None):
+        """
+        Una generación de estado estacionario: pop_size - 5 hijos, insertados
+        uno a uno. Devuelve el mejor individuo hasta ahora.
+        """
+        n_children = self.pop_size - min(self.elites, len(self.population))
+        produced = 0
+
+        while produced < n_children:
+            with self.metrics.timer("selection"):
+                parents = [self._tournament(), self._tournament()]
+
+            count = min(self.offspring_per_step, n_children - produced)
+            children = breed_offspring(
+                parents,
+                count,
+                self.config,
+                self.depot_code,
+                self.rng,
+                crossover_rate=self.crossover_rate,
+                mutation_rate=self.mutation_rate,
+                split=self.split,
+                cache=self.cache,
+                batch_eval=self.batch_eval,
+                educator=self.educator,
+                education_rate=self.education_rate,
+                metrics=self.metrics,
+                seen=self._key_counts if self.dedupe else None,
+                clone_retries=self.clone_retries,
+                vectorized=self.vectorized,
+            )
+            produced += len(children)
+
+            with self.metrics.timer("replacement"):
+                for child in children:
+                    self._insert(child)
+
+        self.evaluations += produced
+        return self._best
+
+    # --------------------------------------------------------
+    # Migración y checkpoints: mantener el heap coherente
+    # --------------------------------------------------------
+
+    def receive_migrants(self, migrants: list):
+        super().receive_migrants(migrants)
+        self._rebuild_heap()
+
+    def get_state(self) -> dict:
+        state = super().get_state()
+        state["heap"] = list(self._heap)
+        state["arrivals"] = self._arrivals
+        return state
+
+    def set_state(self, state: dict):
+        super().set_state(state)
+        self._heap = list(state["heap"])
+        self._arrivals = state["arrivals"]
+        self._best = min(self.population, key=self._evaluate)
+        if self.dedupe:
+            self._slot_keys = [canonical_fingerprint(s, self.config) for s in self.population]
+            self._key_counts = {}
+            for key in self._slot_keys:
+                self._key_counts[key] = self._key_counts.get(key, 0) + 1
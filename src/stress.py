@@ -0,0 +1,187 @@
+# stress.py
+# Barrido de tamaño de instancia: tiempo y memoria por fase (carga, población, generaciones)
+
+import json
+import multiprocessing as mp
+import os
+import resource
+import tempfile
+import time
+import tracemalloc
+from typing import Optional
+
+from data_loader import load_instance
+from ga_algorithm import GeneticAlgorithm
+from synthetic import generate_instance
+
+
+def _rss_mb() -> float:
+    """
+    RSS actual del proceso (MB). En Linux sale de /proc; si no, se usa el
+    máximo de getrusage.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        return _peak_rss_mb()
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss viene en KB en Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class _Phase:
+    """
+    Mide una fase: segundos, RSS al terminar y, con trace=True, el pico de
+    memoria asignada por Python/NumPy dentro de la fase (tracemalloc).
+    """
+
+    def __init__(self, row: dict, name: str, trace: bool):
+        self.row = row
+        self.name = name
+        self.trace = trace
+
+    def __enter__(self):
+        if self.trace:
+            tracemalloc.reset_peak()
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.row[f"{self.name}_s"] = time.perf_counter() - self.t0
+        self.row[f"{self.name}_rss_mb"] = _rss_mb()
+        if self.trace:
+            self.row[f"{self.name}_peak_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+        return False
+
+
+def measure_size(
+    n_clients: int,
+    generations: int = 5,
+    pop_size: int = 30,
+    distance_mode: str = "dense",
+    distribution: str = "uniform",
+    trace: bool = True,
+    seed: int = 0,
+    ga_kwargs: Optional[dict] = None,
+) -> dict:
+    """
+    Genera una instancia sintética de n_clients, la carga y corre unas
+    generaciones del GA, midiendo cada fase. Pensado para correr en un
+    proceso nuevo (ver sweep) para que el RSS no arrastre tamaños anteriores.
+    """
+    row = {
+        "n_clients": n_clients,
+        "distance_mode": distance_mode,
+        "distribution": distribution,
+        "generations": generations,
+        "pop_size": pop_size,
+        "rss_start_mb": _rss_mb(),
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = generate_instance(
+            os.path.join(tmp, f"sintetico_{n_clients}"),
+            n_clients,
+            distribution=distribution,
+            seed=seed,
+        )
+
+        if trace:
+            tracemalloc.start()
+        try:
+            with _Phase(row, "load", trace):
+                config = load_instance(folder, distance_mode=distance_mode)
+
+            ga = GeneticAlgorithm(
+                config, pop_size=pop_size, generations=generations, seed=seed,
+                verbose=False, **(ga_kwargs or {})
+            )
+            with _Phase(row, "init_population", trace):
+                ga.init_population()
+
+            gen_times = []
+            with _Phase(row, "evolve", trace):
+                for gen in range(generations):
+                    t0 = time.perf_counter()
+                    best = ga.step(gen)
+                    gen_times.append(time.perf_counter() - t0)
+        finally:
+            if trace:
+                tracemalloc.stop()
+
+    row["s_per_generation"] = sum(gen_times) / len(gen_times) if gen_times else 0.0
+    row["best_cost"] = best.cost if gen_times else None
+    row["peak_rss_mb"] = _peak_rss_mb()
+    return row
+
+
+def _measure_in_child(queue, kwargs):
+    try:
+        queue.put(measure_size(**kwargs))
+    except MemoryError:
+        queue.put({"n_clients": kwargs["n_clients"], "error": "MemoryError"})
+
+
+def sweep(
+    sizes=(1_000, 2_000, 5_000, 10_000, 20_000),
+    lazy_above: int = 8_000,
+    jsonl_path: Optional[str] = None,
+    **kwargs,
+) -> list:
+    """
+    Corre measure_size para cada tamaño en un proceso aparte. Desde
+    lazy_above clientes se usa distance_mode="lazy" (la matriz densa de 20k
+    nodos pesa ~3.2 GB por matriz). Si un tamaño muere (p. ej. por el OOM
+    killer) se registra el código de salida y se sigue con el siguiente.
+    """
+    ctx = mp.get_context("spawn")
+    rows = []
+    for n in sizes:
+        mode = "lazy" if lazy_above is not None and n >= lazy_above else "dense"
+        params = dict(kwargs, n_clients=n, distance_mode=kwargs.get("distance_mode", mode))
+
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_measure_in_child, args=(queue, params))
+        proc.start()
+        proc.join()
+        if proc.exitcode == 0 and not queue.empty():
+            row = queue.get()
+        else:
+            row = {"n_clients": n, "distance_mode": params["distance_mode"],
+                   "error": f"exitcode {proc.exitcode}"}
+
+        rows.append(row)
+        if jsonl_path:
+            with open(jsonl_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(row) + "\n")
+
+    return rows
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Barrido de escalamiento tiempo/memoria")
+    parser.add_argument("sizes", nargs="*", type=int, default=[1_000, 2_000, 5_000, 10_000, 20_000])
+    parser.add_argument("--generations", type=int, default=5)
+    parser.add_argument("--pop-size", type=int, default=30)
+    parser.add_argument("--distribution", default="uniform")
+    parser.add_argument("--lazy-above", type=int, default=8_000)
+    parser.add_argument("--no-trace", action="store_true", help="sin tracemalloc (menos overhead)")
+    parser.add_argument("--jsonl", help="agregar cada fila como una línea JSON")
+    args = parser.parse_args()
+
+    for row in sweep(
+        args.sizes,
+        lazy_above=args.lazy_above,
+        jsonl_path=args.jsonl,
+        generations=args.generations,
+        pop_size=args.pop_size,
+        distribution=args.distribution,
+        trace=not args.no_trace,
+    ):
+        print(json.dumps(row))
@@ -0,0 +1,205 @@
+# synthetic.py
+# Generador de instancias sintéticas (mismos CSV que lee load_instance)
+
+import math
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Caja aproximada de Bogotá (lat_min, lat_max, lon_min, lon_max)
+BOGOTA_BBOX = (4.55, 4.80, -74.20, -74.02)
+
+DISTRIBUTIONS = ("uniform", "clustered")
+DEMAND_PROFILES = ("uniform", "heavy_tail", "constant")
+
+VEHICLE_TYPES = ("small van", "medium van", "light truck")
+
+# Mismos valores que data/Proyecto_Caso_3/parameters_urban.csv
+URBAN_PARAMETERS = [
+    ("C_fixed", 50000, "COP/vehicle", "Fixed activation cost per vehicle"),
+    ("C_dist", 2500, "COP/km", "Variable cost per kilometer (maintenance and wear)"),
+    ("C_time", 7600, "COP/hour", "Urban driver hourly cost"),
+    ("fuel_price", 16300, "COP/gallon", "Gasoline price"),
+    ("fuel_efficiency_van_small_min", 35, "km/gallon", "Small van minimum fuel efficiency"),
+    ("fuel_efficiency_van_small_max", 45, "km/gallon", "Small van maximum fuel efficiency"),
+    ("fuel_efficiency_van_medium_min", 25, "km/gallon", "Medium van minimum fuel efficiency"),
+    ("fuel_efficiency_van_medium_max", 35, "km/gallon", "Medium van maximum fuel efficiency"),
+    ("fuel_efficiency_truck_light_min", 22, "km/gallon", "Light truck minimum fuel efficiency"),
+    ("fuel_efficiency_truck_light_max", 28, "km/gallon", "Light truck maximum fuel efficiency"),
+]
+
+# Mismos valores que data/Proyecto_Caso_Base/parameters_base.csv
+BASE_PARAMETERS = [
+    ("fuel_price", 16300, "COP/gallon", "Standard gasoline price"),
+    ("fuel_efficiency_typical", 30, "km/gallon", "Typical vehicle fuel efficiency estimate"),
+]
+
+# Depósitos de los casos 2 y 3 (Longitude, Latitude)
+DEPOTS = [
+    ("CD01", -74.08124218159384, 4.75021190869025),
+    ("CD02", -74.10993358606953, 4.5363832206427785),
+    ("CD03", -74.03854814565923, 4.792925960208614),
+]
+
+KM_PER_DEG_LAT = 111.32
+
+
+# =========================
+# Coordenadas y demandas
+# =========================
+
+def sample_coordinates(
+    n: int,
+    rng: np.random.Generator,
+    distribution: str = "uniform",
+    bbox: Tuple[float, float, float, float] = BOGOTA_BBOX,
+    n_clusters: int = 8,
+    cluster_std_km: float = 1.5,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (lats, lons) de n clientes dentro de bbox:
+      - "uniform": uniformes en la caja
+      - "clustered": n_clusters centros uniformes en la caja y clientes
+        normales alrededor (desviación cluster_std_km), recortados a la caja
+    """
+    lat_min, lat_max, lon_min, lon_max = bbox
+
+    if distribution == "uniform":
+        return rng.uniform(lat_min, lat_max, n), rng.uniform(lon_min, lon_max, n)
+
+    if distribution == "clustered":
+        centers_lat = rng.uniform(lat_min, lat_max, n_clusters)
+        centers_lon = rng.uniform(lon_min, lon_max, n_clusters)
+        # tamaños de cluster desiguales, como barrios con distinta densidad
+        weights = rng.dirichlet(np.full(n_clusters, 2.0))
+        labels = rng.choice(n_clusters, size=n, p=weights)
+
+        std_lat = cluster_std_km / KM_PER_DEG_LAT
+        std_lon = cluster_std_km / (KM_PER_DEG_LAT * math.cos(math.radians(0.5 * (lat_min + lat_max))))
+        lats = centers_lat[labels] + rng.normal(0.0, std_lat, n)
+        lons = centers_lon[labels] + rng.normal(0.0, std_lon, n)
+        return np.clip(lats, lat_min, lat_max), np.clip(lons, lon_min, lon_max)
+
+    raise ValueError(f"Distribución desconocida: {distribution!r}. Opciones: {DISTRIBUTIONS}")
+
+
+def sample_demands(
+    n: int,
+    rng: np.random.Generator,
+    profile: str = "uniform",
+    demand_range: Tuple[int, int] = (5, 20),
+) -> np.ndarray:
+    """
+    Demandas enteras:
+      - "uniform": uniformes en demand_range (como los casos del proyecto)
+      - "heavy_tail": lognormal con la media del rango, recortada a
+        [low, 4 * high] (pocos clientes grandes)
+      - "constant": todas iguales al punto medio del rango
+    """
+    low, high = demand_range
+
+    if profile == "uniform":
+        return rng.integers(low, high + 1, n)
+
+    if profile == "heavy_tail":
+        mean = 0.5 * (low + high)
+        sigma = 0.8
+        raw = rng.lognormal(math.log(mean) - 0.5 * sigma ** 2, sigma, n)
+        return np.clip(np.rint(raw), low, 4 * high).astype(np.int64)
+
+    if profile == "constant":
+        return np.full(n, int(round(0.5 * (low + high))), dtype=np.int64)
+
+    raise ValueError(f"Perfil de demanda desconocido: {profile!r}. Opciones: {DEMAND_PROFILES}")
+
+
+# =========================
+# Escritura de la instancia
+# =========================
+
+def _codes(prefix: str, n: int) -> list:
+    width = max(3, len(str(n)))
+    return [f"{prefix}{i:0{width}d}" for i in range(1, n + 1)]
+
+
+def generate_instance(
+    folder: str,
+    n_clients: int,
+    n_vehicles: Optional[int] = None,
+    distribution: str = "uniform",
+    demand_profile: str = "uniform",
+    demand_range: Tuple[int, int] = (5, 20),
+    n_clusters: int = 8,
+    cluster_std_km: float = 1.5,
+    schema: str = "urban",
+    seed: int = 0,
+) -> str:
+    """
+    Escribe en folder una instancia con los mismos archivos y columnas que
+    data/Proyecto_Caso_*: clients.csv, vehicles.csv, depots.csv y
+    parameters_urban.csv (schema="urban", como los casos 2 y 3) o
+    parameters_base.csv (schema="base").
+
+    Sin n_vehicles se usan los necesarios para cubrir 1.2 veces la demanda
+    total con la capacidad media. Devuelve la ruta de la carpeta, lista para
+    load_instance.
+    """
+    if schema not in ("urban", "base"):
+        raise ValueError(f"Esquema desconocido: {schema!r}. Opciones: ('urban', 'base')")
+
+    rng = np.random.default_rng(seed)
+    os.makedirs(folder, exist_ok=True)
+
+    # --- clientes ---
+    lats, lons = sample_coordinates(
+        n_clients, rng, distribution, n_clusters=n_clusters, cluster_std_km=cluster_std_km
+    )
+    demands = sample_demands(n_clients, rng, demand_profile, demand_range)
+    ids = np.arange(1, n_clients + 1)
+    pd.DataFrame({
+        "ClientID": ids,
+        "StandardizedID": _codes("C", n_clients),
+        "LocationID": ids + len(DEPOTS),
+        "Latitude": lats,
+        "Longitude": lons,
+        "Demand": demands,
+    }).to_csv(os.path.join(folder, "clients.csv"), index=False)
+
+    # --- vehículos (capacidad y rango en los rangos de Caso_3) ---
+    if n_vehicles is None:
+        mean_capacity = 125.0
+        n_vehicles = max(1, math.ceil(1.2 * float(demands.sum()) / mean_capacity))
+    vehicles = {
+        "VehicleID": np.arange(1, n_vehicles + 1),
+        "StandardizedID": _codes("V", n_vehicles),
+        "Capacity": rng.integers(110, 141, n_vehicles),
+        "Range": rng.integers(140, 201, n_vehicles),
+    }
+    if schema == "urban":
+        vehicles["VehicleType"] = rng.choice(VEHICLE_TYPES, n_vehicles)
+    pd.DataFrame(vehicles).to_csv(os.path.join(folder, "vehicles.csv"), index=False)
+
+    # --- depósitos (Capacity en unidades de demanda, repartida en partes iguales,
+    # con 10% de holgura para que la asignación cliente → depósito sea factible) ---
+    total = int(demands.sum())
+    share = math.ceil(1.1 * total / len(DEPOTS))
+    pd.DataFrame({
+        "DepotID": np.arange(1, len(DEPOTS) + 1),
+        "StandardizedID": [code for code, _, _ in DEPOTS],
+        "LocationID": np.arange(1, len(DEPOTS) + 1),
+        "Longitude": [lon for _, lon, _ in DEPOTS],
+        "Latitude": [lat for _, _, lat in DEPOTS],
+        "Capacity": [share] * len(DEPOTS),
+    }).to_csv(os.path.join(folder, "depots.csv"), index=False)
+
+    # --- parámetros ---
+    rows = URBAN_PARAMETERS if schema == "urban" else BASE_PARAMETERS
+    name = "parameters_urban.csv" if schema == "urban" else "parameters_base.csv"
+    pd.DataFrame(rows, columns=["Parameter", "Value", "Unit", "Description"]).to_csv(
+        os.path.join(folder, name), index=False
+    )
+
+    return folder
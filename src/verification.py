@@ -6,13 +6,34 @@ from representation import CVRPSolution
 from evaluation import get_representative_fuel_cost_per_km
 
 
-def export_verification(solution: CVRPSolution, config: MainConfig, filename: str):
+def export_verification(solution, config: MainConfig, filename: str):
     """
     Genera el CSV de verificación en el formato exacto que espera
     base_case_verification.py (sin decimales en enteros).
+
+    solution puede ser un CVRPSolution (un depósito, config.depot) o un
+    decomposition.MultiDepotSolution: cada ruta se escribe con el DepotId de
+    su región y los VehicleId siguen numerándose entre regiones (config se
+    ignora, cada región trae el suyo). El VehicleId es la posición de la ruta
+    en solution.routes (las rutas triviales no se escriben pero ocupan su
+    número), igual con uno o con varios depósitos.
     """
+    if hasattr(solution, "parts"):
+        data = []
+        first_vehicle = 0
+        for part_config, part in solution.parts:
+            data.extend(_verification_rows(part, part_config, first_vehicle=first_vehicle))
+            first_vehicle += len(part.routes)
+    else:
+        data = _verification_rows(solution, config)
+
+    df = pd.DataFrame(data)
+    df.to_csv(filename, index=False)
+    print(f"Archivo de verificación guardado en: {filename}")
+
 
-    # Tomamos el único depósito
+def _verification_rows(solution: CVRPSolution, config: MainConfig, first_vehicle: int = 0) -> list:
+    # Depósito de la solución (uno por config)
     depot = config.depot
     depot_numeric_id = depot.numeric_id
 
@@ -80,7 +101,7 @@ def export_verification(solution: CVRPSolution, config: MainConfig, filename: st
         # SALIDA FINAL (ENTEROS LIMPIOS)
         # =========================
         row = {
-            "VehicleId": f"V{i+1:03}",
+            "VehicleId": f"V{first_vehicle + i + 1:03}",
             "DepotId": depot_label,
             # 🔹 ahora sí: carga total de la ruta, entero
             "InitialLoad": int(route_load),
@@ -95,6 +116,4 @@ def export_verification(solution: CVRPSolution, config: MainConfig, filename: st
 
         data.append(row)
 
-    df = pd.DataFrame(data)
-    df.to_csv(filename, index=False)
-    print(f"Archivo de verificación guardado en: {filename}")
+    return data
@@ -0,0 +1,53 @@
+# test_delta_evaluation.py
+# Deltas O(1) de IncrementalEvaluator contra la evaluación completa
+
+import copy
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from data_loader import CASES, load_instance  # noqa: E402
+from delta_evaluation import IncrementalEvaluator  # noqa: E402
+from evaluation import evaluate_solution  # noqa: E402
+from representation import IndexedSolution  # noqa: E402
+
+
+def _asymmetric(config, seed=0):
+    # Como una red vial: cada sentido con su propio factor
+    rng = np.random.default_rng(seed)
+    road = copy.copy(config)
+    factor = rng.uniform(1.0, 2.5, size=config.dist_matrix.shape)
+    road.dist_matrix = np.asarray(config.dist_matrix) * factor
+    road.time_matrix = np.asarray(config.time_matrix) * factor
+    np.fill_diagonal(road.dist_matrix, 0.0)
+    np.fill_diagonal(road.time_matrix, 0.0)
+    road.symmetric = False
+    return road
+
+
+@pytest.mark.parametrize("symmetric", [True, False])
+def test_two_opt_delta_matches_full_evaluation(symmetric):
+    config = load_instance(CASES["Caso_Base"], neighbors_k=0)
+    if not symmetric:
+        config = _asymmetric(config)
+    n = len(config.node_codes) - 1
+    solution = IndexedSolution(np.arange(1, n + 1, dtype=np.int32), list(range(0, n, 8)) + [n])
+
+    ev = IncrementalEvaluator(solution, config)
+    assert ev.symmetric == symmetric
+    rng = np.random.default_rng(1)
+    current = evaluate_solution(ev.to_solution(), config)
+
+    for _ in range(200):
+        r = int(rng.integers(len(ev.routes)))
+        length = len(ev.routes[r])
+        i, j = sorted(rng.choice(length, size=2, replace=False).tolist())
+        delta = ev.delta_two_opt(r, i, j)
+        ev.apply_two_opt(r, i, j)
+        new = evaluate_solution(ev.to_solution(), config)
+        assert delta == pytest.approx(new - current, rel=1e-9, abs=1e-6)
+        current = new
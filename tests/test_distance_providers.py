@@ -0,0 +1,250 @@
+# test_distance_providers.py
+# OSRMTableProvider contra un servidor /table falso en 127.0.0.1 (sin red externa)
+
+import json
+import math
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from distance_providers import (  # noqa: E402
+    DistanceProvider,
+    HaversineProvider,
+    OSRMTableProvider,
+    RoutingServiceError,
+)
+
+
+ROAD_FACTOR = 1.25
+ROAD_SPEED_KMH = 30.0
+
+
+def _haversine_m(a, b):
+    (lon1, lat1), (lon2, lat2) = a, b
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    x = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 6371000.0 * 2 * math.atan2(math.sqrt(x), math.sqrt(1 - x))
+
+
+class _StubOSRM(BaseHTTPRequestHandler):
+    """
+    /table/v1/<perfil>/<lon,lat;...>: Haversine * ROAD_FACTOR en metros y
+    segundos a ROAD_SPEED_KMH. Cada fail_every-ésima consulta responde 503.
+    Los pares con un extremo en server.offroad (coordenadas (lon, lat)) y
+    distinto origen y destino vuelven como null.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.clients.add(self.client_address)
+            n = server.requests
+
+        if server.fail_every and n % server.fail_every == 0:
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        url = urlsplit(self.path)
+        coords = [tuple(map(float, c.split(","))) for c in url.path.rsplit("/", 1)[-1].split(";")]
+        query = parse_qs(url.query)
+        sources = [int(k) for k in query["sources"][0].split(";")]
+        destinations = [int(k) for k in query["destinations"][0].split(";")]
+        server.max_coords = max(server.max_coords, len(coords))
+
+        def routable(i, j):
+            return i == j or (coords[i] not in server.offroad and coords[j] not in server.offroad)
+
+        distances = [[_haversine_m(coords[i], coords[j]) * ROAD_FACTOR if routable(i, j) else None
+                      for j in destinations] for i in sources]
+        durations = [[None if d is None else d / (ROAD_SPEED_KMH / 3.6) for d in row]
+                     for row in distances]
+        body = json.dumps({"code": "Ok", "distances": distances, "durations": durations}).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubOSRM)
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.clients = set()
+    server.max_coords = 0
+    server.fail_every = 0
+    server.offroad = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _points(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(4.55, 4.80, n), rng.uniform(-74.20, -74.02, n)
+
+
+def _url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_table_tiles_keepalive_and_retries(stub):
+    stub.fail_every = 7
+    lats, lons = _points(230)
+    provider = OSRMTableProvider(_url(stub), tile_size=50, max_workers=4, backoff=0.0)
+
+    dist, time_h = provider.table(lats, lons)
+
+    # 5 x 5 teselas, cada una con a lo sumo 2 * tile_size coordenadas
+    assert stub.max_coords <= 100
+    assert provider.stats["requests"] == 25 + provider.stats["retries"]
+    assert provider.stats["retries"] >= 1
+    # keep-alive: una conexión por hilo, no una por consulta
+    assert provider.stats["connections"] <= 4
+    assert len(stub.clients) <= 4
+
+    expected, _ = HaversineProvider().table(lats.round(6), lons.round(6))
+    assert np.allclose(dist, expected * ROAD_FACTOR, rtol=1e-9)
+    assert np.allclose(time_h, dist / ROAD_SPEED_KMH, rtol=1e-9)
+    assert np.all(np.diag(dist) == 0.0)
+
+
+def test_pair_cache_avoids_requests(stub, tmp_path):
+    lats, lons = _points(120, seed=1)
+    cache_path = str(tmp_path / "pairs.sqlite")
+
+    first = OSRMTableProvider(_url(stub), tile_size=40, cache_path=cache_path)
+    dist, time_h = first.table(lats, lons)
+    requests = stub.requests
+
+    second = OSRMTableProvider(_url(stub), tile_size=40, cache_path=cache_path)
+    dist2, time2 = second.table(lats, lons)
+
+    assert stub.requests == requests
+    assert second.stats["requests"] == 0
+    assert second.stats["cached_tiles"] == 9
+    assert np.array_equal(dist, dist2)
+    assert np.array_equal(time_h, time2)
+
+
+def test_unroutable_pairs_are_cached(stub, tmp_path):
+    lats, lons = _points(60, seed=2)
+    lats, lons = lats.round(6), lons.round(6)
+    stub.offroad = {(lons[5], lats[5])}
+    cache_path = str(tmp_path / "pairs.sqlite")
+
+    first = OSRMTableProvider(_url(stub), tile_size=20, cache_path=cache_path)
+    dist, time_h = first.table(lats, lons)
+    requests = stub.requests
+
+    second = OSRMTableProvider(_url(stub), tile_size=20, cache_path=cache_path)
+    dist2, time2 = second.table(lats, lons)
+
+    # La tesela con el punto sin ruta tampoco se vuelve a pedir
+    assert stub.requests == requests
+    assert second.stats["cached_tiles"] == 9
+    assert first.stats["unroutable"] == second.stats["unroutable"] == 2 * (60 - 1)
+    assert np.array_equal(dist, dist2)
+    assert np.array_equal(time_h, time2)
+
+
+def test_unroutable_pairs_fall_back_to_haversine(stub):
+    lats, lons = _points(30, seed=3)
+    lats, lons = lats.round(6), lons.round(6)
+    stub.offroad = {(lons[4], lats[4]), (lons[17], lats[17])}
+    provider = OSRMTableProvider(_url(stub), tile_size=10, fallback_speed_kmh=20.0)
+
+    dist, time_h = provider.table(lats, lons)
+
+    # Filas y columnas de los dos puntos, menos la diagonal
+    missing = np.zeros((30, 30), dtype=bool)
+    missing[[4, 17], :] = True
+    missing[:, [4, 17]] = True
+    np.fill_diagonal(missing, False)
+    assert provider.stats["unroutable"] == missing.sum()
+
+    straight, _ = HaversineProvider().table(lats, lons)
+    assert np.allclose(dist[missing], straight[missing], rtol=1e-12)
+    assert np.allclose(time_h[missing], straight[missing] / 20.0, rtol=1e-12)
+    assert np.allclose(dist[~missing], straight[~missing] * ROAD_FACTOR, rtol=1e-9)
+
+
+class _OneWayProvider(DistanceProvider):
+    # Ida más larga que vuelta, como en calles de un sentido
+    def table(self, lats, lons):
+        dist, time_h = HaversineProvider().table(lats, lons)
+        skew = np.triu(np.full(dist.shape, 1.5)) + np.tril(np.ones(dist.shape), -1)
+        return dist * skew, time_h * skew
+
+    def cache_key(self):
+        return b"one-way"
+
+
+def test_symmetric_flag_follows_provider():
+    from data_loader import CASES, load_instance
+
+    assert load_instance(CASES["Caso_Base"], neighbors_k=0).symmetric
+    config = load_instance(CASES["Caso_Base"], neighbors_k=0, provider=_OneWayProvider())
+    assert not config.symmetric
+
+
+def test_unreachable_host_raises_after_retries():
+    lats, lons = _points(3)
+    provider = OSRMTableProvider("http://127.0.0.1:9", retries=2, backoff=0.0, timeout=2.0)
+
+    with pytest.raises(RoutingServiceError):
+        provider.table(lats, lons)
+    assert provider.stats["retries"] == 2
+
+
+def test_cache_key_depends_on_fallback_speed():
+    a = OSRMTableProvider("http://127.0.0.1:5000", fallback_speed_kmh=45.0)
+    b = OSRMTableProvider("http://127.0.0.1:5000", fallback_speed_kmh=30.0)
+    assert a.cache_key() != b.cache_key()
+
+
+def test_multi_depot_regions_use_provider(stub):
+    from data_loader import CASES
+    from decomposition import load_multi_depot, solve_multi_depot
+
+    provider = OSRMTableProvider(_url(stub), tile_size=50)
+    config, depots = load_multi_depot(CASES["Caso_2"], provider=provider)
+    result = solve_multi_depot(config, depots, seed=1, workers=2, pop_size=8, generations=2)
+
+    assert stub.requests > 0
+    for sub, _ in result.parts:
+        lats = np.array([sub.depot.lat] + [c.lat for c in sub.clients.values()]).round(6)
+        lons = np.array([sub.depot.lon] + [c.lon for c in sub.clients.values()]).round(6)
+        expected, _ = HaversineProvider().table(lats, lons)
+        assert np.allclose(np.asarray(sub.dist_matrix), expected * ROAD_FACTOR, rtol=1e-9)
+        assert not isinstance(sub.provider, HaversineProvider)
+
+
+def test_lazy_regions_reject_road_provider(stub):
+    from data_loader import CASES
+    from decomposition import load_multi_depot, solve_multi_depot
+
+    config, depots = load_multi_depot(CASES["Caso_2"], provider=OSRMTableProvider(_url(stub)))
+    with pytest.raises(ValueError):
+        solve_multi_depot(config, depots, workers=1, distance_mode="lazy", pop_size=8, generations=2)
@@ -0,0 +1,30 @@
+# test_islands.py
+# Modelo de islas: errores dentro de una isla llegan al proceso padre
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from data_loader import CASES, load_instance  # noqa: E402
+from islands import IslandError, run_islands  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def config():
+    return load_instance(CASES["Caso_Base"])
+
+
+def test_islands_run(config):
+    result = run_islands(config, n_islands=2, generations=4, migration_interval=2,
+                         seed=3, pop_size=8)
+    assert len(result.histories) == 2
+    assert all(len(h) == 4 for h in result.histories)
+
+
+def test_island_failure_carries_traceback(config):
+    # GeneticAlgorithm rechaza max_evaluations < pop_size dentro de la isla
+    with pytest.raises(IslandError, match=r"(?s)isla 0.*ValueError: max_evaluations"):
+        run_islands(config, n_islands=2, generations=4, seed=3, pop_size=8, max_evaluations=4)
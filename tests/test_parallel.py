@@ -0,0 +1,43 @@
+# test_parallel.py
+# Semillas de los trabajadores y del pool de procesos
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from data_loader import CASES, load_instance  # noqa: E402
+from ga_algorithm import GeneticAlgorithm  # noqa: E402
+from parallel import chunk_seeds, spawn_seeds  # noqa: E402
+
+
+def test_spawn_seeds_reproducible():
+    assert spawn_seeds(7, 4) == spawn_seeds(7, 4)
+    assert len(set(spawn_seeds(7, 4))) == 4
+    assert chunk_seeds(7, 0, 3) != chunk_seeds(7, 1, 3)
+
+
+@pytest.mark.parametrize("seed", [-1, -(2 ** 70)])
+def test_negative_seeds_are_accepted(seed):
+    # random.seed acepta negativos; las semillas derivadas también deben
+    assert spawn_seeds(seed, 2) == spawn_seeds(seed % 2 ** 64, 2)
+    assert len(chunk_seeds(seed, 3, 2)) == 2
+
+
+def test_negative_seed_with_workers():
+    config = load_instance(CASES["Caso_Base"])
+    ga = GeneticAlgorithm(config, pop_size=10, generations=2, seed=-1, workers=2, verbose=False)
+    best, history = ga.evolve()
+    assert len(history) == 2
+    assert best.cost == min(history)
+
+
+def test_negative_seed_multi_depot():
+    from decomposition import load_multi_depot, solve_multi_depot
+
+    config, depots = load_multi_depot(CASES["Caso_2"])
+    a = solve_multi_depot(config, depots, seed=-1, workers=1, pop_size=8, generations=2)
+    b = solve_multi_depot(config, depots, seed=-1, workers=1, pop_size=8, generations=2)
+    assert a.cost == b.cost
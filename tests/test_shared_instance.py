@@ -0,0 +1,25 @@
+# test_shared_instance.py
+# Decisión de publicar la instancia según el método de arranque
+
+import os
+import subprocess
+import sys
+import textwrap
+
+SRC = os.path.join(os.path.dirname(__file__), "..", "src")
+
+
+def test_should_share_does_not_fix_start_method():
+    # En un proceso nuevo: el método global aún no está elegido
+    code = textwrap.dedent(f"""
+        import sys
+        sys.path.insert(0, {os.path.abspath(SRC)!r})
+        import multiprocessing as mp
+        from shared_instance import should_share
+
+        should_share()
+        assert mp.get_start_method(allow_none=True) is None
+        mp.set_start_method("spawn")
+        assert should_share() is True
+    """)
+    subprocess.run([sys.executable, "-c", code], check=True)
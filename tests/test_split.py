@@ -0,0 +1,112 @@
+# test_split.py
+# Split óptimo (Bellman) contra una programación dinámica explícita
+
+import copy
+import dataclasses
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from data_loader import CASES, load_instance  # noqa: E402
+from distance_providers import OSRMTableProvider  # noqa: E402
+from evaluation import (  # noqa: E402
+    get_representative_capacity,
+    get_representative_fuel_cost_per_km,
+    get_representative_max_range_km,
+)
+from operators import _optimal_breaks  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def base():
+    # Rango de 35 km para que R sí limite las rutas (Q = 55 ya limita)
+    config = load_instance(CASES["Caso_Base"], neighbors_k=0)
+    config.vehicles = {
+        code: dataclasses.replace(v, max_range_km=35.0) for code, v in config.vehicles.items()
+    }
+    return config
+
+
+def _road_config(config, seed=0):
+    # Matriz sin desigualdad triangular: atajos y desvíos aleatorios
+    rng = np.random.default_rng(seed)
+    road = copy.copy(config)
+    factor = rng.choice([0.3, 1.0, 3.0], size=config.dist_matrix.shape, p=[0.2, 0.5, 0.3])
+    road.dist_matrix = np.asarray(config.dist_matrix) * factor
+    road.time_matrix = np.asarray(config.time_matrix) * factor
+    np.fill_diagonal(road.dist_matrix, 0.0)
+    np.fill_diagonal(road.time_matrix, 0.0)
+    road.provider = OSRMTableProvider("http://127.0.0.1:9")
+    road.symmetric = False
+    return road
+
+
+def _bellman(idx, config):
+    """
+    O(n²) sin supuestos sobre la matriz: cada ruta se recorre completa.
+    """
+    Q = get_representative_capacity(config)
+    R = get_representative_max_range_km(config)
+    per_km = config.C_dist + get_representative_fuel_cost_per_km(config)
+    D, T = config.dist_matrix, config.time_matrix
+
+    n = len(idx)
+    V = [0.0] + [np.inf] * n
+    pred = [0] * (n + 1)
+    for j in range(1, n + 1):
+        for i in range(j):
+            route = np.concatenate(([0], idx[i:j], [0]))
+            d = D[route[:-1], route[1:]].sum()
+            t = T[route[:-1], route[1:]].sum()
+            if j - i > 1 and (config.demands[idx[i:j]].sum() > Q or d > R):
+                continue
+            cost = V[i] + config.C_fixed + per_km * d + config.C_time * t
+            if cost < V[j] - 1e-9:
+                V[j], pred[j] = cost, i
+    return V[n]
+
+
+def _cost(breaks, idx, config):
+    per_km = config.C_dist + get_representative_fuel_cost_per_km(config)
+    total = 0.0
+    for a, b in zip(breaks[:-1], breaks[1:]):
+        route = np.concatenate(([0], idx[a:b], [0]))
+        d = config.dist_matrix[route[:-1], route[1:]].sum()
+        t = config.time_matrix[route[:-1], route[1:]].sum()
+        total += config.C_fixed + per_km * d + config.C_time * t
+    return total
+
+
+def _feasible(breaks, idx, config):
+    Q = get_representative_capacity(config)
+    R = get_representative_max_range_km(config)
+    for a, b in zip(breaks[:-1], breaks[1:]):
+        if b - a == 1:
+            continue
+        route = np.concatenate(([0], idx[a:b], [0]))
+        if config.demands[idx[a:b]].sum() > Q or config.dist_matrix[route[:-1], route[1:]].sum() > R:
+            return False
+    return True
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_optimal_split_matches_bellman(base, seed):
+    rng = np.random.default_rng(seed)
+    idx = rng.permutation(np.arange(1, len(base.node_codes)))
+    breaks = _optimal_breaks(idx, base)
+    assert _feasible(breaks, idx, base)
+    assert _cost(breaks, idx, base) == pytest.approx(_bellman(idx, base), rel=1e-9)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_optimal_split_without_triangle_inequality(base, seed):
+    road = _road_config(base, seed)
+    rng = np.random.default_rng(seed)
+    idx = rng.permutation(np.arange(1, len(base.node_codes)))
+    breaks = _optimal_breaks(idx, road)
+    assert _feasible(breaks, idx, road)
+    assert _cost(breaks, idx, road) == pytest.approx(_bellman(idx, road), rel=1e-9)